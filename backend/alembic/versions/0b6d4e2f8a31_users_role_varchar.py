@@ -0,0 +1,52 @@
+"""users.role as varchar with a check constraint
+
+Revision ID: 0b6d4e2f8a31
+Revises: a37f0c6e9d15
+Create Date: 2025-12-15 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b6d4e2f8a31'
+down_revision = 'a37f0c6e9d15'
+branch_labels = None
+depends_on = None
+
+
+ROLES = ('admin', 'manager', 'staff')
+ROLE_CHECK = "role IN (%s)" % ", ".join(f"'{r}'" for r in ROLES)
+
+
+def upgrade():
+    # The native userrole enum only exists on PostgreSQL
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("UPDATE users SET role = 'manager' WHERE role IS NULL")
+    op.alter_column(
+        'users', 'role',
+        existing_type=sa.Enum(*ROLES, name='userrole'),
+        type_=sa.String(16),
+        postgresql_using='role::text',
+        nullable=False,
+    )
+    op.execute('DROP TYPE IF EXISTS userrole')
+    op.create_check_constraint('users_role_check', 'users', ROLE_CHECK)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.drop_constraint('users_role_check', 'users', type_='check')
+    op.execute("CREATE TYPE userrole AS ENUM ('admin', 'manager', 'staff')")
+    op.alter_column(
+        'users', 'role',
+        existing_type=sa.String(16),
+        type_=sa.Enum(*ROLES, name='userrole'),
+        postgresql_using='role::userrole',
+        nullable=True,
+    )
@@ -0,0 +1,67 @@
+"""native enums for lead/purchase order status, 3-char currency codes
+
+Revision ID: 15598d545595
+Revises: eeb22a05d3bf
+Create Date: 2025-12-14 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '15598d545595'
+down_revision = 'eeb22a05d3bf'
+branch_labels = None
+depends_on = None
+
+
+# (table, column, enum type name, values)
+ENUM_COLUMNS = [
+    ('leads', 'status', 'lead_status', ('new', 'in_work', 'qualified', 'converted', 'lost')),
+    ('leads', 'priority', 'lead_priority', ('low', 'medium', 'high')),
+    ('purchase_orders', 'status', 'purchase_order_status', ('pending', 'ordered', 'shipped', 'received', 'cancelled')),
+]
+
+CURRENCY_TABLES = ['copilot_documents', 'products', 'expenses']
+
+
+def upgrade():
+    # Enum types and column rewrites are PostgreSQL-only; SQLite keeps varchar
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+
+    inspector = sa.inspect(conn)
+    for table, column, type_name, values in ENUM_COLUMNS:
+        if not inspector.has_table(table):
+            continue
+        postgresql.ENUM(*values, name=type_name).create(conn, checkfirst=True)
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT')
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} TYPE {type_name} USING {column}::{type_name}')
+
+    for table in CURRENCY_TABLES:
+        if inspector.has_table(table):
+            op.alter_column(
+                table, 'currency',
+                existing_type=sa.String(),
+                type_=sa.String(3),
+                postgresql_using='currency::varchar(3)',
+            )
+
+
+def downgrade():
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+
+    inspector = sa.inspect(conn)
+    for table in CURRENCY_TABLES:
+        if inspector.has_table(table):
+            op.alter_column(table, 'currency', existing_type=sa.String(3), type_=sa.String())
+
+    for table, column, type_name, _values in ENUM_COLUMNS:
+        if inspector.has_table(table):
+            op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} TYPE varchar USING {column}::text')
+        op.execute(f'DROP TYPE IF EXISTS {type_name}')
@@ -0,0 +1,47 @@
+"""pg_trgm GIN indexes for substring search on names and titles
+
+Revision ID: 29a1cfd2662a
+Revises: 2db674657678
+Create Date: 2025-12-14 18:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '29a1cfd2662a'
+down_revision = '2db674657678'
+branch_labels = None
+depends_on = None
+
+
+TRGM_INDEXES = [
+    ('ix_products_title_trgm', 'products', 'title'),
+    ('ix_products_sku_trgm', 'products', 'sku'),
+    ('ix_suppliers_name_trgm', 'suppliers', 'name'),
+    ('ix_copilot_documents_title_trgm', 'copilot_documents', 'title'),
+    ('ix_copilot_documents_vendor_trgm', 'copilot_documents', 'vendor'),
+]
+
+
+def upgrade():
+    # pg_trgm is PostgreSQL-only; ILIKE stays a scan elsewhere
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # gin_trgm_ops on the raw column also serves case-insensitive ILIKE
+    for name, table, column in TRGM_INDEXES:
+        op.create_index(
+            name, table, [column],
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for name, table, _column in TRGM_INDEXES:
+        op.drop_index(name, table_name=table)
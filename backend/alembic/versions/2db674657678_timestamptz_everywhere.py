@@ -0,0 +1,54 @@
+"""remaining naive timestamp columns to timestamptz
+
+Revision ID: 2db674657678
+Revises: c0fdf9b2e26a
+Create Date: 2025-12-14 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2db674657678'
+down_revision = 'c0fdf9b2e26a'
+branch_labels = None
+depends_on = None
+
+
+# Existing values were written as naive UTC
+NAIVE_COLUMNS = [
+    ('tenants', 'created_at'),
+    ('users', 'created_at'),
+    ('purchase_orders', 'received_at'),
+    ('data_fix_suggestions', 'approved_at'),
+    ('data_fix_suggestions', 'applied_at'),
+    ('data_fix_suggestions', 'expires_at'),
+]
+
+
+def upgrade():
+    # SQLite has no separate timezone-aware type
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table, column in NAIVE_COLUMNS:
+        op.alter_column(
+            table, column,
+            existing_type=sa.DateTime(),
+            type_=sa.DateTime(timezone=True),
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table, column in NAIVE_COLUMNS:
+        op.alter_column(
+            table, column,
+            existing_type=sa.DateTime(timezone=True),
+            type_=sa.DateTime(),
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+        )
@@ -0,0 +1,72 @@
+"""BRIN indexes on append-only time columns
+
+Revision ID: 3824d894e909
+Revises: d99b880eae5f
+Create Date: 2025-12-12 12:00:00.000000
+
+Note: BRIN summaries for new block ranges are built by autovacuum. After a
+large bulk load, run SELECT brin_summarize_new_values('<index>') so range
+scans do not have to visit the unsummarized tail.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3824d894e909'
+down_revision = 'd99b880eae5f'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, column)
+BRIN_INDEXES = [
+    ('ix_deals_created_brin', 'deals', 'created_at'),
+    ('ix_expenses_date_brin', 'expenses', 'date'),
+    ('ix_expenses_created_brin', 'expenses', 'created_at'),
+    ('ix_leads_created_brin', 'leads', 'created_at'),
+    ('ix_document_chunks_created_brin', 'document_chunks', 'created_at'),
+    ('ix_copilot_messages_created_brin', 'copilot_messages', 'created_at'),
+    ('ix_purchase_orders_created_brin', 'purchase_orders', 'created_at'),
+    ('ix_inventory_items_received_brin', 'inventory_items', 'received_date'),
+]
+
+# Single-column B-trees replaced by the BRIN indexes above: (index name, table, column)
+REPLACED_BTREES = [
+    ('ix_deals_created_at', 'deals', 'created_at'),
+    ('ix_expenses_date', 'expenses', 'date'),
+    ('ix_leads_created_at', 'leads', 'created_at'),
+    ('ix_inventory_items_received_date', 'inventory_items', 'received_date'),
+]
+
+
+def upgrade():
+    # BRIN is PostgreSQL-only
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+    inspector = sa.inspect(conn)
+
+    for name, table, column in BRIN_INDEXES:
+        if inspector.has_table(table):
+            op.create_index(name, table, [column], postgresql_using='brin',
+                            postgresql_with={'pages_per_range': 32})
+
+    for name, table, _column in REPLACED_BTREES:
+        if inspector.has_table(table) and name in [idx['name'] for idx in inspector.get_indexes(table)]:
+            op.drop_index(name, table_name=table)
+
+
+def downgrade():
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+    inspector = sa.inspect(conn)
+
+    for name, table, column in REPLACED_BTREES:
+        if inspector.has_table(table):
+            op.create_index(name, table, [column])
+
+    for name, table, _column in BRIN_INDEXES:
+        if inspector.has_table(table):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,37 @@
+"""partial indexes for the document processing queue and pending fix suggestions
+
+Revision ID: 418c3b9e41bc
+Revises: 15598d545595
+Create Date: 2025-12-14 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '418c3b9e41bc'
+down_revision = '15598d545595'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Only the unprocessed backlog is indexed, so dequeues stay cheap as history grows
+    op.create_index(
+        'ix_copilot_documents_unprocessed',
+        'copilot_documents',
+        ['created_at'],
+        postgresql_where=sa.text('is_processed = false'),
+    )
+    op.create_index(
+        'ix_data_fix_suggestions_pending',
+        'data_fix_suggestions',
+        ['tenant_id', 'created_at'],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade():
+    op.drop_index('ix_data_fix_suggestions_pending', table_name='data_fix_suggestions')
+    op.drop_index('ix_copilot_documents_unprocessed', table_name='copilot_documents')
@@ -0,0 +1,55 @@
+"""document_chunks.embedding as pgvector halfvec with HNSW index
+
+Revision ID: 430b5d28aad4
+Revises: 8315448eb558
+Create Date: 2025-12-11 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '430b5d28aad4'
+down_revision = '8315448eb558'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # pgvector is PostgreSQL-only; SQLite keeps the JSON array column
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+    if not sa.inspect(conn).has_table('document_chunks'):
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+
+    # JSON arrays like [0.1, 0.2, ...] are valid vector literals
+    op.execute(
+        "ALTER TABLE document_chunks "
+        "ALTER COLUMN embedding TYPE halfvec(768) USING embedding::text::halfvec(768)"
+    )
+
+    # Give the HNSW build enough memory and workers (transaction-scoped)
+    op.execute("SET LOCAL maintenance_work_mem = '2GB'")
+    op.execute("SET LOCAL max_parallel_maintenance_workers = 7")
+    op.execute(
+        "CREATE INDEX ix_document_chunks_embedding_hnsw ON document_chunks "
+        "USING hnsw (embedding halfvec_cosine_ops) WITH (m = 24, ef_construction = 128)"
+    )
+
+
+def downgrade():
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+    if not sa.inspect(conn).has_table('document_chunks'):
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_document_chunks_embedding_hnsw")
+    op.execute(
+        "ALTER TABLE document_chunks "
+        "ALTER COLUMN embedding TYPE json USING embedding::text::json"
+    )
@@ -0,0 +1,61 @@
+"""clients timestamps timezone-aware with server defaults
+
+Revision ID: 48b87467bb47
+Revises: b1f2e3d4c567
+Create Date: 2025-12-10 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '48b87467bb47'
+down_revision = 'b1f2e3d4c567'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Backfill rows written before the columns had a database default
+    op.execute("UPDATE clients SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    op.execute("UPDATE clients SET updated_at = created_at WHERE updated_at IS NULL")
+
+    # Existing naive values were written with datetime.utcnow(), so interpret them as UTC
+    with op.batch_alter_table('clients') as batch_op:
+        batch_op.alter_column(
+            'created_at',
+            existing_type=sa.DateTime(),
+            type_=sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+            postgresql_using="created_at AT TIME ZONE 'UTC'",
+        )
+        batch_op.alter_column(
+            'updated_at',
+            existing_type=sa.DateTime(),
+            type_=sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+            postgresql_using="updated_at AT TIME ZONE 'UTC'",
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('clients') as batch_op:
+        batch_op.alter_column(
+            'updated_at',
+            existing_type=sa.DateTime(timezone=True),
+            type_=sa.DateTime(),
+            server_default=None,
+            nullable=True,
+            postgresql_using="updated_at AT TIME ZONE 'UTC'",
+        )
+        batch_op.alter_column(
+            'created_at',
+            existing_type=sa.DateTime(timezone=True),
+            type_=sa.DateTime(),
+            server_default=None,
+            nullable=True,
+            postgresql_using="created_at AT TIME ZONE 'UTC'",
+        )
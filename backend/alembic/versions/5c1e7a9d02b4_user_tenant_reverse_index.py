@@ -0,0 +1,29 @@
+"""index user_tenant_association by tenant
+
+Revision ID: 5c1e7a9d02b4
+Revises: cad012813801
+Create Date: 2025-12-15 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1e7a9d02b4'
+down_revision = 'cad012813801'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    existing_indexes = [idx['name'] for idx in sa.inspect(conn).get_indexes('user_tenant_association')]
+
+    # Listing a tenant's users filters on tenant_id, which the (user_id, tenant_id) PK cannot serve
+    if 'ix_uta_tenant_user' not in existing_indexes:
+        op.create_index('ix_uta_tenant_user', 'user_tenant_association', ['tenant_id', 'user_id'])
+
+
+def downgrade():
+    op.drop_index('ix_uta_tenant_user', table_name='user_tenant_association')
@@ -0,0 +1,47 @@
+"""server-side created_at defaults for tenants and users
+
+Revision ID: 6e8c1f3a5d27
+Revises: 0b6d4e2f8a31
+Create Date: 2025-12-15 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e8c1f3a5d27'
+down_revision = '0b6d4e2f8a31'
+branch_labels = None
+depends_on = None
+
+
+TABLES = ['tenants', 'users']
+
+
+def upgrade():
+    # Columns are already timestamptz; dev SQLite databases get the default from create_all
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table in TABLES:
+        op.execute(f'UPDATE {table} SET created_at = now() WHERE created_at IS NULL')
+        op.alter_column(
+            table, 'created_at',
+            existing_type=sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table in TABLES:
+        op.alter_column(
+            table, 'created_at',
+            existing_type=sa.DateTime(timezone=True),
+            server_default=None,
+            nullable=True,
+        )
@@ -0,0 +1,30 @@
+"""add partial index on closed final_account deals
+
+Revision ID: 7fbe9956cf83
+Revises: 48b87467bb47
+Create Date: 2025-12-10 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7fbe9956cf83'
+down_revision = '48b87467bb47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Revenue/COGS aggregates only read final_account deals by closed_at range
+    op.create_index(
+        'ix_deals_tenant_closed_final',
+        'deals',
+        ['tenant_id', 'closed_at'],
+        postgresql_where=sa.text("status = 'final_account'"),
+    )
+
+
+def downgrade():
+    op.drop_index('ix_deals_tenant_closed_final', table_name='deals')
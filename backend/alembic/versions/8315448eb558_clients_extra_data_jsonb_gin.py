@@ -0,0 +1,51 @@
+"""clients.extra_data as JSONB with GIN index
+
+Revision ID: 8315448eb558
+Revises: 7fbe9956cf83
+Create Date: 2025-12-10 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '8315448eb558'
+down_revision = '7fbe9956cf83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # JSONB and GIN are PostgreSQL-only; other backends keep plain JSON
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.alter_column(
+        'clients', 'extra_data',
+        existing_type=sa.JSON(),
+        type_=postgresql.JSONB(),
+        postgresql_using='extra_data::jsonb',
+    )
+    # jsonb_path_ops keeps the index small; it serves @> containment filters
+    op.create_index(
+        'ix_clients_extra_gin',
+        'clients',
+        ['extra_data'],
+        postgresql_using='gin',
+        postgresql_ops={'extra_data': 'jsonb_path_ops'},
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_clients_extra_gin', table_name='clients')
+    op.alter_column(
+        'clients', 'extra_data',
+        existing_type=postgresql.JSONB(),
+        type_=sa.JSON(),
+        postgresql_using='extra_data::json',
+    )
@@ -0,0 +1,74 @@
+"""document_chunks.token_count as smallint, copilot_documents.total_tokens
+
+Revision ID: 94d22ba9c66e
+Revises: e216a6d6c56e
+Create Date: 2025-12-14 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '94d22ba9c66e'
+down_revision = 'e216a6d6c56e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'copilot_documents',
+        sa.Column('total_tokens', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+    # Column type changes and triggers below are PostgreSQL-only
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.alter_column(
+        'document_chunks', 'token_count',
+        existing_type=sa.Integer(),
+        type_=sa.SmallInteger(),
+    )
+    op.execute("""
+        UPDATE copilot_documents d
+        SET total_tokens = s.total
+        FROM (
+            SELECT document_id, sum(coalesce(token_count, 0)) AS total
+            FROM document_chunks GROUP BY document_id
+        ) s
+        WHERE s.document_id = d.id
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION document_chunks_total_tokens() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE copilot_documents SET total_tokens = total_tokens + coalesce(NEW.token_count, 0)
+                WHERE id = NEW.document_id;
+                RETURN NEW;
+            END IF;
+            UPDATE copilot_documents SET total_tokens = total_tokens - coalesce(OLD.token_count, 0)
+            WHERE id = OLD.document_id;
+            RETURN OLD;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_document_chunks_total_tokens
+        AFTER INSERT OR DELETE ON document_chunks
+        FOR EACH ROW EXECUTE FUNCTION document_chunks_total_tokens()
+    """)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP TRIGGER IF EXISTS trg_document_chunks_total_tokens ON document_chunks')
+        op.execute('DROP FUNCTION IF EXISTS document_chunks_total_tokens()')
+        op.alter_column(
+            'document_chunks', 'token_count',
+            existing_type=sa.SmallInteger(),
+            type_=sa.Integer(),
+        )
+
+    op.drop_column('copilot_documents', 'total_tokens')
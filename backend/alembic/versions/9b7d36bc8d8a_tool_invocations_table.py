@@ -0,0 +1,129 @@
+"""move copilot_messages.tool_calls/tool_results into tool_invocations
+
+Revision ID: 9b7d36bc8d8a
+Revises: 94d22ba9c66e
+Create Date: 2025-12-14 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '9b7d36bc8d8a'
+down_revision = '94d22ba9c66e'
+branch_labels = None
+depends_on = None
+
+
+def _json_type():
+    return sa.JSON().with_variant(postgresql.JSONB(), 'postgresql')
+
+
+def upgrade():
+    conn = op.get_bind()
+    is_postgres = conn.dialect.name == 'postgresql'
+
+    if is_postgres:
+        # copilot_messages is partitioned with primary key (id, conversation_id)
+        message_fk = sa.ForeignKeyConstraint(
+            ['message_id', 'conversation_id'],
+            ['copilot_messages.id', 'copilot_messages.conversation_id'],
+            ondelete='CASCADE',
+        )
+    else:
+        message_fk = sa.ForeignKeyConstraint(['message_id'], ['copilot_messages.id'], ondelete='CASCADE')
+
+    op.create_table(
+        'tool_invocations',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('message_id', sa.Integer(), nullable=False),
+        sa.Column('conversation_id', sa.Integer(), nullable=False),
+        sa.Column('idx', sa.SmallInteger(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('args', _json_type(), nullable=True),
+        sa.Column('result', _json_type(), nullable=True),
+        message_fk,
+    )
+    op.create_index('ix_tool_invocations_message', 'tool_invocations', ['message_id', 'idx'])
+
+    # Copy existing tool calls, one child row per call; tool_results[i] belongs to tool_calls[i]
+    messages = sa.table(
+        'copilot_messages',
+        sa.column('id', sa.Integer()),
+        sa.column('conversation_id', sa.Integer()),
+        sa.column('tool_calls', _json_type()),
+        sa.column('tool_results', _json_type()),
+    )
+    invocations = sa.table(
+        'tool_invocations',
+        sa.column('message_id', sa.Integer()),
+        sa.column('conversation_id', sa.Integer()),
+        sa.column('idx', sa.SmallInteger()),
+        sa.column('name', sa.String()),
+        sa.column('args', _json_type()),
+        sa.column('result', _json_type()),
+    )
+    rows = conn.execute(
+        sa.select(messages).where(messages.c.tool_calls.isnot(None))
+    ).fetchall()
+    for row in rows:
+        results = row.tool_results or []
+        child_rows = [
+            {
+                'message_id': row.id,
+                'conversation_id': row.conversation_id,
+                'idx': idx,
+                'name': call.get('name') or '',
+                'args': call.get('arguments'),
+                'result': results[idx].get('result') if idx < len(results) else None,
+            }
+            for idx, call in enumerate(row.tool_calls)
+        ]
+        if child_rows:
+            conn.execute(invocations.insert(), child_rows)
+
+    with op.batch_alter_table('copilot_messages') as batch_op:
+        batch_op.drop_column('tool_results')
+        batch_op.drop_column('tool_calls')
+
+
+def downgrade():
+    conn = op.get_bind()
+
+    with op.batch_alter_table('copilot_messages') as batch_op:
+        batch_op.add_column(sa.Column('tool_calls', _json_type(), nullable=True))
+        batch_op.add_column(sa.Column('tool_results', _json_type(), nullable=True))
+
+    messages = sa.table(
+        'copilot_messages',
+        sa.column('id', sa.Integer()),
+        sa.column('tool_calls', _json_type()),
+        sa.column('tool_results', _json_type()),
+    )
+    invocations = sa.table(
+        'tool_invocations',
+        sa.column('message_id', sa.Integer()),
+        sa.column('idx', sa.SmallInteger()),
+        sa.column('name', sa.String()),
+        sa.column('args', _json_type()),
+        sa.column('result', _json_type()),
+    )
+    rows = conn.execute(
+        sa.select(invocations.c.message_id, invocations.c.name, invocations.c.args, invocations.c.result)
+        .order_by(invocations.c.message_id, invocations.c.idx)
+    ).fetchall()
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(row.message_id, []).append(row)
+    for message_id, calls in grouped.items():
+        conn.execute(
+            messages.update().where(messages.c.id == message_id).values(
+                tool_calls=[{'name': c.name, 'arguments': c.args} for c in calls],
+                tool_results=[{'tool_name': c.name, 'result': c.result} for c in calls],
+            )
+        )
+
+    op.drop_index('ix_tool_invocations_message', table_name='tool_invocations')
+    op.drop_table('tool_invocations')
@@ -0,0 +1,33 @@
+"""denormalized clients.deals_count
+
+Revision ID: a37f0c6e9d15
+Revises: 5c1e7a9d02b4
+Create Date: 2025-12-15 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a37f0c6e9d15'
+down_revision = '5c1e7a9d02b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'clients',
+        sa.Column('deals_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+    # Backfill; from here on the application keeps the counter in step with deals
+    op.execute("""
+        UPDATE clients
+        SET deals_count = (SELECT count(*) FROM deals WHERE deals.client_id = clients.id)
+    """)
+
+
+def downgrade():
+    op.drop_column('clients', 'deals_count')
@@ -0,0 +1,32 @@
+"""document_chunks (tenant_id, doc_type, doc_date) metadata index
+
+Revision ID: c0fdf9b2e26a
+Revises: 418c3b9e41bc
+Create Date: 2025-12-14 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c0fdf9b2e26a'
+down_revision = '418c3b9e41bc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Replaces the tenant-only index, which is a prefix of the new one
+    op.create_index(
+        'ix_document_chunks_tenant_type_date',
+        'document_chunks',
+        ['tenant_id', 'doc_type', sa.text('doc_date DESC')],
+        postgresql_include=['supplier_id', 'category'],
+    )
+    op.drop_index('ix_document_chunks_tenant', table_name='document_chunks')
+
+
+def downgrade():
+    op.create_index('ix_document_chunks_tenant', 'document_chunks', ['tenant_id'])
+    op.drop_index('ix_document_chunks_tenant_type_date', table_name='document_chunks')
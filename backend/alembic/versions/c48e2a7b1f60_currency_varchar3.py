@@ -0,0 +1,51 @@
+"""currency columns as varchar(3) on the remaining tables
+
+Revision ID: c48e2a7b1f60
+Revises: 6e8c1f3a5d27
+Create Date: 2025-12-15 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c48e2a7b1f60'
+down_revision = '6e8c1f3a5d27'
+branch_labels = None
+depends_on = None
+
+
+# copilot_documents, products and expenses were converted in 15598d545595
+CURRENCY_TABLES = [
+    'tenants', 'deals', 'financial_settings', 'inventory_items',
+    'supplier_offers', 'purchase_orders', 'purchase_order_items',
+]
+
+
+def upgrade():
+    # SQLite does not enforce varchar length
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+
+    inspector = sa.inspect(conn)
+    for table in CURRENCY_TABLES:
+        if inspector.has_table(table):
+            op.alter_column(
+                table, 'currency',
+                existing_type=sa.String(),
+                type_=sa.String(3),
+                postgresql_using='upper(currency)::varchar(3)',
+            )
+
+
+def downgrade():
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+
+    inspector = sa.inspect(conn)
+    for table in CURRENCY_TABLES:
+        if inspector.has_table(table):
+            op.alter_column(table, 'currency', existing_type=sa.String(3), type_=sa.String())
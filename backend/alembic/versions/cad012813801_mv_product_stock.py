@@ -0,0 +1,69 @@
+"""mv_product_stock materialized view over inventory_items
+
+Revision ID: cad012813801
+Revises: 9b7d36bc8d8a
+Create Date: 2025-12-14 22:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'cad012813801'
+down_revision = '9b7d36bc8d8a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Materialized views are PostgreSQL-only; elsewhere callers aggregate inventory_items directly
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("""
+        CREATE MATERIALIZED VIEW mv_product_stock AS
+        SELECT product_id,
+               min(tenant_id) AS tenant_id,
+               sum(remaining_quantity) AS remaining_quantity,
+               sum(quantity) AS quantity,
+               sum(remaining_quantity * unit_cost) AS stock_value
+        FROM inventory_items
+        GROUP BY product_id
+        WITH DATA
+    """)
+    # REFRESH ... CONCURRENTLY requires a unique index
+    op.execute('CREATE UNIQUE INDEX ix_mv_product_stock_product ON mv_product_stock (product_id)')
+    op.execute('CREATE INDEX ix_mv_product_stock_tenant ON mv_product_stock (tenant_id)')
+
+    # Writes only mark the view dirty; the refresh_product_stock task does the refresh
+    op.execute("""
+        CREATE TABLE mv_refresh_state (
+            view_name varchar PRIMARY KEY,
+            dirty boolean NOT NULL DEFAULT false
+        )
+    """)
+    op.execute("INSERT INTO mv_refresh_state (view_name) VALUES ('mv_product_stock')")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION mark_product_stock_dirty() RETURNS trigger AS $$
+        BEGIN
+            UPDATE mv_refresh_state SET dirty = true
+            WHERE view_name = 'mv_product_stock' AND NOT dirty;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_inventory_items_stock_dirty
+        AFTER INSERT OR UPDATE OR DELETE ON inventory_items
+        FOR EACH STATEMENT EXECUTE FUNCTION mark_product_stock_dirty()
+    """)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('DROP TRIGGER IF EXISTS trg_inventory_items_stock_dirty ON inventory_items')
+    op.execute('DROP FUNCTION IF EXISTS mark_product_stock_dirty()')
+    op.execute('DROP TABLE IF EXISTS mv_refresh_state')
+    op.execute('DROP MATERIALIZED VIEW IF EXISTS mv_product_stock')
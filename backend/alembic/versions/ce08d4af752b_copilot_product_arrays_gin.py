@@ -0,0 +1,58 @@
+"""copilot product_ids/product_skus as GIN-indexed arrays
+
+Revision ID: ce08d4af752b
+Revises: 430b5d28aad4
+Create Date: 2025-12-11 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ce08d4af752b'
+down_revision = '430b5d28aad4'
+branch_labels = None
+depends_on = None
+
+
+# (table, column, array element type, GIN index name)
+ARRAY_COLUMNS = [
+    ('copilot_documents', 'product_ids', 'integer', 'ix_copilot_documents_product_ids_gin'),
+    ('document_chunks', 'product_skus', 'varchar', 'ix_document_chunks_product_skus_gin'),
+]
+
+
+def upgrade():
+    # Native arrays are PostgreSQL-only; SQLite keeps JSON lists
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+    inspector = sa.inspect(conn)
+
+    for table, column, element_type, index_name in ARRAY_COLUMNS:
+        if not inspector.has_table(table):
+            continue
+        # ALTER COLUMN ... USING cannot contain a subquery, so copy through a new column
+        op.execute(f"ALTER TABLE {table} ADD COLUMN {column}_arr {element_type}[]")
+        op.execute(
+            f"UPDATE {table} SET {column}_arr = ARRAY("
+            f"SELECT jsonb_array_elements_text({column}::jsonb)::{element_type}) "
+            f"WHERE {column} IS NOT NULL AND json_typeof({column}) = 'array'"
+        )
+        op.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+        op.execute(f"ALTER TABLE {table} RENAME COLUMN {column}_arr TO {column}")
+        op.execute(f"CREATE INDEX {index_name} ON {table} USING gin ({column})")
+
+
+def downgrade():
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+    inspector = sa.inspect(conn)
+
+    for table, column, _element_type, index_name in ARRAY_COLUMNS:
+        if not inspector.has_table(table):
+            continue
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE json USING to_json({column})")
@@ -0,0 +1,93 @@
+"""drop redundant single-column indexes, add INCLUDE columns
+
+Revision ID: d1e35087bea9
+Revises: fd39de82bee3
+Create Date: 2025-12-14 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd1e35087bea9'
+down_revision = 'fd39de82bee3'
+branch_labels = None
+depends_on = None
+
+
+# Indexes on primary key columns duplicate the primary key index
+PK_INDEX_TABLES = [
+    'tenants', 'users', 'clients', 'leads', 'products', 'inventory', 'inventory_items',
+    'suppliers', 'supplier_offers', 'purchase_orders', 'purchase_order_items',
+    'expenses', 'financial_settings', 'allocation_rules', 'deals', 'deal_items',
+    'copilot_documents', 'document_chunks', 'copilot_conversations', 'copilot_messages',
+    'data_fix_suggestions',
+]
+
+# (table, column) whose index=True index duplicates, or is the prefix of, a named index
+COVERED_COLUMNS = [
+    ('clients', 'tenant_id'),
+    ('copilot_documents', 'tenant_id'),
+    ('document_chunks', 'tenant_id'),
+    ('copilot_conversations', 'user_id'),
+    ('data_fix_suggestions', 'tenant_id'),
+    ('deals', 'tenant_id'),
+    ('deals', 'client_id'),
+    ('deal_items', 'deal_id'),
+    ('deal_items', 'product_id'),
+    ('expenses', 'tenant_id'),
+    ('allocation_rules', 'tenant_id'),
+    ('products', 'tenant_id'),
+    ('inventory_items', 'product_id'),
+    ('inventory_items', 'tenant_id'),
+    ('suppliers', 'tenant_id'),
+    ('supplier_offers', 'supplier_id'),
+    ('supplier_offers', 'product_id'),
+    ('purchase_orders', 'tenant_id'),
+    ('purchase_orders', 'supplier_id'),
+    ('purchase_order_items', 'purchase_order_id'),
+    ('purchase_order_items', 'product_id'),
+]
+
+# Composite indexes rebuilt with INCLUDE columns (PostgreSQL only)
+INCLUDE_INDEXES = [
+    ('ix_deal_items_deal', 'deal_items', ['deal_id'], ['product_id', 'total_price', 'total_cost']),
+    ('ix_purchase_order_items_po', 'purchase_order_items', ['purchase_order_id'], ['product_id', 'qty', 'unit_price']),
+]
+
+
+def _redundant_indexes():
+    names = [(f'ix_{table}_id', table, ['id']) for table in PK_INDEX_TABLES]
+    names += [(f'ix_{table}_{column}', table, [column]) for table, column in COVERED_COLUMNS]
+    return names
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    for name, table, _columns in _redundant_indexes():
+        if inspector.has_table(table) and name in [idx['name'] for idx in inspector.get_indexes(table)]:
+            op.drop_index(name, table_name=table)
+
+    if conn.dialect.name == 'postgresql':
+        for name, table, columns, include in INCLUDE_INDEXES:
+            if inspector.has_table(table):
+                op.execute(f"DROP INDEX IF EXISTS {name}")
+                op.create_index(name, table, columns, postgresql_include=include)
+
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    if conn.dialect.name == 'postgresql':
+        for name, table, columns, _include in INCLUDE_INDEXES:
+            if inspector.has_table(table):
+                op.execute(f"DROP INDEX IF EXISTS {name}")
+                op.create_index(name, table, columns)
+
+    for name, table, columns in _redundant_indexes():
+        if inspector.has_table(table) and name not in [idx['name'] for idx in inspector.get_indexes(table)]:
+            op.create_index(name, table, columns)
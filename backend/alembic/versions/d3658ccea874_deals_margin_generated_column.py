@@ -0,0 +1,41 @@
+"""deals.margin as a generated column
+
+Revision ID: d3658ccea874
+Revises: 3824d894e909
+Create Date: 2025-12-13 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3658ccea874'
+down_revision = '3824d894e909'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite cannot add a STORED generated column with ALTER TABLE; dev databases
+    # pick the definition up from create_all
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # An existing column cannot be turned into an expression column, so recreate it
+    op.drop_column('deals', 'margin')
+    op.execute(
+        "ALTER TABLE deals ADD COLUMN margin NUMERIC(18, 2) "
+        "GENERATED ALWAYS AS (total_price - total_cost) STORED"
+    )
+    op.create_check_constraint('ck_deals_total_price_nonnegative', 'deals', 'total_price >= 0')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.drop_constraint('ck_deals_total_price_nonnegative', 'deals', type_='check')
+    op.drop_column('deals', 'margin')
+    op.add_column('deals', sa.Column('margin', sa.Numeric(precision=18, scale=2), nullable=False, server_default='0'))
+    op.execute("UPDATE deals SET margin = total_price - total_cost")
@@ -0,0 +1,44 @@
+"""pg_trgm GIN indexes for substring search on client names
+
+Revision ID: d93b5e0a7c42
+Revises: c48e2a7b1f60
+Create Date: 2025-12-15 14:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd93b5e0a7c42'
+down_revision = 'c48e2a7b1f60'
+branch_labels = None
+depends_on = None
+
+
+TRGM_INDEXES = [
+    ('ix_clients_name_trgm', 'clients', 'name'),
+    ('ix_clients_company_trgm', 'clients', 'company'),
+]
+
+
+def upgrade():
+    # pg_trgm is PostgreSQL-only; ILIKE stays a scan elsewhere
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # Created in 29a1cfd2662a; repeated so this revision also applies on its own
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRGM_INDEXES:
+        op.create_index(
+            name, table, [column],
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for name, table, _column in TRGM_INDEXES:
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,34 @@
+"""covering index for product quantity aggregate
+
+Revision ID: d99b880eae5f
+Revises: ce08d4af752b
+Create Date: 2025-12-12 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd99b880eae5f'
+down_revision = 'ce08d4af752b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    existing_indexes = [idx['name'] for idx in inspector.get_indexes('inventory')]
+
+    # (product_id, quantity) lets sum(quantity) per product run as an index-only scan;
+    # it also serves every lookup the single-column index did
+    if 'ix_inventory_product_qty' not in existing_indexes:
+        op.create_index('ix_inventory_product_qty', 'inventory', ['product_id', 'quantity'])
+    if 'ix_inventory_product' in existing_indexes:
+        op.drop_index('ix_inventory_product', table_name='inventory')
+
+
+def downgrade():
+    op.create_index('ix_inventory_product', 'inventory', ['product_id'])
+    op.drop_index('ix_inventory_product_qty', table_name='inventory')
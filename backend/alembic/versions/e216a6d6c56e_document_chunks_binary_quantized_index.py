@@ -0,0 +1,40 @@
+"""binary-quantized HNSW index on document_chunks.embedding
+
+Revision ID: e216a6d6c56e
+Revises: 29a1cfd2662a
+Create Date: 2025-12-14 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e216a6d6c56e'
+down_revision = '29a1cfd2662a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+
+    # binary_quantize(halfvec) needs pgvector 0.7.0; older installs keep halfvec-only search
+    version = conn.execute(sa.text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")).scalar()
+    if not version or tuple(int(part) for part in version.split('.')) < (0, 7):
+        return
+
+    # 768 bits (96 bytes) per vector; RAGService reranks candidates on the halfvec column
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS ix_document_chunks_embedding_bq_hnsw ON document_chunks '
+        'USING hnsw ((binary_quantize(embedding)::bit(768)) bit_hamming_ops)'
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('DROP INDEX IF EXISTS ix_document_chunks_embedding_bq_hnsw')
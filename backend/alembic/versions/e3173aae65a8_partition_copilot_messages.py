@@ -0,0 +1,92 @@
+"""hash-partition copilot_messages by conversation_id
+
+Revision ID: e3173aae65a8
+Revises: d3658ccea874
+Create Date: 2025-12-13 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3173aae65a8'
+down_revision = 'd3658ccea874'
+branch_labels = None
+depends_on = None
+
+
+PARTITIONS = 32
+
+
+def _create_indexes():
+    op.execute("CREATE INDEX ix_copilot_messages_conv_time ON copilot_messages (conversation_id, created_at)")
+    op.execute(
+        "CREATE INDEX ix_copilot_messages_created_brin ON copilot_messages "
+        "USING brin (created_at) WITH (pages_per_range = 32)"
+    )
+
+
+def upgrade():
+    # Declarative partitioning is PostgreSQL-only
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+    if not sa.inspect(conn).has_table('copilot_messages'):
+        return
+
+    op.execute("ALTER TABLE copilot_messages RENAME TO copilot_messages_unpartitioned")
+    # Keep the id sequence alive when the old table is dropped
+    op.execute("ALTER SEQUENCE copilot_messages_id_seq OWNED BY NONE")
+
+    op.execute(
+        "CREATE TABLE copilot_messages "
+        "(LIKE copilot_messages_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        "PARTITION BY HASH (conversation_id)"
+    )
+    # The partition key must be part of the primary key
+    op.execute("ALTER TABLE copilot_messages ADD PRIMARY KEY (id, conversation_id)")
+    op.execute(
+        "ALTER TABLE copilot_messages ADD CONSTRAINT copilot_messages_conversation_id_fkey "
+        "FOREIGN KEY (conversation_id) REFERENCES copilot_conversations (id) ON DELETE CASCADE"
+    )
+    for remainder in range(PARTITIONS):
+        op.execute(
+            f"CREATE TABLE copilot_messages_p{remainder} PARTITION OF copilot_messages "
+            f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})"
+        )
+
+    op.execute("INSERT INTO copilot_messages SELECT * FROM copilot_messages_unpartitioned")
+    op.execute("DROP TABLE copilot_messages_unpartitioned")
+    op.execute("ALTER SEQUENCE copilot_messages_id_seq OWNED BY copilot_messages.id")
+
+    # Created on the parent, so every partition gets its own small copy
+    _create_indexes()
+
+
+def downgrade():
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+    if not sa.inspect(conn).has_table('copilot_messages'):
+        return
+
+    op.execute("ALTER TABLE copilot_messages RENAME TO copilot_messages_partitioned")
+    op.execute("ALTER SEQUENCE copilot_messages_id_seq OWNED BY NONE")
+
+    op.execute(
+        "CREATE TABLE copilot_messages "
+        "(LIKE copilot_messages_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    op.execute("ALTER TABLE copilot_messages ADD PRIMARY KEY (id)")
+    op.execute(
+        "ALTER TABLE copilot_messages ADD CONSTRAINT copilot_messages_conversation_id_fkey "
+        "FOREIGN KEY (conversation_id) REFERENCES copilot_conversations (id) ON DELETE CASCADE"
+    )
+
+    op.execute("INSERT INTO copilot_messages SELECT * FROM copilot_messages_partitioned")
+    # Dropping the parent drops every partition
+    op.execute("DROP TABLE copilot_messages_partitioned")
+    op.execute("ALTER SEQUENCE copilot_messages_id_seq OWNED BY copilot_messages.id")
+
+    _create_indexes()
@@ -0,0 +1,79 @@
+"""mv_daily_rollup materialized view of daily deal and expense totals
+
+Revision ID: e51b7c03a9d4
+Revises: d93b5e0a7c42
+Create Date: 2025-12-15 16:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e51b7c03a9d4'
+down_revision = 'd93b5e0a7c42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Materialized views are PostgreSQL-only; elsewhere callers aggregate deals/expenses directly
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # One row per tenant and UTC day; deals are bucketed by created_at, expenses by date
+    op.execute("""
+        CREATE MATERIALIZED VIEW mv_daily_rollup AS
+        SELECT tenant_id,
+               day,
+               sum(revenue) AS revenue,
+               sum(cogs) AS cogs,
+               sum(orders) AS orders,
+               sum(expenses) AS expenses
+        FROM (
+            SELECT tenant_id,
+                   (created_at AT TIME ZONE 'UTC')::date AS day,
+                   total_price AS revenue,
+                   total_cost AS cogs,
+                   1 AS orders,
+                   0 AS expenses
+            FROM deals
+            -- status is the native dealstatus enum, which has no 'cancelled' label; compare as text
+            WHERE status::text <> 'cancelled'
+            UNION ALL
+            SELECT tenant_id, date, 0, 0, 0, amount
+            FROM expenses
+        ) AS daily
+        GROUP BY tenant_id, day
+        WITH DATA
+    """)
+    # REFRESH ... CONCURRENTLY requires a unique index; it also serves tenant/day range scans
+    op.execute('CREATE UNIQUE INDEX ix_mv_daily_rollup_tenant_day ON mv_daily_rollup (tenant_id, day)')
+
+    # Same dirty-flag scheme as mv_product_stock (cad012813801)
+    op.execute("INSERT INTO mv_refresh_state (view_name) VALUES ('mv_daily_rollup')")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION mark_daily_rollup_dirty() RETURNS trigger AS $$
+        BEGIN
+            UPDATE mv_refresh_state SET dirty = true
+            WHERE view_name = 'mv_daily_rollup' AND NOT dirty;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in ('deals', 'expenses'):
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_daily_rollup_dirty
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION mark_daily_rollup_dirty()
+        """)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table in ('deals', 'expenses'):
+        op.execute(f'DROP TRIGGER IF EXISTS trg_{table}_daily_rollup_dirty ON {table}')
+    op.execute('DROP FUNCTION IF EXISTS mark_daily_rollup_dirty()')
+    op.execute("DELETE FROM mv_refresh_state WHERE view_name = 'mv_daily_rollup'")
+    op.execute('DROP MATERIALIZED VIEW IF EXISTS mv_daily_rollup')
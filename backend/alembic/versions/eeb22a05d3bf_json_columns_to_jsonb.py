@@ -0,0 +1,91 @@
+"""JSON columns to JSONB, lz4 compression, GIN path indexes
+
+Revision ID: eeb22a05d3bf
+Revises: d1e35087bea9
+Create Date: 2025-12-14 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'eeb22a05d3bf'
+down_revision = 'd1e35087bea9'
+branch_labels = None
+depends_on = None
+
+
+JSON_COLUMNS = [
+    ('copilot_documents', 'extra_data'),
+    ('copilot_messages', 'response_data'),
+    ('copilot_messages', 'tool_calls'),
+    ('copilot_messages', 'tool_results'),
+    ('data_fix_suggestions', 'changes'),
+    ('deals', 'recurring_settings'),
+    ('deals', 'extra_data'),
+    ('expenses', 'extra_data'),
+    ('leads', 'extra_data'),
+    ('products', 'images'),
+    ('products', 'extra_data'),
+    ('suppliers', 'contact'),
+]
+
+GIN_INDEXES = [
+    ('ix_copilot_documents_extra_gin', 'copilot_documents', 'extra_data'),
+    ('ix_copilot_messages_response_gin', 'copilot_messages', 'response_data'),
+    ('ix_deals_recurring_gin', 'deals', 'recurring_settings'),
+]
+
+
+def upgrade():
+    # JSONB and GIN are PostgreSQL-only; other backends keep plain JSON
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+
+    inspector = sa.inspect(conn)
+    # Per-column lz4 TOAST compression needs PostgreSQL 14+
+    use_lz4 = conn.dialect.server_version_info >= (14,)
+
+    for table, column in JSON_COLUMNS:
+        if not inspector.has_table(table):
+            continue
+        op.alter_column(
+            table, column,
+            existing_type=sa.JSON(),
+            type_=postgresql.JSONB(),
+            postgresql_using=f'{column}::jsonb',
+        )
+        if use_lz4:
+            op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} SET COMPRESSION lz4')
+
+    # jsonb_path_ops keeps the index small; it serves @> containment filters
+    for name, table, column in GIN_INDEXES:
+        if inspector.has_table(table):
+            op.create_index(
+                name, table, [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'jsonb_path_ops'},
+            )
+
+
+def downgrade():
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+
+    inspector = sa.inspect(conn)
+    for name, table, _column in GIN_INDEXES:
+        if inspector.has_table(table):
+            op.drop_index(name, table_name=table)
+
+    for table, column in JSON_COLUMNS:
+        if inspector.has_table(table):
+            op.alter_column(
+                table, column,
+                existing_type=postgresql.JSONB(),
+                type_=sa.JSON(),
+                postgresql_using=f'{column}::json',
+            )
@@ -0,0 +1,75 @@
+"""server-side timezone-aware timestamps for copilot, finance, product and supplier tables
+
+Revision ID: fd39de82bee3
+Revises: e3173aae65a8
+Create Date: 2025-12-14 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fd39de82bee3'
+down_revision = 'e3173aae65a8'
+branch_labels = None
+depends_on = None
+
+
+TIMESTAMP_COLUMNS = {
+    'copilot_documents': ['created_at', 'updated_at'],
+    'document_chunks': ['created_at'],
+    'copilot_conversations': ['created_at', 'updated_at'],
+    'copilot_messages': ['created_at'],
+    'data_fix_suggestions': ['created_at'],
+    'expenses': ['created_at'],
+    'financial_settings': ['updated_at'],
+    'allocation_rules': ['created_at'],
+    'products': ['created_at', 'updated_at'],
+    'inventory': ['updated_at'],
+    'inventory_items': ['created_at'],
+    'suppliers': ['created_at'],
+    'supplier_offers': ['created_at'],
+    'purchase_orders': ['created_at'],
+}
+
+
+def upgrade():
+    # SQLite stores timestamps as text either way; dev databases get the
+    # new defaults from create_all
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+    inspector = sa.inspect(conn)
+
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        if not inspector.has_table(table):
+            continue
+        for column in columns:
+            # Existing values were written with datetime.utcnow()
+            op.alter_column(
+                table, column,
+                existing_type=sa.DateTime(),
+                type_=sa.DateTime(timezone=True),
+                server_default=sa.func.now(),
+                postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+            )
+
+
+def downgrade():
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+    inspector = sa.inspect(conn)
+
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        if not inspector.has_table(table):
+            continue
+        for column in columns:
+            op.alter_column(
+                table, column,
+                existing_type=sa.DateTime(timezone=True),
+                type_=sa.DateTime(),
+                server_default=None,
+                postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+            )
@@ -5,11 +5,12 @@ Authentication endpoints: login, register, token refresh
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel
 from typing import Optional
 
 from app.db import get_db
 from app import crud, schemas, models
+from app.schemas._types import Email
 from app.core.security import (
     verify_password, 
     get_password_hash, 
@@ -30,7 +31,7 @@ class TokenData(BaseModel):
 
 
 class RegisterRequest(BaseModel):
-    email: EmailStr
+    email: Email
     password: str
     full_name: Optional[str] = None
     tenant_name: Optional[str] = None  # If creating a new tenant
@@ -112,9 +113,6 @@ async def login(
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     
-    # Load tenants relationship
-    await db.refresh(user, ["tenants"])
-    
     # Get first tenant for user (if any)
     tenant_id = None
     if user.tenants:
@@ -126,7 +124,7 @@ async def login(
             "sub": user.email,
             "user_id": user.id,
             "tenant_id": tenant_id,
-            "role": user.role.value
+            "role": user.role
         }
     )
     
@@ -83,16 +83,9 @@ class DataFixSuggestionResponse(BaseModel):
 
 async def get_tenant_id(db: AsyncSession, user: models.User) -> int:
     """Get the active tenant ID for the user."""
-    from sqlalchemy import select
-    from sqlalchemy.orm import selectinload
-    
-    # Fetch user with tenants to avoid lazy loading
-    query = select(models.User).options(selectinload(models.User.tenants)).where(models.User.id == user.id)
-    result = await db.execute(query)
-    user_with_tenants = result.scalar_one_or_none()
-    
-    if user_with_tenants and user_with_tenants.tenants:
-        return user_with_tenants.tenants[0].id
+    # User.tenants is selectin-loaded together with the user
+    if user.tenants:
+        return user.tenants[0].id
     raise HTTPException(status_code=400, detail="User has no associated tenant")
 
 
@@ -229,7 +222,7 @@ async def list_conversations(
             context_type=c.context_type,
             created_at=c.created_at,
             updated_at=c.updated_at,
-            message_count=len(c.messages) if hasattr(c, 'messages') else 0
+            message_count=c.message_count
         )
         for c in conversations
     ]
@@ -245,7 +238,7 @@ async def get_conversation(
     tenant_id = await get_tenant_id(db, current_user)
     copilot = CopilotService(db, tenant_id, current_user.id)
     
-    conversation = await copilot.get_conversation(conversation_id)
+    conversation = await copilot.get_conversation(conversation_id, include_tool_invocations=True)
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
@@ -256,7 +249,9 @@ async def get_conversation(
             "role": msg.role.value,
             "content": msg.content,
             "response_data": msg.response_data,
-            "tool_calls": msg.tool_calls,
+            "tool_calls": [
+                {"name": inv.name, "arguments": inv.args} for inv in msg.tool_invocations
+            ] or None,
             "created_at": msg.created_at.isoformat()
         })
     
@@ -297,7 +292,7 @@ async def list_data_fix_suggestions(
     current_user: models.User = Depends(get_current_user)
 ):
     """List pending data fix suggestions."""
-    from sqlalchemy import select
+    from sqlalchemy import select, or_, func
     
     tenant_id = await get_tenant_id(db, current_user)
     
@@ -307,6 +302,12 @@ async def list_data_fix_suggestions(
     
     if status:
         query = query.where(models.DataFixSuggestion.status == status)
+    if status == "pending":
+        # Expired suggestions can no longer be approved
+        query = query.where(or_(
+            models.DataFixSuggestion.expires_at.is_(None),
+            models.DataFixSuggestion.expires_at > func.now(),
+        ))
     
     query = query.order_by(models.DataFixSuggestion.created_at.desc()).limit(50)
     
@@ -334,7 +335,7 @@ async def approve_data_fix(
     current_user: models.User = Depends(get_current_user)
 ):
     """Approve and apply a data fix suggestion."""
-    from sqlalchemy import select
+    from sqlalchemy import select, func
     
     tenant_id = await get_tenant_id(db, current_user)
     
@@ -356,8 +357,8 @@ async def approve_data_fix(
         # This is a simplified implementation - would need more logic for actual merges
         suggestion.status = models.DataFixStatus.applied
         suggestion.approved_by = current_user.id
-        suggestion.approved_at = datetime.utcnow()
-        suggestion.applied_at = datetime.utcnow()
+        suggestion.approved_at = func.now()
+        suggestion.applied_at = func.now()
         
         await db.commit()
         
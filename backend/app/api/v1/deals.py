@@ -1,6 +1,6 @@
 # app/api/v1/deals.py
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db import get_db
@@ -41,7 +41,7 @@ async def create_deal(
             select(models.Deal)
             .options(
                 selectinload(models.Deal.client),
-                selectinload(models.Deal.items).selectinload(models.DealItem.product).selectinload(models.Product.inventory_records),
+                selectinload(models.Deal.items).selectinload(models.DealItem.product),
                 selectinload(models.Deal.responsible),
                 selectinload(models.Deal.observers)
             )
@@ -59,14 +59,19 @@ async def list_deals(
     db: AsyncSession = Depends(get_db)
 ):
     from sqlalchemy import select
-    from sqlalchemy.orm import selectinload
+    from sqlalchemy.orm import defer, selectinload
     from app import models
 
     stmt = (
         select(models.Deal)
         .options(
             selectinload(models.Deal.client),
-            selectinload(models.Deal.items).selectinload(models.DealItem.product).selectinload(models.Product.inventory_records),
+            # DealItemRead derives the line totals, so they are not read back here
+            selectinload(models.Deal.items).options(
+                defer(models.DealItem.total_price),
+                defer(models.DealItem.total_cost),
+                selectinload(models.DealItem.product),
+            ),
             selectinload(models.Deal.responsible),
             selectinload(models.Deal.observers)
         )
@@ -75,19 +80,27 @@ async def list_deals(
         .limit(limit)
     )
     result = await db.execute(stmt)
-    return result.scalars().all()
+    # Validate and serialize the page in one pass instead of FastAPI's per-response
+    # validate -> jsonable_encoder -> json.dumps chain
+    deals = schemas.DEAL_LIST_ADAPTER.validate_python(result.scalars().all(), from_attributes=True)
+    return Response(content=schemas.DEAL_LIST_ADAPTER.dump_json(deals), media_type="application/json")
 
 @router.get("/{deal_id}", response_model=schemas.DealRead)
 async def get_deal(deal_id: int, db: AsyncSession = Depends(get_db)):
     from sqlalchemy import select
-    from sqlalchemy.orm import selectinload
+    from sqlalchemy.orm import defer, selectinload
     from app import models
 
     stmt = (
         select(models.Deal)
         .options(
             selectinload(models.Deal.client),
-            selectinload(models.Deal.items).selectinload(models.DealItem.product).selectinload(models.Product.inventory_records),
+            # DealItemRead derives the line totals, so they are not read back here
+            selectinload(models.Deal.items).options(
+                defer(models.DealItem.total_price),
+                defer(models.DealItem.total_cost),
+                selectinload(models.DealItem.product),
+            ),
             selectinload(models.Deal.responsible),
             selectinload(models.Deal.observers)
         )
@@ -128,7 +141,7 @@ async def update_deal(
         select(models.Deal)
         .options(
             selectinload(models.Deal.client),
-            selectinload(models.Deal.items).selectinload(models.DealItem.product).selectinload(models.Product.inventory_records),
+            selectinload(models.Deal.items).selectinload(models.DealItem.product),
             selectinload(models.Deal.responsible),
             selectinload(models.Deal.observers)
         )
@@ -165,7 +178,7 @@ async def update_deal_status(
             select(models.Deal)
             .options(
                 selectinload(models.Deal.client),
-                selectinload(models.Deal.items).selectinload(models.DealItem.product).selectinload(models.Product.inventory_records)
+                selectinload(models.Deal.items).selectinload(models.DealItem.product)
             )
             .where(models.Deal.id == deal_id)
         )
@@ -198,6 +211,9 @@ async def add_items_to_deal(
     total_price_added = Decimal("0")
     total_cost_added = Decimal("0")
 
+    # Added after the loop so the FIFO queries' autoflush doesn't insert items one by one
+    deal_items = []
+
     for item_data in items:
 
         product = await crud.get_product(db, item_data.product_id)
@@ -233,16 +249,17 @@ async def add_items_to_deal(
             total_cost=quantity * unit_cost
         )
 
-        db.add(deal_item)
+        deal_items.append(deal_item)
 
         await deduct_inventory_fifo(db, item_data.product_id, quantity)
 
         total_price_added += deal_item.total_price
         total_cost_added += deal_item.total_cost
 
+    db.add_all(deal_items)
+
     deal.total_price += total_price_added
     deal.total_cost += total_cost_added
-    deal.margin = deal.total_price - deal.total_cost
 
     await db.commit()
 
@@ -255,7 +272,7 @@ async def add_items_to_deal(
         select(models.Deal)
         .options(
             selectinload(models.Deal.client),
-            selectinload(models.Deal.items).selectinload(models.DealItem.product).selectinload(models.Product.inventory_records),
+            selectinload(models.Deal.items).selectinload(models.DealItem.product),
             selectinload(models.Deal.responsible),
             selectinload(models.Deal.observers)
         )
@@ -15,15 +15,7 @@ async def create_user(payload: schemas.UserCreate, db: AsyncSession = Depends(ge
     if payload.password:
         hashed_password = get_password_hash(payload.password)
     
-    # Convert role string to enum if provided
-    role = models.UserRole.manager
-    if payload.role:
-        try:
-            role = models.UserRole(payload.role)
-        except ValueError:
-            role = models.UserRole.manager
-    
-    u = await crud.create_user(db, email=payload.email, full_name=payload.full_name, hashed_password=hashed_password, role=role)
+    u = await crud.create_user(db, email=payload.email, full_name=payload.full_name, hashed_password=hashed_password, role=payload.role)
     
     # Eagerly load tenants relationship to avoid lazy loading issues
     from sqlalchemy import select
@@ -3,7 +3,7 @@ from decimal import Decimal
 import re
 import random
 import string
-from sqlalchemy import select, update, delete, func, and_, or_
+from sqlalchemy import select, update, delete, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy.sql import text
@@ -53,7 +53,7 @@ async def list_tenants(db: AsyncSession, skip: int = 0, limit: int = 50):
     return q.scalars().all()
 
 async def create_user(db: AsyncSession, email: str, full_name: Optional[str], hashed_password: Optional[str], role=models.UserRole.manager):
-    user = models.User(email=email, full_name=full_name, hashed_password=hashed_password, role=role)
+    user = models.User(email=email, full_name=full_name, hashed_password=hashed_password, role=models.UserRole(role).value)
     db.add(user)
     await db.commit()
     await db.refresh(user)
@@ -68,7 +68,7 @@ async def get_user(db: AsyncSession, user_id: int):
     return q.scalar_one_or_none()
 
 async def create_client(db: AsyncSession, tenant_id: int, payload: schemas.ClientCreate):
-    metadata_value = getattr(payload, "metadata", None) or getattr(payload, "extra_data", None)
+    metadata_value = payload.client_metadata or payload.extra_data
     
     obj = models.Client(
         tenant_id=tenant_id,
@@ -87,38 +87,29 @@ async def create_client(db: AsyncSession, tenant_id: int, payload: schemas.Clien
         await db.rollback()
         raise
         
-    setattr(obj, "deals_count", 0)
     return obj
 
+async def adjust_client_deals_count(db: AsyncSession, client_id: int, delta: int):
+    # Runs in the caller's transaction; the caller commits
+    await db.execute(
+        update(models.Client)
+        .where(models.Client.id == client_id)
+        .values(deals_count=models.Client.deals_count + delta)
+    )
+
 async def list_clients(db: AsyncSession, tenant_id: int, skip: int = 0, limit: int = 50):
     q = await db.execute(
         select(models.Client)
-        .options(selectinload(models.Client.deals))
         .where(models.Client.tenant_id == tenant_id)
         .order_by(models.Client.created_at.desc())
         .offset(skip)
         .limit(limit)
     )
-    clients = q.scalars().all()
-    
-    # Set deals_count
-    for client in clients:
-        setattr(client, "deals_count", len(client.deals))
-        
-    return clients
+    return q.scalars().all()
 
 async def get_client(db: AsyncSession, client_id: int):
-    q = await db.execute(
-        select(models.Client)
-        .options(selectinload(models.Client.deals))
-        .where(models.Client.id == client_id)
-    )
-    client = q.scalar_one_or_none()
-    
-    if client:
-        setattr(client, "deals_count", len(client.deals))
-        
-    return client
+    q = await db.execute(select(models.Client).where(models.Client.id == client_id))
+    return q.scalar_one_or_none()
 
 async def update_client(db: AsyncSession, client_id: int, changes: Dict[str, Any]):
     await db.execute(update(models.Client).where(models.Client.id == client_id).values(**changes))
@@ -163,25 +154,19 @@ async def create_product(db: AsyncSession, tenant_id: int, product_data: Dict[st
     )
     db.add(obj)
     await db.commit()
-    
-    # Reload with inventory_records relationship for quantity property
-    result = await db.execute(
-        select(models.Product)
-        .options(selectinload(models.Product.inventory_records))
-        .where(models.Product.id == obj.id)
-    )
-    return result.scalar_one()
+    # Loads server-side values, including the quantity aggregate
+    await db.refresh(obj)
+    return obj
 
 async def get_product(db: AsyncSession, product_id: int):
     q = await db.execute(
         select(models.Product)
-        .options(selectinload(models.Product.inventory_records))
         .where(models.Product.id == product_id)
     )
     return q.scalar_one_or_none()
 
 async def list_products(db: AsyncSession, tenant_id: int, skip: int = 0, limit: int = 50, qstr: Optional[str] = None):
-    q = select(models.Product).options(selectinload(models.Product.inventory_records)).where(models.Product.tenant_id == tenant_id)
+    q = select(models.Product).where(models.Product.tenant_id == tenant_id)
     if qstr:
         q = q.where(models.Product.title.ilike(f"%{qstr}%"))
     q = q.offset(skip).limit(limit)
@@ -346,13 +331,10 @@ async def create_deal(db: AsyncSession, tenant_id: int, payload: schemas.DealCre
     )
     if payload.extra_data:
         obj.extra_data = payload.extra_data
-    try:
-        obj.margin = Decimal(payload.total_price or 0) - Decimal(payload.total_cost or 0)
-    except Exception:
-        obj.margin = Decimal("0.00")
     
     db.add(obj)
     await db.flush()  # Flush to get the deal ID
+    await adjust_client_deals_count(db, obj.client_id, 1)
     
     # Handle observers (many-to-many relationship)
     if payload.observer_ids:
@@ -466,16 +448,6 @@ async def update_deal(db: AsyncSession, deal_id: int, payload: schemas.DealUpdat
     if payload.recurring_settings is not None:
         update_data['recurring_settings'] = payload.recurring_settings
     
-    if payload.total_price is not None or payload.total_cost is not None:
-        deal = await get_deal(db, deal_id)
-        if deal:
-            final_price = payload.total_price if payload.total_price is not None else deal.total_price
-            final_cost = payload.total_cost if payload.total_cost is not None else deal.total_cost
-            try:
-                update_data['margin'] = Decimal(final_price) - Decimal(final_cost)
-            except Exception:
-                update_data['margin'] = Decimal("0.00")
-    
     # Handle observers update
     deal = await get_deal(db, deal_id)
     if deal and payload.observer_ids is not None:
@@ -490,12 +462,24 @@ async def update_deal(db: AsyncSession, deal_id: int, payload: schemas.DealUpdat
     if not update_data and payload.observer_ids is None:
         return await get_deal(db, deal_id)
     
+    if deal is not None and 'client_id' in update_data and update_data['client_id'] != deal.client_id:
+        await adjust_client_deals_count(db, deal.client_id, -1)
+        await adjust_client_deals_count(db, update_data['client_id'], 1)
+    
     await db.execute(update(models.Deal).where(models.Deal.id == deal_id).values(**update_data))
     await db.commit()
+    if deal is not None:
+        # margin is generated by the database; reload it with the next select
+        db.expire(deal, ["margin"])
     return await get_deal(db, deal_id)
 
 async def delete_deal(db: AsyncSession, deal_id: int):
-    await db.execute(delete(models.Deal).where(models.Deal.id == deal_id))
+    result = await db.execute(
+        delete(models.Deal).where(models.Deal.id == deal_id).returning(models.Deal.client_id)
+    )
+    client_id = result.scalar_one_or_none()
+    if client_id is not None:
+        await adjust_client_deals_count(db, client_id, -1)
     await db.commit()
     return True
 
@@ -527,8 +511,7 @@ async def remove_deal_item(db: AsyncSession, deal_id: int, item_id: int):
         .where(models.Deal.id == deal_id)
         .values(
             total_price=total_price,
-            total_cost=total_cost,
-            margin=total_price - total_cost
+            total_cost=total_cost
         )
     )
     await db.execute(update_stmt)
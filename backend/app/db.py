@@ -6,7 +6,7 @@ load_dotenv()
 
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker as sync_sessionmaker
 from sqlalchemy.pool import NullPool
 
@@ -22,7 +22,28 @@ def _make_async_database_url(url: str) -> str:
 
 ASYNC_DATABASE_URL = _make_async_database_url(DATABASE_URL)
 
-async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False, future=True)
+def _async_engine_options(url: str) -> dict:
+    if url.startswith("sqlite"):
+        return {}
+    # Copilot tool calls run concurrently on their own sessions, so one chat turn can
+    # hold several connections at once; keep enough of them open and warm
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "8")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "16")),
+        "pool_pre_ping": True,
+    }
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers run alongside the writer; NORMAL sync is safe with WAL
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False, future=True, **_async_engine_options(ASYNC_DATABASE_URL))
+if ASYNC_DATABASE_URL.startswith("sqlite"):
+    event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas)
+
 AsyncSessionLocal = sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
 
 def _make_sync_database_url(url: str) -> str:
@@ -48,4 +69,14 @@ def get_sync_session():
 
 async def create_all_tables():
     async with async_engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # document_chunks.embedding uses the pgvector halfvec type
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+            # Trigram indexes on product/supplier/document names
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
+
+async def is_schema_migrated() -> bool:
+    """True when Alembic manages the schema (alembic_version table exists)."""
+    async with async_engine.connect() as conn:
+        return await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table("alembic_version"))
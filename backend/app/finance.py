@@ -129,14 +129,14 @@ async def get_tax_rate(db: AsyncSession, tenant_id: int) -> Decimal:
     """
     Получает налоговую ставку из настроек финансов.
     """
-    query = select(models.FinancialSettings).where(
+    query = select(models.FinancialSettings.tax_rate).where(
         models.FinancialSettings.tenant_id == tenant_id
     )
     result = await db.execute(query)
-    settings = result.scalar_one_or_none()
+    tax_rate = result.scalar_one_or_none()
     
-    if settings and settings.tax_rate:
-        return to_decimal(settings.tax_rate)
+    if tax_rate:
+        return to_decimal(tax_rate)
     return Decimal("0.00")
 
 
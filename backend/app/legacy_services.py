@@ -8,6 +8,7 @@ from . import crud, models, schemas
 from .tasks import recalc_deal_margin_async
 
 logger = logging.getLogger(__name__)
+audit_logger = logging.getLogger("app.audit")
 
 
 class ServiceError(Exception):
@@ -18,13 +19,13 @@ async def create_client_service(db: AsyncSession, tenant_id: int, payload: schem
     try:
         client = await crud.create_client(db, tenant_id=tenant_id, payload=payload)
         logger.info("Created client %s (id=%s)", client.name, client.id)
-        await crud.create_audit_log(db, tenant_id=tenant_id, user_id=None, action="client.create",
-                                    entity="client", entity_id=str(client.id), diff={"name": client.name})
-        return client
     except Exception as e:
         logger.exception("Failed to create client: %s", e)
         raise ServiceError("Failed to create client") from e
 
+    write_audit_log(tenant_id, None, "client.create", "client", str(client.id), {"name": client.name})
+    return client
+
 
 async def create_deal_and_schedule(db: AsyncSession, tenant_id: int, payload: schemas.DealCreate) -> models.Deal:
     client = await crud.get_client(db, payload.client_id)
@@ -44,14 +45,10 @@ async def create_deal_and_schedule(db: AsyncSession, tenant_id: int, payload: sc
     except Exception as e:
         logger.exception("Failed to schedule background job for deal %s: %s", deal.id, e)
 
-    try:
-        await crud.create_audit_log(db, tenant_id=tenant_id, user_id=None, action="deal.create",
-                                    entity="deal", entity_id=str(deal.id), diff={
-                                        "total_price": str(deal.total_price),
-                                        "total_cost": str(deal.total_cost)
-                                    })
-    except Exception:
-        logger.exception("Failed to create audit log for deal %s", getattr(deal, "id", None))
+    write_audit_log(tenant_id, None, "deal.create", "deal", str(deal.id), {
+        "total_price": str(deal.total_price),
+        "total_cost": str(deal.total_cost)
+    })
 
     return deal
 
@@ -181,3 +178,18 @@ def schedule_recalc_margin(deal_id: int):
         logger.info("Scheduled recalc_deal_margin for deal %s", deal_id)
     except Exception:
         logger.exception("Failed to schedule recalc_deal_margin for %s", deal_id)
+
+
+def write_audit_log(tenant_id: int, user_id: Optional[int], action: str, entity: str,
+                    entity_id: str, diff: Optional[Dict[str, Any]] = None):
+    """
+    Record an audit entry; audit writes are best-effort and never fail the request.
+    There is no audit table yet, so entries go to the "app.audit" logger in-process.
+    """
+    try:
+        audit_logger.info(
+            "tenant=%s user=%s action=%s entity=%s entity_id=%s diff=%s",
+            tenant_id, user_id, action, entity, entity_id, diff or {},
+        )
+    except Exception:
+        logger.exception("Failed to write audit log %s for %s %s", action, entity, entity_id)
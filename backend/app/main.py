@@ -1,18 +1,62 @@
 import os
 import logging
 import traceback
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from app.db import async_engine as engine, Base, create_all_tables
+from app.db import DATABASE_URL, create_all_tables, is_schema_migrated
 from app.api.v1 import api_router
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 logging.basicConfig(level=LOG_LEVEL)
-logger = logging.getLogger("app.main")
+logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Bizio / Ecomt CRM", version="0.1.0", docs_url="/docs", redoc_url="/redoc")
+
+# Auto-create tables only for the local SQLite dev database unless explicitly enabled;
+# deployed databases are managed by Alembic migrations.
+CREATE_TABLES_ON_STARTUP = os.getenv(
+    "CREATE_TABLES_ON_STARTUP", "true" if DATABASE_URL.startswith("sqlite") else "false"
+).lower() in ("1", "true", "yes")
+
+_tables_initialized = False
+
+
+async def init_tables_once():
+    global _tables_initialized
+    if _tables_initialized:
+        return
+    _tables_initialized = True
+
+    if not CREATE_TABLES_ON_STARTUP:
+        logger.info("Skipping automatic table creation (CREATE_TABLES_ON_STARTUP=false)")
+        return
+    if await is_schema_migrated():
+        logger.info("Skipping automatic table creation (schema managed by Alembic)")
+        return
+
+    logger.info("Creating DB tables (dev mode)...")
+    await create_all_tables()
+    logger.info("DB tables created")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await init_tables_once()
+    except Exception:
+        logger.exception("Failed to create DB tables on startup")
+    yield
+
+
+app = FastAPI(
+    title="Bizio / Ecomt CRM",
+    version="0.1.0",
+    docs_url="/docs",
+    redoc_url="/redoc",
+    lifespan=lifespan,
+)
 
 # Global exception handler to catch and log all unhandled exceptions
 @app.exception_handler(Exception)
@@ -21,19 +65,19 @@ async def global_exception_handler(request: Request, exc: Exception):
     Catch all unhandled exceptions, log them, and return a 500 response.
     This helps debugging on Render by showing the full stack trace in logs.
     """
-    error_traceback = traceback.format_exc()
-    logger.error(f"Unhandled exception on {request.method} {request.url.path}:\n{error_traceback}")
-    
-    # In production, you might want to hide the traceback from the response
-    # For now, we include it for debugging
+    # In production the traceback is hidden from the response, so only format it in debug mode
     is_debug = os.getenv("DEBUG", "false").lower() in ("true", "1", "yes")
+    error_traceback = traceback.format_exc() if is_debug else None
+
+    # logger.exception attaches the traceback through the logging formatter
+    logger.exception("Unhandled exception on %s %s", request.method, request.url.path)
     
     return JSONResponse(
         status_code=500,
         content={
             "detail": str(exc),
             "path": str(request.url.path),
-            "traceback": error_traceback if is_debug else "Check server logs for details"
+            "traceback": error_traceback or "Check server logs for details"
         }
     )
 
@@ -54,20 +98,6 @@ app.add_middleware(
 app.include_router(api_router, prefix="/api/v1")
 
 
-@app.on_event("startup")
-async def on_startup():
-    try:
-        create_tables = os.getenv("CREATE_TABLES_ON_STARTUP", "true").lower() in ("1", "true", "yes")
-        if create_tables:
-            logger.info("Creating DB tables (dev mode)...")
-            await create_all_tables()
-            logger.info("DB tables created")
-        else:
-            logger.info("Skipping automatic table creation (CREATE_TABLES_ON_STARTUP=false)")
-    except Exception:
-        logger.exception("Failed to create DB tables on startup")
-
-
 @app.get("/", tags=["health"])
 async def root():
     return {"service": "Bizio / Ecomt CRM", "status": "ok"}
@@ -11,13 +11,13 @@ Usage:
 # Import all models
 from .users import Tenant, User, UserRole
 from .clients import Client
-from .products import Product, Inventory, InventoryItem
+from .products import Product, Inventory, InventoryItem, ProductStock
 from .deals import Deal, DealItem, DealStatus
-from .finance import Expense, FinancialSettings, AllocationRule, AllocationType
-from .suppliers import Supplier, SupplierOffer, PurchaseOrder, PurchaseOrderItem
+from .finance import Expense, FinancialSettings, AllocationRule, AllocationType, DailyRollup
+from .suppliers import Supplier, SupplierOffer, PurchaseOrder, PurchaseOrderItem, PurchaseOrderStatus
 from .copilot import (
     Document, DocumentType, DocumentChunk,
-    CopilotConversation, CopilotMessage, MessageRole,
+    CopilotConversation, CopilotMessage, MessageRole, ToolInvocation,
     DataFixSuggestion, DataFixStatus
 )
 
@@ -35,6 +35,7 @@ __all__ = [
     "Product",
     "Inventory",
     "InventoryItem",
+    "ProductStock",
     
     # Deals
     "Deal",
@@ -46,12 +47,14 @@ __all__ = [
     "FinancialSettings",
     "AllocationRule",
     "AllocationType",
+    "DailyRollup",
     
     # Suppliers
     "Supplier",
     "SupplierOffer",
     "PurchaseOrder",
     "PurchaseOrderItem",
+    "PurchaseOrderStatus",
     
     # Copilot
     "Document",
@@ -60,6 +63,7 @@ __all__ = [
     "CopilotConversation",
     "CopilotMessage",
     "MessageRole",
+    "ToolInvocation",
     "DataFixSuggestion",
     "DataFixStatus",
 ]
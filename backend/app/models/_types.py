@@ -0,0 +1,25 @@
+# app/models/_types.py
+"""
+Column types shared across model modules.
+"""
+import sys
+
+from sqlalchemy import String
+from sqlalchemy.types import TypeDecorator
+
+
+# Codes the app deals in; anything else loads as a plain string
+CURRENCY_CODES = ('KZT', 'USD', 'EUR', 'RUB', 'CNY')
+_CCY_INTERN = {c: sys.intern(c) for c in CURRENCY_CODES}
+
+
+class CurrencyCode(TypeDecorator):
+    """ISO 4217 code stored as varchar(3); loaded values share one interned str per code."""
+
+    impl = String(3)
+    cache_ok = True
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return _CCY_INTERN.get(value, value)
@@ -1,5 +1,5 @@
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, JSON, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.db import Base
 
@@ -7,8 +7,8 @@ from app.db import Base
 class Client(Base):
     __tablename__ = "clients"
 
-    id = Column(Integer, primary_key=True, index=True)
-    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
     
     name = Column(String, nullable=False)
     company = Column(String, nullable=True)
@@ -17,19 +17,32 @@ class Client(Base):
     address = Column(String, nullable=True)
     
     external_id = Column(String, nullable=True, index=True)
+
+    # Maintained by crud.adjust_client_deals_count whenever a deal is created, moved or deleted
+    deals_count = Column(Integer, nullable=False, default=0, server_default="0")
     
-    extra_data = Column(JSON, nullable=True)
+    # JSONB on PostgreSQL (GIN-indexable), plain JSON elsewhere (tests run on SQLite)
+    extra_data = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     tenant = relationship("Tenant", back_populates="clients")
-    deals = relationship("Deal", back_populates="client", cascade="all, delete-orphan")
+    # lazy="raise": load explicitly with selectinload(Client.deals) to avoid N+1 queries
+    deals = relationship("Deal", back_populates="client", cascade="all, delete-orphan", lazy="raise")
 
 
     __table_args__ = (
         Index('ix_clients_tenant_email', 'tenant_id', 'email'),
         Index('ix_clients_tenant_external', 'tenant_id', 'external_id'),
+        # Trigram indexes serve ILIKE '%...%' substring searches (pg_trgm)
+        Index('ix_clients_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        Index('ix_clients_company_trgm', 'company', postgresql_using='gin', postgresql_ops={'company': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        Index(
+            'ix_clients_extra_gin', 'extra_data',
+            postgresql_using='gin',
+            postgresql_ops={'extra_data': 'jsonb_path_ops'},
+        ).ddl_if(dialect='postgresql'),
     )
 
     def __repr__(self):
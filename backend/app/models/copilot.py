@@ -3,13 +3,18 @@
 Database models for BIZIO AI Copilot.
 Includes documents, embeddings, conversations, and data fix suggestions.
 """
-from datetime import datetime, date
 from decimal import Decimal
 from enum import Enum as PyEnum
-from sqlalchemy import Column, Integer, String, Text, Numeric, DateTime, Date, ForeignKey, Boolean, Enum, JSON, Index, LargeBinary
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy import Column, Integer, SmallInteger, String, Text, Numeric, DateTime, Date, ForeignKey, Boolean, Enum, JSON, Index, LargeBinary, func, text
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import relationship
+from pgvector.sqlalchemy import HALFVEC
 from app.db import Base
+from ._types import CurrencyCode
+
+
+# Gemini text-embedding-004 output size
+EMBEDDING_DIM = 768
 
 
 class DocumentType(str, PyEnum):
@@ -30,8 +35,8 @@ class Document(Base):
     """
     __tablename__ = "copilot_documents"
 
-    id = Column(Integer, primary_key=True, index=True)
-    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     
     # Document metadata
@@ -49,12 +54,12 @@ class Document(Base):
     doc_date = Column(Date, nullable=True)  # Date mentioned in document
     vendor = Column(String, nullable=True)
     amount = Column(Numeric(precision=18, scale=2), nullable=True)
-    currency = Column(String, default="KZT")
+    currency = Column(CurrencyCode, default="KZT")
     category = Column(String, nullable=True)
     
     # Related entities
     supplier_id = Column(Integer, ForeignKey("suppliers.id", ondelete="SET NULL"), nullable=True)
-    product_ids = Column(JSON, nullable=True)  # List of related product IDs
+    product_ids = Column(JSON().with_variant(ARRAY(Integer), "postgresql"), nullable=True)  # List of related product IDs
     
     # Processing status
     is_processed = Column(Boolean, default=False)
@@ -62,10 +67,13 @@ class Document(Base):
     ocr_confidence = Column(Numeric(precision=5, scale=2), nullable=True)  # 0-100
     
     # Extra data
-    extra_data = Column(JSON, nullable=True)
+    extra_data = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Sum of chunk token_count, kept current by a trigger on document_chunks (PostgreSQL)
+    total_tokens = Column(Integer, nullable=False, server_default="0")
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     tenant = relationship("Tenant", back_populates="copilot_documents")
@@ -75,6 +83,20 @@ class Document(Base):
     __table_args__ = (
         Index('ix_copilot_documents_tenant_type', 'tenant_id', 'doc_type'),
         Index('ix_copilot_documents_tenant_date', 'tenant_id', 'doc_date'),
+        # product_ids @> ARRAY[...] lookups ("documents mentioning product X")
+        Index('ix_copilot_documents_product_ids_gin', 'product_ids', postgresql_using='gin').ddl_if(dialect='postgresql'),
+        # Processing queue: only unprocessed rows are indexed
+        Index(
+            'ix_copilot_documents_unprocessed', 'created_at',
+            postgresql_where=(is_processed == False),  # noqa: E712
+        ),
+        Index('ix_copilot_documents_title_trgm', 'title', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        Index('ix_copilot_documents_vendor_trgm', 'vendor', postgresql_using='gin', postgresql_ops={'vendor': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        Index(
+            'ix_copilot_documents_extra_gin', 'extra_data',
+            postgresql_using='gin',
+            postgresql_ops={'extra_data': 'jsonb_path_ops'},
+        ).ddl_if(dialect='postgresql'),
     )
 
     def __repr__(self):
@@ -88,36 +110,53 @@ class DocumentChunk(Base):
     """
     __tablename__ = "document_chunks"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     document_id = Column(Integer, ForeignKey("copilot_documents.id", ondelete="CASCADE"), nullable=False, index=True)
-    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
     
     # Chunk content
     content = Column(Text, nullable=False)
     chunk_index = Column(Integer, nullable=False)  # Position in document
     
-    # Embedding - stored as JSON array for SQLite compatibility
-    # For PostgreSQL with pgvector, this would be Vector(768)
-    embedding = Column(JSON, nullable=True)
+    # Embedding - pgvector halfvec (fp16) on PostgreSQL, JSON array on SQLite
+    embedding = Column(JSON().with_variant(HALFVEC(EMBEDDING_DIM), "postgresql"), nullable=True)
     
     # Metadata for filtering during retrieval
     doc_type = Column(String, nullable=True)
     doc_date = Column(Date, nullable=True)
     supplier_id = Column(Integer, nullable=True)
-    product_skus = Column(JSON, nullable=True)  # List of SKUs mentioned
+    product_skus = Column(JSON().with_variant(ARRAY(String), "postgresql"), nullable=True)  # List of SKUs mentioned
     category = Column(String, nullable=True)
     
-    # Token counts
-    token_count = Column(Integer, nullable=True)
+    # Token counts (a chunk is a few hundred tokens, well inside SMALLINT)
+    token_count = Column(SmallInteger, nullable=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     document = relationship("Document", back_populates="chunks")
     
     __table_args__ = (
-        Index('ix_document_chunks_tenant', 'tenant_id'),
+        # Metadata prefilter for RAG searches (tenant, then doc_type / date range)
+        Index(
+            'ix_document_chunks_tenant_type_date', 'tenant_id', 'doc_type', doc_date.desc(),
+            postgresql_include=['supplier_id', 'category'],
+        ),
         Index('ix_document_chunks_doc_type', 'doc_type'),
+        Index('ix_document_chunks_product_skus_gin', 'product_skus', postgresql_using='gin').ddl_if(dialect='postgresql'),
+        Index('ix_document_chunks_created_brin', 'created_at', postgresql_using='brin', postgresql_with={'pages_per_range': 32}).ddl_if(dialect='postgresql'),
+        Index(
+            'ix_document_chunks_embedding_hnsw', 'embedding',
+            postgresql_using='hnsw',
+            postgresql_with={'m': 24, 'ef_construction': 128},
+            postgresql_ops={'embedding': 'halfvec_cosine_ops'},
+        ).ddl_if(dialect='postgresql'),
+        # Binary-quantized first pass for very large corpora (see RAGService._search_pgvector)
+        Index(
+            'ix_document_chunks_embedding_bq_hnsw',
+            text(f'(binary_quantize(embedding)::bit({EMBEDDING_DIM})) bit_hamming_ops'),
+            postgresql_using='hnsw',
+        ).ddl_if(dialect='postgresql'),
     )
 
     def __repr__(self):
@@ -131,9 +170,9 @@ class CopilotConversation(Base):
     """
     __tablename__ = "copilot_conversations"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     # Conversation metadata
     title = Column(String, nullable=True)  # Auto-generated from first message
@@ -145,17 +184,26 @@ class CopilotConversation(Base):
     # Status
     is_active = Column(Boolean, default=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     tenant = relationship("Tenant", back_populates="copilot_conversations")
     user = relationship("User", back_populates="copilot_conversations")
-    messages = relationship("CopilotMessage", back_populates="conversation", cascade="all, delete-orphan", order_by="CopilotMessage.created_at")
+    # passive_deletes: the FK's ON DELETE CASCADE removes messages, so deleting a
+    # conversation does not load its history first
+    # Messages of one turn share a transaction timestamp; id keeps them in insert order
+    messages = relationship(
+        "CopilotMessage", back_populates="conversation", cascade="all, delete-orphan",
+        order_by="(CopilotMessage.created_at, CopilotMessage.id)", passive_deletes=True,
+    )
     
     __table_args__ = (
         Index('ix_copilot_conversations_user', 'user_id'),
     )
+    
+    # updated_at is set by the database (onupdate); fetch it via RETURNING
+    __mapper_args__ = {"eager_defaults": True}
 
     def __repr__(self):
         return f"<CopilotConversation(id={self.id}, title={self.title})>"
@@ -176,19 +224,17 @@ class CopilotMessage(Base):
     """
     __tablename__ = "copilot_messages"
 
-    id = Column(Integer, primary_key=True, index=True)
-    conversation_id = Column(Integer, ForeignKey("copilot_conversations.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    # On PostgreSQL the table is hash-partitioned on conversation_id (32 partitions, see
+    # migration e3173aae65a8), with primary key (id, conversation_id)
+    conversation_id = Column(Integer, ForeignKey("copilot_conversations.id", ondelete="CASCADE"), nullable=False)
     
     # Message content
     role = Column(Enum(MessageRole), nullable=False)
     content = Column(Text, nullable=False)
     
     # For assistant messages - structured response data
-    response_data = Column(JSON, nullable=True)  # {key_numbers, sources, actions, confidence}
-    
-    # For tool calls
-    tool_calls = Column(JSON, nullable=True)  # List of tool calls made
-    tool_results = Column(JSON, nullable=True)  # Results from tool calls
+    response_data = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)  # {key_numbers, sources, actions, confidence}
     
     # Token usage
     input_tokens = Column(Integer, nullable=True)
@@ -197,19 +243,59 @@ class CopilotMessage(Base):
     # Processing time
     processing_time_ms = Column(Integer, nullable=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     conversation = relationship("CopilotConversation", back_populates="messages")
+    # Tool payloads live in their own table; load explicitly with selectinload when needed
+    tool_invocations = relationship(
+        "ToolInvocation", back_populates="message", cascade="all, delete-orphan",
+        order_by="ToolInvocation.idx", lazy="raise",
+    )
     
     __table_args__ = (
-        Index('ix_copilot_messages_conversation', 'conversation_id'),
+        # History loads filter by conversation and order by time
+        Index('ix_copilot_messages_conv_time', 'conversation_id', 'created_at'),
+        Index('ix_copilot_messages_created_brin', 'created_at', postgresql_using='brin', postgresql_with={'pages_per_range': 32}).ddl_if(dialect='postgresql'),
+        Index(
+            'ix_copilot_messages_response_gin', 'response_data',
+            postgresql_using='gin',
+            postgresql_ops={'response_data': 'jsonb_path_ops'},
+        ).ddl_if(dialect='postgresql'),
     )
 
     def __repr__(self):
         return f"<CopilotMessage(id={self.id}, role={self.role}, conv_id={self.conversation_id})>"
 
 
+class ToolInvocation(Base):
+    """
+    A tool call made while producing an assistant message, with its result.
+    """
+    __tablename__ = "tool_invocations"
+
+    id = Column(Integer, primary_key=True)
+    # On PostgreSQL the foreign key is (message_id, conversation_id), matching the
+    # partitioned copilot_messages primary key
+    message_id = Column(Integer, ForeignKey("copilot_messages.id", ondelete="CASCADE"), nullable=False)
+    conversation_id = Column(Integer, nullable=False)
+    idx = Column(SmallInteger, nullable=False)  # Position within the message's tool calls
+    
+    name = Column(String, nullable=False)
+    args = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
+    result = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
+
+    # Relationships
+    message = relationship("CopilotMessage", back_populates="tool_invocations")
+    
+    __table_args__ = (
+        Index('ix_tool_invocations_message', 'message_id', 'idx'),
+    )
+
+    def __repr__(self):
+        return f"<ToolInvocation(id={self.id}, name={self.name}, message_id={self.message_id})>"
+
+
 class DataFixStatus(str, PyEnum):
     """Status of a data fix suggestion."""
     pending = "pending"
@@ -226,8 +312,8 @@ class DataFixSuggestion(Base):
     """
     __tablename__ = "data_fix_suggestions"
 
-    id = Column(Integer, primary_key=True, index=True)
-    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)  # Who requested
     conversation_id = Column(Integer, ForeignKey("copilot_conversations.id", ondelete="SET NULL"), nullable=True)
     
@@ -236,7 +322,7 @@ class DataFixSuggestion(Base):
     entity_type = Column(String, nullable=False)  # products, suppliers, clients
     
     # The actual changes proposed
-    changes = Column(JSON, nullable=False)
+    changes = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
     # Example: [{"action": "merge", "source_ids": [1, 2], "target_id": 1, "field_values": {...}}]
     
     # Status
@@ -248,21 +334,25 @@ class DataFixSuggestion(Base):
     
     # Approval/rejection
     approved_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
-    approved_at = Column(DateTime, nullable=True)
+    approved_at = Column(DateTime(timezone=True), nullable=True)
     rejection_reason = Column(String, nullable=True)
     
     # Application result
-    applied_at = Column(DateTime, nullable=True)
+    applied_at = Column(DateTime(timezone=True), nullable=True)
     apply_error = Column(String, nullable=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    expires_at = Column(DateTime, nullable=True)  # Auto-expire old suggestions
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=True)  # Auto-expire old suggestions
 
     # Relationships
     tenant = relationship("Tenant", back_populates="data_fix_suggestions")
     
     __table_args__ = (
         Index('ix_data_fix_suggestions_tenant_status', 'tenant_id', 'status'),
+        Index(
+            'ix_data_fix_suggestions_pending', 'tenant_id', 'created_at',
+            postgresql_where=(status == DataFixStatus.pending),
+        ),
     )
 
     def __repr__(self):
@@ -1,14 +1,10 @@
-from datetime import datetime, timezone
 from decimal import Decimal
 from enum import Enum as PyEnum
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, Enum, Index, JSON, Boolean, Table, Text, func
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, Enum, Index, JSON, Boolean, Table, Text, func, Computed, CheckConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.db import Base
-
-
-def utc_now():
-    """Return timezone-aware UTC datetime."""
-    return datetime.now(timezone.utc)
+from ._types import CurrencyCode
 
 
 class DealStatus(str, PyEnum):
@@ -32,16 +28,17 @@ class Deal(Base):
 
     __tablename__ = "deals"
 
-    id = Column(Integer, primary_key=True, index=True)
-    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
-    client_id = Column(Integer, ForeignKey("clients.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    client_id = Column(Integer, ForeignKey("clients.id", ondelete="CASCADE"), nullable=False)
     
     title = Column(String, nullable=False)
     
     total_price = Column(Numeric(precision=18, scale=2), default=Decimal("0"), nullable=False)
     total_cost = Column(Numeric(precision=18, scale=2), default=Decimal("0"), nullable=False)
-    margin = Column(Numeric(precision=18, scale=2), default=Decimal("0"), nullable=False)
-    currency = Column(String, default="KZT")
+    # Generated by the database from the totals; never assign it from Python
+    margin = Column(Numeric(precision=18, scale=2), Computed("total_price - total_cost", persisted=True))
+    currency = Column(CurrencyCode, default="KZT")
     
     status = Column(Enum(DealStatus), default=DealStatus.new, nullable=False, index=True)
     
@@ -54,12 +51,12 @@ class Deal(Base):
     is_available_to_all = Column(Boolean, default=True, nullable=False)
     responsible_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
     comments = Column(Text, nullable=True)
-    recurring_settings = Column(JSON, nullable=True)  # Store recurring deal settings
+    recurring_settings = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)  # Store recurring deal settings
     
-    extra_data = Column(JSON, nullable=True)
+    extra_data = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=utc_now)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     closed_at = Column(DateTime(timezone=True), nullable=True)
 
 
@@ -72,9 +69,26 @@ class Deal(Base):
     __table_args__ = (
         Index('ix_deals_tenant_status', 'tenant_id', 'status'),
         Index('ix_deals_tenant_created', 'tenant_id', 'created_at'),
+        # BRIN for time-window scans over the append-only created_at column
+        Index('ix_deals_created_brin', 'created_at', postgresql_using='brin', postgresql_with={'pages_per_range': 32}).ddl_if(dialect='postgresql'),
         Index('ix_deals_client', 'client_id'),
+        CheckConstraint('total_price >= 0', name='ck_deals_total_price_nonnegative'),
+        # Closed-deal range scans for revenue/COGS aggregates (see finance.aggregate_revenue_and_cogs)
+        Index(
+            'ix_deals_tenant_closed_final', 'tenant_id', 'closed_at',
+            postgresql_where=(status == DealStatus.final_account),
+        ),
+        Index(
+            'ix_deals_recurring_gin', 'recurring_settings',
+            postgresql_using='gin',
+            postgresql_ops={'recurring_settings': 'jsonb_path_ops'},
+        ).ddl_if(dialect='postgresql'),
     )
 
+    # Fetch margin (and other server-generated values) via RETURNING on every flush,
+    # so it is never left expired for an async attribute load
+    __mapper_args__ = {"eager_defaults": True}
+
     def __repr__(self):
         return f"<Deal(id={self.id}, title={self.title}, status={self.status}, margin={self.margin})>"
 
@@ -82,9 +96,9 @@ class Deal(Base):
 class DealItem(Base):
     __tablename__ = "deal_items"
 
-    id = Column(Integer, primary_key=True, index=True)
-    deal_id = Column(Integer, ForeignKey("deals.id", ondelete="CASCADE"), nullable=False, index=True)
-    product_id = Column(Integer, ForeignKey("products.id", ondelete="RESTRICT"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    deal_id = Column(Integer, ForeignKey("deals.id", ondelete="CASCADE"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="RESTRICT"), nullable=False)
     
     quantity = Column(Numeric(precision=18, scale=4), nullable=False)
     
@@ -96,13 +110,14 @@ class DealItem(Base):
     
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=utc_now)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     deal = relationship("Deal", back_populates="items")
     product = relationship("Product", back_populates="deal_items")
 
     __table_args__ = (
-        Index('ix_deal_items_deal', 'deal_id'),
+        # INCLUDE lets per-deal totals be read with an index-only scan
+        Index('ix_deal_items_deal', 'deal_id', postgresql_include=['product_id', 'total_price', 'total_cost']),
         Index('ix_deal_items_product', 'product_id'),
     )
 
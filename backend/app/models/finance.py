@@ -1,31 +1,32 @@
-from datetime import datetime, date
 from decimal import Decimal
 from enum import Enum as PyEnum
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, Date, ForeignKey, Boolean, Enum, JSON, Index
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, Date, ForeignKey, Boolean, Enum, JSON, Index, MetaData, Table, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.db import Base
+from ._types import CurrencyCode
 
 
 class Expense(Base):
     __tablename__ = "expenses"
 
-    id = Column(Integer, primary_key=True, index=True)
-    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     
 
     amount = Column(Numeric(precision=18, scale=2), nullable=False)
-    currency = Column(String, default="KZT")
+    currency = Column(CurrencyCode, default="KZT")
     category = Column(String, nullable=False, index=True)
     description = Column(String, nullable=True)
-    date = Column(Date, nullable=False, index=True)
+    date = Column(Date, nullable=False)
     days_until_payment = Column(Integer, nullable=True)
     
     is_fixed = Column(Boolean, default=False)
     
-    extra_data = Column(JSON, nullable=True)
+    extra_data = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     tenant = relationship("Tenant", back_populates="expenses")
     user = relationship("User", back_populates="expenses")
@@ -34,6 +35,9 @@ class Expense(Base):
     __table_args__ = (
         Index('ix_expenses_tenant_date', 'tenant_id', 'date'),
         Index('ix_expenses_tenant_category', 'tenant_id', 'category'),
+        # BRIN for date-range scans; rows arrive roughly in date/insert order
+        Index('ix_expenses_date_brin', 'date', postgresql_using='brin', postgresql_with={'pages_per_range': 32}).ddl_if(dialect='postgresql'),
+        Index('ix_expenses_created_brin', 'created_at', postgresql_using='brin', postgresql_with={'pages_per_range': 32}).ddl_if(dialect='postgresql'),
     )
 
     def __repr__(self):
@@ -43,15 +47,15 @@ class Expense(Base):
 class FinancialSettings(Base):
     __tablename__ = "financial_settings"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), unique=True, nullable=False)
     
     tax_rate = Column(Numeric(precision=5, scale=2), default=Decimal("0.00"))
     
-    currency = Column(String, default="KZT")
+    currency = Column(CurrencyCode, default="KZT")
     fiscal_year_start_month = Column(Integer, default=1)
     
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     def __repr__(self):
         return f"<FinancialSettings(tenant_id={self.tenant_id}, tax_rate={self.tax_rate})>"
@@ -67,8 +71,8 @@ class AllocationType(str, PyEnum):
 class AllocationRule(Base):
     __tablename__ = "allocation_rules"
 
-    id = Column(Integer, primary_key=True, index=True)
-    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
     
 
     name = Column(String, nullable=False)
@@ -77,11 +81,34 @@ class AllocationRule(Base):
     
     is_active = Column(Boolean, default=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     __table_args__ = (
         Index('ix_allocation_rules_tenant', 'tenant_id'),
     )
 
     def __repr__(self):
-        return f"<AllocationRule(id={self.id}, name={self.name}, type={self.allocation_type})>"
\ No newline at end of file
+        return f"<AllocationRule(id={self.id}, name={self.name}, type={self.allocation_type})>"
+
+
+class DailyRollup(Base):
+    """
+    Read-only view over mv_daily_rollup: per-tenant daily totals of non-cancelled
+    deals (by UTC created_at day) and expenses (by date). PostgreSQL only; the view
+    is created by migrations (create_all schemas lack it) and refreshed by the
+    maintenance_tasks.refresh_daily_rollup beat task, so it can lag writes by up to a minute.
+    """
+    # Own MetaData so create_all never tries to create the view as a table
+    __table__ = Table(
+        "mv_daily_rollup",
+        MetaData(),
+        Column("tenant_id", Integer, primary_key=True),
+        Column("day", Date, primary_key=True),
+        Column("revenue", Numeric(precision=18, scale=2), nullable=False),
+        Column("cogs", Numeric(precision=18, scale=2), nullable=False),
+        Column("orders", Integer, nullable=False),
+        Column("expenses", Numeric(precision=18, scale=2), nullable=False),
+    )
+
+    def __repr__(self):
+        return f"<DailyRollup(tenant_id={self.tenant_id}, day={self.day}, revenue={self.revenue})>"
@@ -1,8 +1,8 @@
-from datetime import datetime
 from enum import Enum
 
 from sqlalchemy import (
     Column,
+    Enum as SAEnum,
     Integer,
     String,
     DateTime,
@@ -10,6 +10,7 @@ from sqlalchemy import (
     Index,
     JSON,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -33,7 +34,7 @@ class LeadPriority(str, Enum):
 class Lead(Base):
     __tablename__ = "leads"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
 
     tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
 
@@ -45,15 +46,16 @@ class Lead(Base):
     goal = Column(String(512), nullable=True)
     product_interest = Column(String(256), nullable=True)
 
-    status = Column(String(32), nullable=False, default=LeadStatus.new.value, index=True)
-    priority = Column(String(16), nullable=True, default=LeadPriority.medium.value, index=True)
+    # Native PostgreSQL enums: 4 bytes per value instead of a varchar
+    status = Column(SAEnum(LeadStatus, name="lead_status"), nullable=False, default=LeadStatus.new, index=True)
+    priority = Column(SAEnum(LeadPriority, name="lead_priority"), nullable=True, default=LeadPriority.medium, index=True)
 
     responsible_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
 
     notes = Column(String(2000), nullable=True)
-    extra_data = Column(JSON, nullable=True)
+    extra_data = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     closed_at = Column(DateTime(timezone=True), nullable=True, index=True)
     tenant = relationship("Tenant", back_populates="leads")
@@ -63,6 +65,8 @@ class Lead(Base):
     __table_args__ = (
         Index("ix_leads_tenant_status", "tenant_id", "status"),
         Index("ix_leads_tenant_responsible", "tenant_id", "responsible_id"),
+        # BRIN for time-window scans over the append-only created_at column
+        Index("ix_leads_created_brin", "created_at", postgresql_using="brin", postgresql_with={"pages_per_range": 32}).ddl_if(dialect="postgresql"),
     )
 
     def __repr__(self) -> str:
@@ -1,16 +1,16 @@
-from datetime import datetime, date
 from decimal import Decimal
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, Index, JSON, Date, UniqueConstraint
-from sqlalchemy.dialects.postgresql import ARRAY
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, Index, JSON, Date, MetaData, Table, UniqueConstraint, select, func
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.orm import relationship, column_property
 from app.db import Base
+from ._types import CurrencyCode
 
 
 class Product(Base):
     __tablename__ = "products"
 
-    id = Column(Integer, primary_key=True, index=True)
-    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
     
     sku = Column(String, nullable=True, index=True)
     title = Column(String, nullable=False)
@@ -19,13 +19,13 @@ class Product(Base):
     
     default_cost = Column(Numeric(precision=18, scale=2), nullable=True)
     default_price = Column(Numeric(precision=18, scale=2), nullable=True)
-    currency = Column(String, default="KZT")
+    currency = Column(CurrencyCode, default="KZT")
     
-    images = Column(JSON, nullable=True)
-    extra_data = Column(JSON, nullable=True)
+    images = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
+    extra_data = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
     tenant = relationship("Tenant", back_populates="products")
@@ -38,18 +38,13 @@ class Product(Base):
     __table_args__ = (
         Index('ix_products_tenant_sku', 'tenant_id', 'sku'),
         Index('ix_products_tenant_category', 'tenant_id', 'category'),
+        # Trigram indexes serve ILIKE '%...%' substring searches (pg_trgm)
+        Index('ix_products_title_trgm', 'title', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        Index('ix_products_sku_trgm', 'sku', postgresql_using='gin', postgresql_ops={'sku': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
     )
 
-    @property
-    def quantity(self) -> Decimal:
-        """
-        Total quantity across all inventory locations.
-        """
-        total = Decimal("0")
-        for inv in self.inventory_records:
-            total += inv.quantity
-        return total
-    
+    # quantity: total across all inventory locations, mapped below once Inventory exists
+
     def __repr__(self):
         return f"<Product(id={self.id}, sku={self.sku}, title={self.title})>"
 
@@ -57,7 +52,7 @@ class Product(Base):
 class Inventory(Base):
     __tablename__ = "inventory"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
     location = Column(String, nullable=True)
     
@@ -65,39 +60,49 @@ class Inventory(Base):
     reserved = Column(Numeric(precision=18, scale=4), default=Decimal("0"), nullable=False)
     
 
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     product = relationship("Product", back_populates="inventory_records")
 
     __table_args__ = (
         UniqueConstraint('product_id', 'location', name='uq_product_location'),
-        Index('ix_inventory_product', 'product_id'),
+        # Covers the Product.quantity aggregate (index-only scan)
+        Index('ix_inventory_product_qty', 'product_id', 'quantity'),
     )
 
     def __repr__(self):
         return f"<Inventory(product_id={self.product_id}, location={self.location}, qty={self.quantity})>"
 
 
+# Total quantity across all inventory locations, summed in SQL as part of the product row
+Product.quantity = column_property(
+    select(func.coalesce(func.sum(Inventory.quantity), 0))
+    .where(Inventory.product_id == Product.id)
+    .correlate_except(Inventory)
+    .scalar_subquery()
+)
+
+
 class InventoryItem(Base):
     __tablename__ = "inventory_items"
 
-    id = Column(Integer, primary_key=True, index=True)
-    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True)
-    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
     
     quantity = Column(Numeric(precision=18, scale=4), nullable=False)
     remaining_quantity = Column(Numeric(precision=18, scale=4), nullable=False)
     
     unit_cost = Column(Numeric(precision=18, scale=2), nullable=False)
-    currency = Column(String, default="KZT")
+    currency = Column(CurrencyCode, default="KZT")
     
-    received_date = Column(Date, nullable=False, index=True)
+    received_date = Column(Date, nullable=False)
     supplier_id = Column(Integer, ForeignKey("suppliers.id", ondelete="SET NULL"), nullable=True)
     reference = Column(String, nullable=True)
     location = Column(String, nullable=True)
     
 
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     product = relationship("Product", back_populates="inventory_items")
     tenant = relationship("Tenant", back_populates="inventory_items")
@@ -106,8 +111,31 @@ class InventoryItem(Base):
 
     __table_args__ = (
         Index('ix_inventory_items_product_date', 'product_id', 'received_date'),
+        Index('ix_inventory_items_received_brin', 'received_date', postgresql_using='brin', postgresql_with={'pages_per_range': 32}).ddl_if(dialect='postgresql'),
         Index('ix_inventory_items_tenant', 'tenant_id'),
     )
 
     def __repr__(self):
-        return f"<InventoryItem(id={self.id}, product_id={self.product_id}, remaining={self.remaining_quantity}, cost={self.unit_cost})>"
\ No newline at end of file
+        return f"<InventoryItem(id={self.id}, product_id={self.product_id}, remaining={self.remaining_quantity}, cost={self.unit_cost})>"
+
+
+class ProductStock(Base):
+    """
+    Read-only view over mv_product_stock: per-product totals of FIFO lots.
+    PostgreSQL only; the view is created by migrations and refreshed by the
+    maintenance_tasks.refresh_product_stock beat task, so it can lag writes by up
+    to a minute.
+    """
+    # Own MetaData so create_all never tries to create the view as a table
+    __table__ = Table(
+        "mv_product_stock",
+        MetaData(),
+        Column("product_id", Integer, primary_key=True),
+        Column("tenant_id", Integer, nullable=False),
+        Column("remaining_quantity", Numeric(precision=18, scale=4), nullable=False),
+        Column("quantity", Numeric(precision=18, scale=4), nullable=False),
+        Column("stock_value", Numeric(precision=18, scale=2), nullable=False),
+    )
+
+    def __repr__(self):
+        return f"<ProductStock(product_id={self.product_id}, remaining={self.remaining_quantity})>"
@@ -1,21 +1,23 @@
-from datetime import datetime, date
 from decimal import Decimal
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, Date, ForeignKey, JSON, Index
+from enum import Enum as PyEnum
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, Date, ForeignKey, Enum, JSON, Index, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.db import Base
+from ._types import CurrencyCode
 
 class Supplier(Base):
     __tablename__ = "suppliers"
 
-    id = Column(Integer, primary_key=True, index=True)
-    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
 
     name = Column(String, nullable=False)
-    contact = Column(JSON, nullable=True)
+    contact = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
     rating = Column(Numeric(precision=3, scale=2), nullable=True)
     lead_time_days = Column(Integer, nullable=True)
 
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     tenant = relationship("Tenant", back_populates="suppliers")
     offers = relationship("SupplierOffer", back_populates="supplier", cascade="all, delete-orphan")
@@ -24,6 +26,7 @@ class Supplier(Base):
 
     __table_args__ = (
         Index('ix_suppliers_tenant', 'tenant_id'),
+        Index('ix_suppliers_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
     )
 
     def __repr__(self):
@@ -33,18 +36,18 @@ class SupplierOffer(Base):
 
     __tablename__ = "supplier_offers"
 
-    id = Column(Integer, primary_key=True, index=True)
-    supplier_id = Column(Integer, ForeignKey("suppliers.id", ondelete="CASCADE"), nullable=False, index=True)
-    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    supplier_id = Column(Integer, ForeignKey("suppliers.id", ondelete="CASCADE"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
 
     price = Column(Numeric(precision=18, scale=2), nullable=False)
-    currency = Column(String, default="CNY")
+    currency = Column(CurrencyCode, default="CNY")
     moq = Column(Integer, nullable=True)
     lead_time_days = Column(Integer, nullable=True)
 
     valid_until = Column(Date, nullable=True)
 
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     supplier = relationship("Supplier", back_populates="offers")
     product = relationship("Product", back_populates="supplier_offers")
@@ -57,23 +60,31 @@ class SupplierOffer(Base):
     def __repr__(self):
         return f"<SupplierOffer(id={self.id}, supplier_id={self.supplier_id}, product_id={self.product_id}, price={self.price})>"
 
+class PurchaseOrderStatus(str, PyEnum):
+    pending = "pending"
+    ordered = "ordered"
+    shipped = "shipped"
+    received = "received"
+    cancelled = "cancelled"
+
+
 class PurchaseOrder(Base):
 
     __tablename__ = "purchase_orders"
 
-    id = Column(Integer, primary_key=True, index=True)
-    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
-    supplier_id = Column(Integer, ForeignKey("suppliers.id", ondelete="RESTRICT"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    supplier_id = Column(Integer, ForeignKey("suppliers.id", ondelete="RESTRICT"), nullable=False)
 
     reference = Column(String, nullable=True)
     total_amount = Column(Numeric(precision=18, scale=2), default=Decimal("0"))
-    currency = Column(String, default="CNY")
-    status = Column(String, default="pending")
+    currency = Column(CurrencyCode, default="CNY")
+    status = Column(Enum(PurchaseOrderStatus, name="purchase_order_status"), default=PurchaseOrderStatus.pending)
 
     eta = Column(String, nullable=True)
 
-    created_at = Column(DateTime, default=datetime.utcnow)
-    received_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    received_at = Column(DateTime(timezone=True), nullable=True)
 
     tenant = relationship("Tenant", back_populates="purchase_orders")
     supplier = relationship("Supplier", back_populates="purchase_orders")
@@ -82,6 +93,7 @@ class PurchaseOrder(Base):
     __table_args__ = (
         Index('ix_purchase_orders_tenant', 'tenant_id'),
         Index('ix_purchase_orders_supplier', 'supplier_id'),
+        Index('ix_purchase_orders_created_brin', 'created_at', postgresql_using='brin', postgresql_with={'pages_per_range': 32}).ddl_if(dialect='postgresql'),
     )
 
     def __repr__(self):
@@ -91,19 +103,19 @@ class PurchaseOrderItem(Base):
 
     __tablename__ = "purchase_order_items"
 
-    id = Column(Integer, primary_key=True, index=True)
-    purchase_order_id = Column(Integer, ForeignKey("purchase_orders.id", ondelete="CASCADE"), nullable=False, index=True)
-    product_id = Column(Integer, ForeignKey("products.id", ondelete="RESTRICT"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    purchase_order_id = Column(Integer, ForeignKey("purchase_orders.id", ondelete="CASCADE"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="RESTRICT"), nullable=False)
 
     qty = Column(Integer, nullable=False)
     unit_price = Column(Numeric(precision=18, scale=2), nullable=False)
-    currency = Column(String, default="CNY")
+    currency = Column(CurrencyCode, default="CNY")
 
     purchase_order = relationship("PurchaseOrder", back_populates="items")
     product = relationship("Product", back_populates="purchase_order_items")
 
     __table_args__ = (
-        Index('ix_purchase_order_items_po', 'purchase_order_id'),
+        Index('ix_purchase_order_items_po', 'purchase_order_id', postgresql_include=['product_id', 'qty', 'unit_price']),
         Index('ix_purchase_order_items_product', 'product_id'),
     )
 
@@ -1,8 +1,8 @@
-from datetime import datetime
 from enum import Enum as PyEnum
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index, Table, CheckConstraint, func
 from sqlalchemy.orm import relationship
 from app.db import Base
+from ._types import CurrencyCode
 
 
 class UserRole(str, PyEnum):
@@ -16,19 +16,21 @@ user_tenant_association = Table(
     Base.metadata,
     Column('user_id', Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
     Column('tenant_id', Integer, ForeignKey('tenants.id', ondelete='CASCADE'), primary_key=True),
+    # The (user_id, tenant_id) primary key cannot serve tenant -> users lookups
+    Index('ix_uta_tenant_user', 'tenant_id', 'user_id'),
 )
 
 
 class Tenant(Base):
     __tablename__ = "tenants"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
     code = Column(String, unique=True, nullable=False, index=True)
     timezone = Column(String, nullable=True)
-    currency = Column(String, default="KZT")
+    currency = Column(CurrencyCode, default="KZT")
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 
     users = relationship("User", secondary=user_tenant_association, back_populates="tenants")
@@ -45,6 +47,9 @@ class Tenant(Base):
     copilot_conversations = relationship("CopilotConversation", back_populates="tenant", cascade="all, delete-orphan")
     data_fix_suggestions = relationship("DataFixSuggestion", back_populates="tenant", cascade="all, delete-orphan")
 
+    # Fetch created_at via RETURNING so it is loaded for async serialization
+    __mapper_args__ = {"eager_defaults": True}
+
     def __repr__(self):
         return f"<Tenant(id={self.id}, name={self.name}, code={self.code})>"
 
@@ -52,16 +57,18 @@ class Tenant(Base):
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     email = Column(String, unique=True, nullable=False, index=True)
     full_name = Column(String, nullable=True)
     hashed_password = Column(String, nullable=True)
-    role = Column(Enum(UserRole), default=UserRole.manager)
+    # Plain string so rows load without enum coercion; UserRole is enforced by the check constraint
+    role = Column(String(16), default=UserRole.manager.value, nullable=False)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 
-    tenants = relationship("Tenant", secondary=user_tenant_association, back_populates="users")
+    # Nearly every request resolves the active tenant from the user, so load it with the user
+    tenants = relationship("Tenant", secondary=user_tenant_association, back_populates="users", lazy="selectin")
     expenses = relationship("Expense", back_populates="user")
     observed_deals = relationship("Deal", secondary="deal_observer_association", back_populates="observers")
     
@@ -69,5 +76,15 @@ class User(Base):
     copilot_documents = relationship("Document", back_populates="user")
     copilot_conversations = relationship("CopilotConversation", back_populates="user", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        CheckConstraint(
+            "role IN (%s)" % ", ".join(f"'{r.value}'" for r in UserRole),
+            name="users_role_check",
+        ),
+    )
+
+    # Fetch created_at via RETURNING so it is loaded for async serialization
+    __mapper_args__ = {"eager_defaults": True}
+
     def __repr__(self):
         return f"<User(id={self.id}, email={self.email}, role={self.role})>"
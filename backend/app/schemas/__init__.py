@@ -19,7 +19,7 @@ from .products import (
 from .deals import (
     DealItemBase, DealItemCreate, DealItemUpdate, DealItemRead,
     DealBase, DealCreate, DealUpdate, DealRead,
-    DealProfitAnalysis
+    DealProfitAnalysis, DEAL_LIST_ADAPTER
 )
 from .finance import (
     ExpenseBase, ExpenseCreate, ExpenseUpdate, ExpenseRead,
@@ -44,7 +44,7 @@ __all__ = [
     # Deals
     "DealItemBase", "DealItemCreate", "DealItemUpdate", "DealItemRead",
     "DealBase", "DealCreate", "DealUpdate", "DealRead",
-    "DealProfitAnalysis",
+    "DealProfitAnalysis", "DEAL_LIST_ADAPTER",
     
     # Finance
     "ExpenseBase", "ExpenseCreate", "ExpenseUpdate", "ExpenseRead",
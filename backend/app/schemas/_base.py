@@ -0,0 +1,14 @@
+# app/schemas/_base.py
+"""
+Base classes shared by schema modules.
+"""
+from pydantic import BaseModel, ConfigDict
+
+
+class ORMModel(BaseModel):
+    """Base for schemas read from SQLAlchemy objects.
+
+    Instances are immutable once validated; build a new one with
+    ``model_copy(update=...)`` instead of assigning to fields.
+    """
+    model_config = ConfigDict(from_attributes=True, extra='ignore', frozen=True)
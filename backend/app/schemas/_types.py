@@ -0,0 +1,35 @@
+# app/schemas/_types.py
+"""
+Annotated field types shared across schema modules.
+Declaring them once lets every model reuse the same validator.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Annotated, Literal, Optional
+from pydantic import BeforeValidator, EmailStr, PlainSerializer
+
+Email = EmailStr
+OptionalEmail = Optional[EmailStr]
+
+# Same codes as models._types.CURRENCY_CODES; validated by pydantic-core's literal lookup
+Currency = Literal['KZT', 'USD', 'EUR', 'RUB', 'CNY']
+
+
+_CENT = Decimal("0.01")
+
+
+def _cents_in(v):
+    """Amount in currency units (Decimal, int, float or str) -> int minor units."""
+    if v is None or isinstance(v, bool):
+        return v
+    if not isinstance(v, Decimal):
+        v = Decimal(str(v))
+    return int(v.quantize(_CENT, rounding=ROUND_HALF_UP).scaleb(2))
+
+
+def _cents_out(v: int) -> Decimal:
+    # scaleb keeps two decimal places, so 0 serializes as "0.00" like the DB values did
+    return Decimal(v).scaleb(-2)
+
+
+# Money held as int cents inside response models, serialized back to a 2-place Decimal
+Money = Annotated[int, BeforeValidator(_cents_in), PlainSerializer(_cents_out, return_type=Decimal)]
@@ -1,37 +1,41 @@
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, EmailStr, ConfigDict
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from ._base import ORMModel
+from ._types import OptionalEmail
 
 
 class ClientBase(BaseModel):
     name: str
     company: Optional[str] = None
-    email: Optional[EmailStr] = None
+    email: OptionalEmail = None
     phone: Optional[str] = None
     address: Optional[str] = None
 
 
 class ClientCreate(ClientBase):
-    metadata: Optional[dict] = None  
-    extra_data: Optional[dict] = None  
+    # Still accepted as "metadata" in request bodies; the attribute name avoids
+    # colliding with the metadata naming used by the ORM layer
+    model_config = ConfigDict(populate_by_name=True)
+
+    client_metadata: Optional[Dict[str, Any]] = Field(None, alias="metadata")
+    extra_data: Optional[Dict[str, Any]] = None
 
 
 class ClientUpdate(BaseModel):
     name: Optional[str] = None
     company: Optional[str] = None
-    email: Optional[EmailStr] = None
+    email: OptionalEmail = None
     phone: Optional[str] = None
     address: Optional[str] = None
-    extra_data: Optional[dict] = None
+    extra_data: Optional[Dict[str, Any]] = None
 
 
-class ClientRead(ClientBase):
+class ClientRead(ClientBase, ORMModel):
     id: int
     tenant_id: int
     external_id: Optional[str] = None
-    extra_data: Optional[dict] = None
+    extra_data: Optional[Dict[str, Any]] = None
     deals_count: Optional[int] = 0
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
-    
-    model_config = ConfigDict(from_attributes=True)
@@ -1,36 +1,49 @@
 from datetime import datetime, date as date_type
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 from typing import Optional, Union
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, computed_field
+from ._base import ORMModel
+from ._types import Currency, Money
+
+
+_CENT = Decimal("0.01")
+
+
+def _round_cents(v: Decimal) -> int:
+    return int(v.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def _pct(part: int, whole: int) -> Decimal:
+    if whole <= 0:
+        return Decimal("0.00")
+    return (Decimal(part) / whole * 100).quantize(_CENT, rounding=ROUND_HALF_UP)
 
 class ExpenseBase(BaseModel):
     amount: Decimal = Field(..., gt=0, description="Expense amount (2 decimal places)")
     currency: str = "KZT"
-    category: str = Field(..., description="Expense category: rent, salaries, marketing, utilities, etc.")
+    category: str  # rent, salaries, marketing, utilities, ...
     description: Optional[str] = None
     date: date_type
-    days_until_payment: Optional[int] = Field(None, description="Number of days until payment is due")
-    is_fixed: bool = Field(False, description="True for fixed costs (rent, salaries), False for variable")
+    days_until_payment: Optional[int] = None
+    is_fixed: bool = False  # rent, salaries vs. variable costs
 
 class ExpenseCreate(ExpenseBase):
-    pass
+    currency: Currency = "KZT"
 
 class ExpenseUpdate(BaseModel):
     amount: Optional[Decimal] = Field(None, gt=0, description="Expense amount (2 decimal places)")
-    currency: Optional[str] = None
+    currency: Optional[Currency] = None
     category: Optional[str] = None
     description: Optional[str] = None
     date: Union[date_type, None] = None
     days_until_payment: Optional[int] = None
     is_fixed: Optional[bool] = None
 
-class ExpenseRead(ExpenseBase):
+class ExpenseRead(ExpenseBase, ORMModel):
     id: int
     tenant_id: int
     user_id: Optional[int] = None
     created_at: Optional[datetime] = None
-    
-    model_config = ConfigDict(from_attributes=True)
 
 
 class FinancialSettingsBase(BaseModel):
@@ -41,37 +54,66 @@ class FinancialSettingsBase(BaseModel):
 
 class FinancialSettingsCreate(BaseModel):
     tax_rate: Optional[Decimal] = Field(None, ge=0, le=100, description="Tax rate as percentage (2 decimal places)")
-    currency: Optional[str] = None
+    currency: Optional[Currency] = None
 
 
-class FinancialSettingsRead(FinancialSettingsBase):
+class FinancialSettingsRead(FinancialSettingsBase, ORMModel):
     id: int
     tenant_id: int
     updated_at: Optional[datetime] = None
-    model_config = ConfigDict(from_attributes=True)
-
-class FinanceDashboard(BaseModel):
-    revenue: Decimal = Field(..., description="Total revenue from deals (2 decimal places)")
-    cogs: Decimal = Field(..., description="Cost of Goods Sold (2 decimal places)")
-    gross_profit: Decimal = Field(..., description="Revenue - COGS (2 decimal places)")
-    gross_margin_pct: Decimal = Field(..., description="Gross profit margin percentage (2 decimal places)")
-    
-    opex: Decimal = Field(..., description="Operating expenses (OPEX) (2 decimal places)")
-    
-    ebit: Decimal = Field(..., description="Earnings Before Interest and Taxes (2 decimal places)")
-    taxes_percent: Decimal = Field(..., description="Tax rate applied (2 decimal places)")
-    taxes: Decimal = Field(..., description="Tax amount (2 decimal places)")
-    
-    total_expenses: Decimal = Field(..., description="Total expenses (COGS + OPEX + Fixed) (2 decimal places)")
-    net_profit: Decimal = Field(..., description="Net profit after all expenses and taxes (2 decimal places)")
-    net_margin_pct: Decimal = Field(..., description="Net profit margin percentage (2 decimal places)")
-    
-    fixed_costs: Decimal = Field(..., description="Fixed costs (2 decimal places)")
-    variable_costs: Decimal = Field(..., description="Variable costs (2 decimal places)")
-
-    break_even_revenue: Optional[Decimal] = Field(None, description="Revenue needed to break even (2 decimal places)")
-    
-    model_config = ConfigDict(from_attributes=True)
+
+class FinanceDashboard(ORMModel):
+    # Only the base quantities are validated; the derived figures below are computed
+    # from them (same formulas and rounding as app.finance.calculate_financials)
+    revenue: Money
+    cogs: Money
+    opex: Money
+    taxes_percent: Decimal
+    # COGS + OPEX + manual fixed costs; the manual part is not recoverable from fixed_costs
+    total_expenses: Money
+    fixed_costs: Money
+    variable_costs: Money
+
+    @computed_field
+    @property
+    def gross_profit(self) -> Money:
+        return self.revenue - self.cogs
+
+    @computed_field
+    @property
+    def gross_margin_pct(self) -> Decimal:
+        return _pct(self.gross_profit, self.revenue)
+
+    @computed_field
+    @property
+    def ebit(self) -> Money:
+        return self.gross_profit - self.opex
+
+    @computed_field
+    @property
+    def taxes(self) -> Money:
+        if self.ebit > 0 and self.taxes_percent > 0:
+            return _round_cents(self.ebit * self.taxes_percent / 100)
+        return 0
+
+    @computed_field
+    @property
+    def net_profit(self) -> Money:
+        return self.revenue - self.total_expenses - self.taxes
+
+    @computed_field
+    @property
+    def net_margin_pct(self) -> Decimal:
+        return _pct(self.net_profit, self.revenue)
+
+    @computed_field
+    @property
+    def break_even_revenue(self) -> Optional[Money]:
+        # fixed costs / contribution margin ratio
+        contribution_margin = self.revenue - self.variable_costs
+        if self.revenue <= 0 or contribution_margin <= 0:
+            return None
+        return _round_cents(self.fixed_costs / (Decimal(contribution_margin) / self.revenue))
 
 class MonthlyFinanceRequest(BaseModel):
     tenant_id: int
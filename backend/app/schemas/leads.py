@@ -1,7 +1,8 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional, List
-from pydantic import BaseModel, Field, ConfigDict
+from typing import Any, Dict, Optional, List
+from pydantic import BaseModel, Field
+from ._base import ORMModel
 
 class LeadBase(BaseModel):
     client_id: int
@@ -13,7 +14,7 @@ class LeadBase(BaseModel):
     status: Optional[str] = Field("new", description="new, in_work, qualified, lost")
     responsible_id: Optional[int] = None
     notes: Optional[str] = None
-    extra_data: Optional[dict] = None
+    extra_data: Optional[Dict[str, Any]] = None
 
 class LeadCreate(LeadBase):
     pass
@@ -27,15 +28,13 @@ class LeadUpdate(BaseModel):
     status: Optional[str] = None
     responsible_id: Optional[int] = None
     notes: Optional[str] = None
-    extra_data: Optional[dict] = None
+    extra_data: Optional[Dict[str, Any]] = None
 
-class LeadRead(LeadBase):
+class LeadRead(LeadBase, ORMModel):
     id: int
     tenant_id: int
     created_at: datetime
     updated_at: datetime
-    
-    model_config = ConfigDict(from_attributes=True)
 
 
     
\ No newline at end of file
@@ -1,7 +1,9 @@
 from datetime import datetime, date
 from decimal import Decimal
 from typing import Optional, List
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field
+from ._base import ORMModel
+from ._types import Currency
 
 class ProductBase(BaseModel):
     sku: Optional[str] = None
@@ -15,7 +17,7 @@ class ProductBase(BaseModel):
 
 
 class ProductCreate(ProductBase):
-    pass
+    currency: Currency = "KZT"
 
 
 class ProductUpdate(BaseModel):
@@ -25,18 +27,16 @@ class ProductUpdate(BaseModel):
     category: Optional[str] = None
     default_cost: Optional[Decimal] = Field(None)
     default_price: Optional[Decimal] = Field(None)
-    currency: Optional[str] = None
+    currency: Optional[Currency] = None
     images: Optional[List[str]] = None
 
 
-class ProductRead(ProductBase):
+class ProductRead(ProductBase, ORMModel):
     id: int
     tenant_id: int
     quantity: Decimal = Field(default=Decimal("0"), description="Total quantity in stock across all locations")
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
-    
-    model_config = ConfigDict(from_attributes=True)
 
 
 class InventoryItemBase(BaseModel):
@@ -51,30 +51,25 @@ class InventoryItemBase(BaseModel):
 
 class InventoryItemCreate(InventoryItemBase):
     product_id: int
+    currency: Currency = "KZT"
 
 
-class InventoryItemRead(InventoryItemBase):
+class InventoryItemRead(InventoryItemBase, ORMModel):
     id: int
     product_id: int
     tenant_id: int
     remaining_quantity: Decimal = Field(..., description="Quantity still available for FIFO")
     created_at: Optional[datetime] = None
-    
-    model_config = ConfigDict(from_attributes=True)
 
 
-class InventoryRead(BaseModel):
+class InventoryRead(ORMModel):
     id: int
     product_id: int
     location: Optional[str] = None
     quantity: Decimal = Field(..., description="Total quantity in stock")
     reserved: Decimal = Field(..., description="Quantity reserved for orders")
     updated_at: Optional[datetime] = None
-    
-    model_config = ConfigDict(from_attributes=True)
 
 
 class InventoryWithHistory(InventoryRead):
     receipts: List[InventoryItemRead] = Field(default_factory=list, description="Inventory receipt history")
-    
-    model_config = ConfigDict(from_attributes=True)
@@ -1,12 +1,33 @@
 from datetime import datetime  
 from typing import Optional, List
-from pydantic import BaseModel, EmailStr, ConfigDict
+from pydantic import BaseModel
+from app.models.users import UserRole
+from ._base import ORMModel
+from ._types import Currency, Email
+
+
+class TenantBase(BaseModel):
+    name: str
+    timezone: Optional[str] = None
+    currency: str = "KZT"
+
+
+class TenantCreate(TenantBase):
+    code: Optional[str] = None  
+    currency: Currency = "KZT"
+
+
+class TenantRead(TenantBase, ORMModel):
+    id: int
+    code: str
+    is_active: bool
+    created_at: Optional[datetime] = None
 
 
 class UserBase(BaseModel):
-    email: EmailStr
+    email: Email
     full_name: Optional[str] = None
-    role: str = "manager"  
+    role: UserRole = UserRole.manager
 
 
 class UserCreate(UserBase):
@@ -15,46 +36,19 @@ class UserCreate(UserBase):
 
 class UserUpdate(BaseModel):
     full_name: Optional[str] = None
-    role: Optional[str] = None
+    role: Optional[UserRole] = None
     is_active: Optional[bool] = None
 
 
-class UserRead(UserBase):
+class UserRead(UserBase, ORMModel):
     id: int
     is_active: bool
     created_at: Optional[datetime] = None
-    tenants: Optional[List["TenantRead"]] = None
-    
-    model_config = ConfigDict(from_attributes=True)
+    tenants: Optional[List[TenantRead]] = None
 
 
-class UserSimple(UserBase):
+class UserSimple(UserBase, ORMModel):
     """Simplified user schema without tenants relationship for use in nested objects"""
     id: int
     is_active: bool
     created_at: Optional[datetime] = None
-    
-    model_config = ConfigDict(from_attributes=True)
-
-
-class TenantBase(BaseModel):
-    name: str
-    timezone: Optional[str] = None
-    currency: str = "KZT"
-
-
-class TenantCreate(TenantBase):
-    code: Optional[str] = None  
-
-
-class TenantRead(TenantBase):
-    id: int
-    code: str
-    is_active: bool
-    created_at: Optional[datetime] = None
-    
-    model_config = ConfigDict(from_attributes=True)
-
-
-# Rebuild models to resolve forward references
-UserRead.model_rebuild()
\ No newline at end of file
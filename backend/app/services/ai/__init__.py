@@ -13,10 +13,12 @@ This module contains all AI-related services for the Copilot feature:
 from .gemini_client import GeminiClient
 from .tool_registry import ToolRegistry, COPILOT_TOOLS
 from .copilot_service import CopilotService
+from .rag_service import RAGService
 
 __all__ = [
     "GeminiClient",
     "ToolRegistry",
     "COPILOT_TOOLS",
     "CopilotService",
+    "RAGService",
 ]
@@ -3,22 +3,35 @@
 Main orchestrator for the BIZIO AI Copilot.
 Handles conversation management, tool execution, and response formatting.
 """
+import asyncio
 import logging
-import json
+import os
 import time
-from datetime import datetime
 from typing import Dict, Any, List, Optional, AsyncGenerator
 from decimal import Decimal
-from sqlalchemy import select
+from sqlalchemy import case, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app import models
-from .gemini_client import GeminiClient, DecimalEncoder
+from .gemini_client import GeminiClient, format_tool_results
 from .tool_registry import ToolRegistry, COPILOT_TOOLS
 
 logger = logging.getLogger(__name__)
 
+# Chat history window. The first messages are always kept and the tail is trimmed
+# in whole steps, which keeps the prompt prefix identical across turns so Gemini's
+# prefix cache keeps hitting
+HISTORY_ANCHOR_MESSAGES = 2
+HISTORY_TAIL_MESSAGES = 20
+HISTORY_RESET_MESSAGES = 40
+# Estimated tokens of history per turn; messages beyond 80% of it (oldest first) are
+# dropped, leaving room for the new message and context
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "4000"))
+
+# Cited sources returned with an answer
+MAX_RESPONSE_SOURCES = 20
+
 
 class CopilotService:
     """
@@ -54,24 +67,89 @@ class CopilotService:
         await self.db.flush()
         return conversation
     
-    async def get_conversation(self, conversation_id: int) -> Optional[models.CopilotConversation]:
-        """Get a conversation by ID with messages."""
+    async def get_conversation(
+        self,
+        conversation_id: int,
+        include_messages: bool = False,
+        include_tool_invocations: bool = False
+    ) -> Optional[models.CopilotConversation]:
+        """Get a conversation by ID, optionally with all messages (and their tool invocations)."""
+        if not (include_messages or include_tool_invocations):
+            # Primary-key lookup: served from the identity map when the conversation was
+            # already loaded in this session (the API loads it before calling chat())
+            conversation = await self.db.get(models.CopilotConversation, conversation_id)
+            if conversation is None or conversation.tenant_id != self.tenant_id:
+                return None
+            return conversation
+        
+        query = select(models.CopilotConversation).where(
+            models.CopilotConversation.id == conversation_id,
+            models.CopilotConversation.tenant_id == self.tenant_id
+        )
+        messages = selectinload(models.CopilotConversation.messages)
+        if include_tool_invocations:
+            messages = messages.selectinload(models.CopilotMessage.tool_invocations)
+        query = query.options(messages)
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none()
+    
+    def _within_token_budget(self, history: List[models.CopilotMessage]) -> List[models.CopilotMessage]:
+        """Newest messages of the history whose estimated size fits the token budget."""
+        budget = HISTORY_TOKEN_BUDGET * 4 // 5
+        used = 0
+        for idx in range(len(history) - 1, -1, -1):
+            used += self.gemini.estimate_tokens(history[idx].content)
+            if used > budget:
+                return history[idx + 1:]
+        return history
+    
+    async def get_history_messages(self, conversation_id: int) -> List[models.CopilotMessage]:
+        """
+        History sent to the model, oldest first: the opening messages plus a tail whose
+        start only moves in steps, so consecutive turns share the same prompt prefix.
+        """
+        msg = models.CopilotMessage
+        numbered = (
+            select(
+                msg.id.label("id"),
+                func.row_number().over(order_by=(msg.created_at, msg.id)).label("rn"),
+                func.count().over().label("total"),
+            )
+            .where(msg.conversation_id == conversation_id)
+            .subquery()
+        )
+        anchors = HISTORY_ANCHOR_MESSAGES
+        after_anchors = numbered.c.total - anchors
+        # Messages dropped between the anchors and the tail: 0 until the tail outgrows
+        # HISTORY_RESET_MESSAGES, then advanced a whole step at a time
+        step = HISTORY_RESET_MESSAGES - HISTORY_TAIL_MESSAGES
+        dropped = case(
+            (after_anchors <= HISTORY_RESET_MESSAGES, 0),
+            else_=((after_anchors - HISTORY_TAIL_MESSAGES) // step) * step,
+        )
         query = (
-            select(models.CopilotConversation)
-            .options(selectinload(models.CopilotConversation.messages))
+            select(msg)
+            .join(numbered, msg.id == numbered.c.id)
             .where(
-                models.CopilotConversation.id == conversation_id,
-                models.CopilotConversation.tenant_id == self.tenant_id
+                msg.conversation_id == conversation_id,
+                or_(numbered.c.rn <= anchors, numbered.c.rn > anchors + dropped),
             )
+            .order_by(numbered.c.rn)
         )
         result = await self.db.execute(query)
-        return result.scalar_one_or_none()
+        return list(result.scalars().all())
     
     async def list_conversations(self, limit: int = 20) -> List[models.CopilotConversation]:
-        """List recent conversations for the user."""
+        """List recent conversations for the user, each with a `message_count` attribute."""
+        # Correlated COUNT so the list never loads message rows
+        message_count = (
+            select(func.count(models.CopilotMessage.id))
+            .where(models.CopilotMessage.conversation_id == models.CopilotConversation.id)
+            .correlate(models.CopilotConversation)
+            .scalar_subquery()
+        )
         query = (
-            select(models.CopilotConversation)
-            .options(selectinload(models.CopilotConversation.messages))
+            select(models.CopilotConversation, message_count)
             .where(
                 models.CopilotConversation.user_id == self.user_id,
                 models.CopilotConversation.tenant_id == self.tenant_id
@@ -80,7 +158,11 @@ class CopilotService:
             .limit(limit)
         )
         result = await self.db.execute(query)
-        return result.scalars().all()
+        conversations = []
+        for conversation, count in result.all():
+            conversation.message_count = count
+            conversations.append(conversation)
+        return conversations
     
     async def add_message(
         self,
@@ -92,16 +174,28 @@ class CopilotService:
         tool_results: Optional[List[Dict]] = None,
         input_tokens: int = 0,
         output_tokens: int = 0,
-        processing_time_ms: int = 0
+        processing_time_ms: int = 0,
+        conversation: Optional[models.CopilotConversation] = None
     ) -> models.CopilotMessage:
-        """Add a message to a conversation."""
+        """Add a message to a conversation (pass `conversation` if the caller already loaded it)."""
+        # tool_results[i] is the result of tool_calls[i]
+        tool_results = tool_results or []
+        tool_invocations = [
+            models.ToolInvocation(
+                conversation_id=conversation_id,
+                idx=idx,
+                name=call["name"],
+                args=call.get("arguments"),
+                result=tool_results[idx]["result"] if idx < len(tool_results) else None,
+            )
+            for idx, call in enumerate(tool_calls or [])
+        ]
         message = models.CopilotMessage(
             conversation_id=conversation_id,
             role=models.MessageRole(role),
             content=content,
             response_data=response_data,
-            tool_calls=tool_calls,
-            tool_results=tool_results,
+            tool_invocations=tool_invocations,
             input_tokens=input_tokens,
             output_tokens=output_tokens,
             processing_time_ms=processing_time_ms
@@ -110,13 +204,20 @@ class CopilotService:
         
         # Update conversation title from first user message
         if role == "user":
-            conversation = await self.get_conversation(conversation_id)
+            if conversation is None:
+                # Only the title is needed; don't pull in the messages
+                result = await self.db.execute(
+                    select(models.CopilotConversation).where(
+                        models.CopilotConversation.id == conversation_id,
+                        models.CopilotConversation.tenant_id == self.tenant_id
+                    )
+                )
+                conversation = result.scalar_one_or_none()
             if conversation and not conversation.title:
-                # Use first 50 chars of message as title
+                # Use first 50 chars of message as title (updated_at follows via onupdate)
                 conversation.title = content[:50] + ("..." if len(content) > 50 else "")
-                conversation.updated_at = datetime.utcnow()
         
-        await self.db.flush()
+        # No flush: the turn's rows are written together by the caller's commit
         return message
     
     async def chat(
@@ -142,18 +243,17 @@ class CopilotService:
                 "processing_time_ms": int
             }
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         # Get conversation with history
         conversation = await self.get_conversation(conversation_id)
         if not conversation:
             raise ValueError(f"Conversation {conversation_id} not found")
         
-        # Copy messages list to avoid lazy loading issues
-        history_messages = list(conversation.messages[-10:])  # Last 10 messages for context
+        history_messages = self._within_token_budget(await self.get_history_messages(conversation_id))
         
         # Save user message
-        await self.add_message(conversation_id, "user", user_message)
+        await self.add_message(conversation_id, "user", user_message, conversation=conversation)
         
         # Build message history for context
         messages = []
@@ -178,28 +278,26 @@ class CopilotService:
         # Execute any tool calls
         if tool_calls:
             for tool_call in tool_calls:
-                tool_name = tool_call["name"]
-                tool_args = tool_call["arguments"]
-                
-                logger.info(f"Executing tool: {tool_name} with args: {tool_args}")
-                
-                result = await self.tool_registry.execute(tool_name, tool_args)
-                tool_results.append({
-                    "tool_name": tool_name,
-                    "result": result
-                })
+                logger.info(f"Executing tool: {tool_call['name']} with args: {tool_call['arguments']}")
+            
+            # Tools are independent, so they run concurrently: wall time is the slowest one
+            results = await asyncio.gather(*self.tool_registry.start_all(tool_calls))
+            tool_results = [
+                {"tool_name": tool_call["name"], "result": result}
+                for tool_call, result in zip(tool_calls, results)
+            ]
             
             # Get final response with tool results
-            response = await self.gemini.chat_with_tool_results(
+            response = await self.gemini.chat_with_tool_results_text(
                 messages,
-                tool_results,
+                format_tool_results(tool_results),
                 tools=COPILOT_TOOLS
             )
         
         # Format response data
         response_data = self._format_response_data(response["content"], tool_results)
         
-        processing_time_ms = int((time.time() - start_time) * 1000)
+        processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
         
         # Save assistant message
         await self.add_message(
@@ -238,7 +336,7 @@ class CopilotService:
             {"type": "text", "content": str}
             {"type": "done", "response_data": {...}}
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         # Get conversation
         conversation = await self.get_conversation(conversation_id)
@@ -246,12 +344,10 @@ class CopilotService:
             yield {"type": "error", "message": "Conversation not found"}
             return
         
-        # Copy messages list to avoid lazy loading issues
-        history_messages = list(conversation.messages[-10:])
+        history_messages = self._within_token_budget(await self.get_history_messages(conversation_id))
         
-        # Save user message
-        await self.add_message(conversation_id, "user", user_message)
-        await self.db.commit()
+        # Save user message; committed together with the answer
+        await self.add_message(conversation_id, "user", user_message, conversation=conversation)
         
         # Build message history
         messages = []
@@ -269,55 +365,54 @@ class CopilotService:
         tool_results = []
         
         if tool_calls:
-            # Execute tools and yield progress
+            # Start all tools at once and report each one as it finishes
+            tasks = self.tool_registry.start_all(tool_calls)
             for tool_call in tool_calls:
-                tool_name = tool_call["name"]
-                
                 yield {
                     "type": "tool_call",
-                    "name": tool_name,
+                    "name": tool_call["name"],
                     "status": "executing"
                 }
-                
-                result = await self.tool_registry.execute(tool_name, tool_call["arguments"])
-                tool_results.append({
-                    "tool_name": tool_name,
-                    "result": result
-                })
-                
-                yield {
-                    "type": "tool_call",
-                    "name": tool_name,
-                    "status": "complete",
-                    "result_preview": self._preview_result(result)
-                }
             
-            # Stream final response with tool results
-            extended_messages = messages.copy()
-            results_text = "Tool execution results:\n\n"
-            for result in tool_results:
-                results_text += f"**{result['tool_name']}**:\n"
-                results_text += f"```json\n{json.dumps(result['result'], cls=DecimalEncoder, indent=2)}\n```\n\n"
+            task_names = {task: tool_call["name"] for task, tool_call in zip(tasks, tool_calls)}
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield {
+                        "type": "tool_call",
+                        "name": task_names[task],
+                        "status": "complete",
+                        "result_preview": self._preview_result(task.result())
+                    }
             
-            extended_messages.append({
+            # Results are passed to the model in call order
+            tool_results = [
+                {"tool_name": tool_call["name"], "result": task.result()}
+                for tool_call, task in zip(tool_calls, tasks)
+            ]
+            
+            # Stream final response with tool results
+            results_text = format_tool_results(tool_results)
+            extended_messages = [*messages, {
                 "role": "user",
                 "content": f"[TOOL RESULTS]\n\n{results_text}\n\nProvide your answer based on these results."
-            })
+            }]
             
             full_content = ""
             async for chunk in self.gemini.stream_chat(extended_messages, tools=COPILOT_TOOLS):
                 yield {"type": "text", "content": chunk}
                 full_content += chunk
         else:
-            # No tools needed, stream directly
-            full_content = ""
-            async for chunk in self.gemini.stream_chat(messages, tools=COPILOT_TOOLS, context=context):
-                yield {"type": "text", "content": chunk}
-                full_content += chunk
+            # No tools needed: the first call already produced the answer, so send it
+            # instead of generating the same turn a second time
+            full_content = response["content"]
+            if full_content:
+                yield {"type": "text", "content": full_content}
         
         # Format and save response
         response_data = self._format_response_data(full_content, tool_results)
-        processing_time_ms = int((time.time() - start_time) * 1000)
+        processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
         
         await self.add_message(
             conversation_id,
@@ -346,7 +441,8 @@ class CopilotService:
         
         # Extract key numbers from tool results
         key_numbers = []
-        sources = []
+        # Insertion-ordered set: deduped, in the order the tools cited them
+        sources: Dict[str, None] = {}
         
         for result in tool_results:
             tool_name = result["tool_name"]
@@ -366,16 +462,19 @@ class CopilotService:
                     "source": tool_name
                 })
             
-            # Extract sources
-            if "sources" in inner:
-                sources.extend(inner["sources"])
+            # Extract sources, stopping once the limit is reached
+            if "sources" in inner and len(sources) < MAX_RESPONSE_SOURCES:
+                for source in inner["sources"]:
+                    sources[source] = None
+                    if len(sources) == MAX_RESPONSE_SOURCES:
+                        break
         
         # Determine confidence level
         confidence = self._estimate_confidence(tool_results, content)
         
         return {
             "key_numbers": key_numbers,
-            "sources": list(set(sources))[:20],  # Dedupe, limit to 20
+            "sources": list(sources),
             "confidence": confidence,
             "has_tool_data": len(tool_results) > 0
         }
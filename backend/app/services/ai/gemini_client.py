@@ -7,21 +7,85 @@ import os
 import json
 import logging
 import asyncio
-from typing import List, Dict, Any, Optional, AsyncGenerator
+from itertools import islice
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, AsyncGenerator, Sequence, Tuple
 from decimal import Decimal
 
 import google.generativeai as genai
+from google.protobuf.json_format import MessageToDict
+from google.generativeai import caching
 from google.generativeai.types import GenerationConfig, Tool, FunctionDeclaration
 
+try:
+    import orjson
+except ImportError:  # optional speedup; falls back to the stdlib encoder
+    orjson = None
+
+from .response_cache import response_cache
+
 logger = logging.getLogger(__name__)
 
+# The system prompt and tool declarations never change between requests, so they are
+# registered once per process as explicit cached content and reused by every chat turn
+PROMPT_CACHE_TTL = timedelta(minutes=10)
+# Recreate the cache this long before it expires so no request references an expired one
+PROMPT_CACHE_REFRESH_MARGIN = timedelta(minutes=1)
+# After a failed create (e.g. prompt below the model's minimum cacheable size) send the
+# prompt inline and retry later
+PROMPT_CACHE_RETRY_AFTER = timedelta(minutes=30)
+
+# (model name, tool names) -> (cached content or None, refresh at)
+_prompt_caches: Dict[Tuple[str, Tuple[str, ...]], Tuple[Optional[caching.CachedContent], datetime]] = {}
+_prompt_cache_lock = asyncio.Lock()
+
+# (model name, tool names) -> (cached content name or None, model); GeminiClient is
+# created per request, so the tools model is kept here and rebuilt only when the cache rotates
+_tools_models: Dict[Tuple[str, Tuple[str, ...]], Tuple[Optional[str], genai.GenerativeModel]] = {}
+
+# Tool names -> Gemini Tool; the definitions are module constants (the COPILOT_TOOLS tuple)
+_function_tools: Dict[Tuple[str, ...], Tool] = {}
+
+# Marks the end of a streamed response on the chunk queue
+_STREAM_END = object()
+
+
+def _json_default(obj):
+    """Serialize the types tool results carry that JSON has no native form for."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return str(obj)
+
+
+def _dumps(data: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(data, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data, default=_json_default, separators=(',', ':'), ensure_ascii=False)
 
-class DecimalEncoder(json.JSONEncoder):
-    """JSON encoder that handles Decimal types."""
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return float(obj)
-        return super().default(obj)
+
+def _to_history(messages: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """Gemini chat history for every message but the last, which is sent separately."""
+    return [
+        {"role": "user" if msg["role"] == "user" else "model", "parts": [msg["content"]]}
+        for msg in islice(messages, len(messages) - 1)
+    ]
+
+
+def format_tool_results(tool_results: List[Dict[str, Any]]) -> str:
+    """Render tool results for the follow-up prompt."""
+    # Compact JSON: indentation only adds tokens the model does not need
+    parts = ["Tool execution results:\n\n"]
+    # A repeated call often returns the same payload; it is sent once and referenced after
+    seen = set()
+    for result in tool_results:
+        payload = _dumps(result['result'])
+        parts.append(f"**{result['tool_name']}**:\n")
+        if payload in seen:
+            parts.append(f"[Same result as the earlier {result['tool_name']} call above]\n\n")
+        else:
+            seen.add(payload)
+            parts.append(f"```json\n{payload}\n```\n\n")
+    return "".join(parts)
 
 
 class GeminiClient:
@@ -53,6 +117,9 @@ class GeminiClient:
             ),
         )
         
+        # Shared across requests; GeminiClient itself is created per request
+        self.response_cache = response_cache
+        
         # Track token usage
         self.total_input_tokens = 0
         self.total_output_tokens = 0
@@ -89,7 +156,7 @@ When you need to call a tool, do so before answering.
 If multiple tools are needed, call them in sequence.
 """
 
-    def _build_function_declarations(self, tools: List[Dict]) -> List[FunctionDeclaration]:
+    def _build_function_declarations(self, tools: Sequence[Dict]) -> List[FunctionDeclaration]:
         """Convert tool definitions to Gemini function declarations."""
         declarations = []
         for tool in tools:
@@ -100,55 +167,76 @@ If multiple tools are needed, call them in sequence.
             ))
         return declarations
 
-    def _protobuf_to_dict(self, proto_obj) -> Dict[str, Any]:
-        """Convert protobuf MapComposite/RepeatedComposite to native Python types."""
-        if proto_obj is None:
-            return {}
+    def _tool(self, tools: Sequence[Dict]) -> Tool:
+        """Gemini Tool for the definitions, built once per process per tool set."""
+        key = tuple(tool["name"] for tool in tools)
+        tool = _function_tools.get(key)
+        if tool is None:
+            tool = _function_tools[key] = Tool(function_declarations=self._build_function_declarations(tools))
+        return tool
+
+    def _tools_generation_config(self) -> GenerationConfig:
+        return GenerationConfig(
+            temperature=0.1,
+            top_p=0.95,
+            max_output_tokens=4096,
+        )
+
+    async def _get_prompt_cache(self, tools: Sequence[Dict]) -> Optional[caching.CachedContent]:
+        """Return the shared cached system prompt + tools, creating or refreshing it if due."""
+        key = (self.model_name, tuple(tool["name"] for tool in tools))
+        entry = _prompt_caches.get(key)
+        if entry and datetime.now(timezone.utc) < entry[1]:
+            return entry[0]
         
-        result = {}
-        try:
-            # Handle MapComposite (dict-like) objects
-            for key in proto_obj:
-                value = proto_obj[key]
-                
-                # Convert based on type
-                if hasattr(value, '__iter__') and not isinstance(value, (str, bytes)):
-                    # It's a list-like object
-                    if hasattr(value, 'items'):
-                        # It's dict-like
-                        result[key] = self._protobuf_to_dict(value)
-                    else:
-                        # It's a list
-                        result[key] = [self._convert_value(v) for v in value]
-                else:
-                    result[key] = self._convert_value(value)
-        except Exception as e:
-            logger.warning(f"Error converting protobuf: {e}")
-            # Fallback: try to convert to dict directly
+        async with _prompt_cache_lock:
+            now = datetime.now(timezone.utc)
+            entry = _prompt_caches.get(key)
+            if entry and now < entry[1]:
+                return entry[0]
             try:
-                result = dict(proto_obj)
-            except:
-                result = {}
+                cache = await asyncio.to_thread(
+                    caching.CachedContent.create,
+                    model=self.model_name,
+                    display_name="bizio-copilot",
+                    system_instruction=self.get_system_prompt(),
+                    tools=[self._tool(tools)],
+                    ttl=PROMPT_CACHE_TTL,
+                )
+                _prompt_caches[key] = (cache, now + PROMPT_CACHE_TTL - PROMPT_CACHE_REFRESH_MARGIN)
+            except Exception as e:
+                logger.info(f"Prompt caching unavailable, sending system prompt inline: {e}")
+                _prompt_caches[key] = (None, now + PROMPT_CACHE_RETRY_AFTER)
+            return _prompt_caches[key][0]
+
+    async def _model_with_tools(self, tools: Sequence[Dict]) -> genai.GenerativeModel:
+        """Model with the system prompt and tool declarations, from the prompt cache when possible."""
+        cache = await self._get_prompt_cache(tools)
+        cache_name = cache.name if cache is not None else None
+        key = (self.model_name, tuple(tool["name"] for tool in tools))
+        entry = _tools_models.get(key)
+        if entry and entry[0] == cache_name:
+            return entry[1]
         
-        return result
-    
-    def _convert_value(self, value) -> Any:
-        """Convert a single protobuf value to native Python type."""
-        if value is None:
-            return None
-        if isinstance(value, (str, int, float, bool)):
-            return value
-        if hasattr(value, 'items'):
-            return self._protobuf_to_dict(value)
-        if hasattr(value, '__iter__'):
-            return [self._convert_value(v) for v in value]
-        # Try to get primitive value
-        return str(value)
+        if cache is not None:
+            model = genai.GenerativeModel.from_cached_content(
+                cache,
+                generation_config=self._tools_generation_config(),
+            )
+        else:
+            model = genai.GenerativeModel(
+                model_name=self.model_name,
+                generation_config=self._tools_generation_config(),
+                tools=[self._tool(tools)],
+                system_instruction=self.get_system_prompt()
+            )
+        _tools_models[key] = (cache_name, model)
+        return model
 
     async def chat(
         self,
         messages: List[Dict[str, str]],
-        tools: Optional[List[Dict]] = None,
+        tools: Optional[Sequence[Dict]] = None,
         context: Optional[str] = None
     ) -> Dict[str, Any]:
         """
@@ -167,29 +255,26 @@ If multiple tools are needed, call them in sequence.
                 "output_tokens": int
             }
         """
+        cache_key = self.response_cache.make_key(
+            model=self.model_name,
+            messages=messages,
+            context=context,
+            tools=[tool["name"] for tool in tools] if tools else None,
+        )
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            # Nothing was sent to the API, so no tokens were used
+            return {**cached, "input_tokens": 0, "output_tokens": 0}
+        
         try:
             # Build the prompt from messages
-            chat_history = []
-            for msg in messages[:-1]:  # All but the last message
-                role = "user" if msg["role"] == "user" else "model"
-                chat_history.append({"role": role, "parts": [msg["content"]]})
+            chat_history = _to_history(messages)
             
             # Start a chat session
             model_to_use = self.model
             
             if tools:
-                # Create model with tools
-                function_declarations = self._build_function_declarations(tools)
-                model_to_use = genai.GenerativeModel(
-                    model_name=self.model_name,
-                    generation_config=GenerationConfig(
-                        temperature=0.1,
-                        top_p=0.95,
-                        max_output_tokens=4096,
-                    ),
-                    tools=[Tool(function_declarations=function_declarations)],
-                    system_instruction=self.get_system_prompt()
-                )
+                model_to_use = await self._model_with_tools(tools)
             
             chat = model_to_use.start_chat(history=chat_history)
             
@@ -220,8 +305,8 @@ If multiple tools are needed, call them in sequence.
                         if result["tool_calls"] is None:
                             result["tool_calls"] = []
                         
-                        # Convert protobuf args to native Python dict
-                        args = self._protobuf_to_dict(fc.args)
+                        # args is a protobuf Struct; convert it in C rather than walking it in Python
+                        args = MessageToDict(type(fc).pb(fc).args)
                         
                         result["tool_calls"].append({
                             "name": fc.name,
@@ -237,6 +322,10 @@ If multiple tools are needed, call them in sequence.
                 self.total_input_tokens += result["input_tokens"]
                 self.total_output_tokens += result["output_tokens"]
             
+            # Tool calls must run against current data, so only final text answers are reused
+            if result["tool_calls"] is None and result["content"]:
+                self.response_cache.set(cache_key, dict(result))
+            
             return result
             
         except Exception as e:
@@ -247,7 +336,7 @@ If multiple tools are needed, call them in sequence.
         self,
         messages: List[Dict[str, str]],
         tool_results: List[Dict[str, Any]],
-        tools: Optional[List[Dict]] = None
+        tools: Optional[Sequence[Dict]] = None
     ) -> Dict[str, Any]:
         """
         Continue chat after tool execution with the results.
@@ -260,26 +349,28 @@ If multiple tools are needed, call them in sequence.
         Returns:
             Same format as chat()
         """
-        # Add tool results to messages
-        extended_messages = messages.copy()
-        
-        # Format tool results as a system message
-        results_text = "Tool execution results:\n\n"
-        for result in tool_results:
-            results_text += f"**{result['tool_name']}**:\n"
-            results_text += f"```json\n{json.dumps(result['result'], cls=DecimalEncoder, indent=2)}\n```\n\n"
-        
-        extended_messages.append({
+        return await self.chat_with_tool_results_text(
+            messages, format_tool_results(tool_results), tools=tools
+        )
+
+    async def chat_with_tool_results_text(
+        self,
+        messages: List[Dict[str, str]],
+        results_text: str,
+        tools: Optional[Sequence[Dict]] = None
+    ) -> Dict[str, Any]:
+        """Same as chat_with_tool_results() with the results already formatted by format_tool_results()."""
+        extended_messages = [*messages, {
             "role": "user",
             "content": f"[TOOL RESULTS - Use these to answer the original question]\n\n{results_text}\n\nNow provide your answer based on these results. Remember to cite sources and show confidence."
-        })
+        }]
         
         return await self.chat(extended_messages, tools=tools)
 
     async def stream_chat(
         self,
         messages: List[Dict[str, str]],
-        tools: Optional[List[Dict]] = None,
+        tools: Optional[Sequence[Dict]] = None,
         context: Optional[str] = None
     ) -> AsyncGenerator[str, None]:
         """
@@ -290,25 +381,12 @@ If multiple tools are needed, call them in sequence.
         """
         try:
             # Build chat history
-            chat_history = []
-            for msg in messages[:-1]:
-                role = "user" if msg["role"] == "user" else "model"
-                chat_history.append({"role": role, "parts": [msg["content"]]})
+            chat_history = _to_history(messages)
             
             model_to_use = self.model
             
             if tools:
-                function_declarations = self._build_function_declarations(tools)
-                model_to_use = genai.GenerativeModel(
-                    model_name=self.model_name,
-                    generation_config=GenerationConfig(
-                        temperature=0.1,
-                        top_p=0.95,
-                        max_output_tokens=4096,
-                    ),
-                    tools=[Tool(function_declarations=function_declarations)],
-                    system_instruction=self.get_system_prompt()
-                )
+                model_to_use = await self._model_with_tools(tools)
             
             chat = model_to_use.start_chat(history=chat_history)
             
@@ -316,16 +394,30 @@ If multiple tools are needed, call them in sequence.
             if context:
                 last_message = f"[Context: {context}]\n\n{last_message}"
             
-            # Stream the response
-            response = await asyncio.to_thread(
-                chat.send_message,
-                last_message,
-                stream=True
-            )
+            # The SDK stream is a blocking iterator; drain it in one worker thread and hand
+            # chunks back through a queue so the event loop never waits on the network
+            loop = asyncio.get_running_loop()
+            queue: asyncio.Queue = asyncio.Queue()
+            
+            def pump():
+                try:
+                    for chunk in chat.send_message(last_message, stream=True):
+                        if chunk.text:
+                            loop.call_soon_threadsafe(queue.put_nowait, chunk.text)
+                except Exception as exc:
+                    loop.call_soon_threadsafe(queue.put_nowait, exc)
+                finally:
+                    loop.call_soon_threadsafe(queue.put_nowait, _STREAM_END)
             
-            for chunk in response:
-                if chunk.text:
-                    yield chunk.text
+            producer = asyncio.ensure_future(asyncio.to_thread(pump))
+            while True:
+                item = await queue.get()
+                if item is _STREAM_END:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+            await producer
                     
         except Exception as e:
             logger.error(f"Gemini streaming error: {e}")
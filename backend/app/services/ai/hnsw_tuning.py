@@ -0,0 +1,38 @@
+# app/services/ai/hnsw_tuning.py
+"""
+HNSW parameter ladder for the document_chunks embedding index.
+Small graphs favour fast builds; large graphs need wider graphs and
+candidate lists to keep recall up.
+"""
+from typing import Dict
+
+HNSW_INDEX_NAME = "ix_document_chunks_embedding_hnsw"
+
+# Tenants with at least this many chunks get their own partial HNSW index
+TENANT_INDEX_MIN_CHUNKS = 10_000
+
+# Above this many vectors, search first ranks binary-quantized codes (96 bytes
+# per vector instead of 1.5 KB) and reranks the candidates on the halfvec
+BINARY_INDEX_NAME = "ix_document_chunks_embedding_bq_hnsw"
+BINARY_RERANK_MIN_CHUNKS = 1_000_000
+BINARY_RERANK_CANDIDATES = 200
+
+# (upper bound on vector count, parameters), checked in order
+HNSW_TIERS = (
+    (100_000, {"tier": "small", "m": 16, "ef_construction": 64, "ef_search": 40}),
+    (1_000_000, {"tier": "medium", "m": 24, "ef_construction": 128, "ef_search": 100}),
+    (None, {"tier": "large", "m": 32, "ef_construction": 200, "ef_search": 200}),
+)
+
+
+def configure_hnsw_params(vector_count: int) -> Dict[str, int]:
+    """Return {tier, m, ef_construction, ef_search} for an index of `vector_count` vectors."""
+    for upper_bound, params in HNSW_TIERS:
+        if upper_bound is None or vector_count < upper_bound:
+            return dict(params)
+    return dict(HNSW_TIERS[-1][1])
+
+
+def tenant_hnsw_index_name(tenant_id: int) -> str:
+    """Name of the partial HNSW index covering one tenant's chunks."""
+    return f"{HNSW_INDEX_NAME}_t{int(tenant_id)}"
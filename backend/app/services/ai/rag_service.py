@@ -0,0 +1,215 @@
+# app/services/ai/rag_service.py
+"""
+Semantic retrieval over document chunks for the BIZIO AI Copilot.
+On PostgreSQL this uses the pgvector HNSW index; on SQLite (dev/tests)
+it falls back to cosine similarity computed in Python.
+"""
+import logging
+import math
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pgvector.sqlalchemy import BIT, HALFVEC
+from sqlalchemy import Float, bindparam, cast, event, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.models.copilot import EMBEDDING_DIM
+from .hnsw_tuning import BINARY_RERANK_CANDIDATES, BINARY_RERANK_MIN_CHUNKS, configure_hnsw_params
+from .semantic_cache import semantic_cache
+
+logger = logging.getLogger(__name__)
+
+# How long the planner's row estimate for document_chunks is reused
+ROW_ESTIMATE_TTL_SECONDS = 600
+
+_row_estimate = {"count": 0, "expires": 0.0}
+
+# Installed pgvector version, looked up once per process (None until checked)
+_pgvector_version: Optional[Tuple[int, ...]] = None
+
+# Rough upper bound on the payload of one multi-row chunk INSERT
+CHUNK_INSERT_BATCH_BYTES = 10 * 1024 * 1024
+
+# Results kept per cached query, so later turns can ask for up to this many chunks
+CACHED_TOP_K = 20
+
+
+def _cosine_distance(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm_a = math.sqrt(sum(x * x for x in a))
+    norm_b = math.sqrt(sum(y * y for y in b))
+    if not norm_a or not norm_b:
+        return 1.0
+    return 1.0 - dot / (norm_a * norm_b)
+
+
+def _estimate_chunk_bytes(row: Dict[str, Any]) -> int:
+    # Text plus ~10 bytes per embedding dimension once rendered as a literal
+    return len(row.get("content") or "") + 10 * len(row.get("embedding") or ())
+
+
+async def insert_chunks(db: AsyncSession, tenant_id: int, rows: List[Dict[str, Any]]) -> int:
+    """
+    Insert DocumentChunk rows as a few multi-row INSERTs instead of one per chunk.
+    Each row is a dict of DocumentChunk column values; batches are split at
+    roughly CHUNK_INSERT_BATCH_BYTES. The caller commits.
+    """
+    batch: List[Dict[str, Any]] = []
+    batch_bytes = 0
+    for row in rows:
+        row_bytes = _estimate_chunk_bytes(row)
+        if batch and batch_bytes + row_bytes > CHUNK_INSERT_BATCH_BYTES:
+            await db.execute(insert(models.DocumentChunk), batch)
+            batch, batch_bytes = [], 0
+        batch.append({**row, "tenant_id": tenant_id})
+        batch_bytes += row_bytes
+    if batch:
+        await db.execute(insert(models.DocumentChunk), batch)
+
+    # Core inserts bypass the ORM events below
+    semantic_cache.invalidate_tenant(tenant_id)
+    return len(rows)
+
+
+class RAGService:
+    """
+    Nearest-neighbour search over DocumentChunk embeddings, scoped to a tenant.
+    """
+
+    def __init__(self, db: AsyncSession, tenant_id: int):
+        self.db = db
+        self.tenant_id = tenant_id
+
+    async def search(
+        self,
+        query_embedding: Sequence[float],
+        limit: int = 5,
+        doc_type: Optional[str] = None,
+        conversation_id: Optional[int] = None,
+    ) -> List[Tuple[models.DocumentChunk, float]]:
+        """
+        Return the `limit` closest chunks as (chunk, cosine distance) pairs.
+        With a conversation_id, near-duplicate queries in the same conversation
+        are answered from the semantic cache.
+        """
+        if conversation_id is None or limit > CACHED_TOP_K:
+            return await self._search(query_embedding, limit, doc_type)
+
+        cached = semantic_cache.get(self.tenant_id, conversation_id, query_embedding, doc_type)
+        if cached is not None:
+            return await self._load_cached(cached[:limit])
+
+        results = await self._search(query_embedding, CACHED_TOP_K, doc_type)
+        semantic_cache.put(
+            self.tenant_id, conversation_id, query_embedding,
+            [(chunk.id, distance) for chunk, distance in results], doc_type,
+        )
+        return results[:limit]
+
+    async def _load_cached(self, cached: List[Tuple[int, float]]) -> List[Tuple[models.DocumentChunk, float]]:
+        ids = [chunk_id for chunk_id, _ in cached]
+        result = await self.db.execute(
+            select(models.DocumentChunk).where(
+                models.DocumentChunk.id.in_(ids),
+                models.DocumentChunk.tenant_id == self.tenant_id,
+            )
+        )
+        chunks = {chunk.id: chunk for chunk in result.scalars().all()}
+        return [(chunks[chunk_id], distance) for chunk_id, distance in cached if chunk_id in chunks]
+
+    async def _search(self, query_embedding, limit, doc_type):
+        is_postgres = self.db.bind.dialect.name == "postgresql"
+        # On PostgreSQL tenant_id is rendered inline so the planner can match a
+        # per-tenant partial HNSW index (generic prepared plans cannot)
+        tenant_id = bindparam("tenant_id", self.tenant_id, literal_execute=is_postgres)
+        filters = [
+            models.DocumentChunk.tenant_id == tenant_id,
+            models.DocumentChunk.embedding.isnot(None),
+        ]
+        if doc_type:
+            filters.append(models.DocumentChunk.doc_type == doc_type)
+
+        if is_postgres:
+            return await self._search_pgvector(query_embedding, limit, filters)
+        return await self._search_python(query_embedding, limit, filters)
+
+    async def _estimate_vector_count(self) -> int:
+        # pg_class.reltuples is a catalog lookup, unlike count(*) on the table
+        now = time.monotonic()
+        if now >= _row_estimate["expires"]:
+            result = await self.db.execute(
+                text("SELECT reltuples FROM pg_class WHERE relname = 'document_chunks'")
+            )
+            _row_estimate["count"] = max(int(result.scalar() or 0), 0)
+            _row_estimate["expires"] = now + ROW_ESTIMATE_TTL_SECONDS
+        return _row_estimate["count"]
+
+    async def _pgvector_version(self) -> Tuple[int, ...]:
+        global _pgvector_version
+        if _pgvector_version is None:
+            result = await self.db.execute(
+                text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+            )
+            version = result.scalar() or "0"
+            _pgvector_version = tuple(int(part) for part in version.split(".") if part.isdigit())
+        return _pgvector_version
+
+    async def _search_pgvector(self, query_embedding, limit, filters):
+        vector_count = await self._estimate_vector_count()
+        params = configure_hnsw_params(vector_count)
+        logger.debug("document_chunks HNSW search: tier=%s ef_search=%s", params["tier"], params["ef_search"])
+
+        version = await self._pgvector_version()
+        # SET LOCAL only lasts for the current transaction
+        await self.db.execute(text(f"SET LOCAL hnsw.ef_search = {int(params['ef_search'])}"))
+        # hnsw.iterative_scan was added in pgvector 0.8.0
+        if version >= (0, 8):
+            # Keep walking the graph until enough rows pass the tenant/doc_type filters
+            await self.db.execute(text("SET LOCAL hnsw.iterative_scan = strict_order"))
+
+        # The column type is a JSON/halfvec variant, so spell out the pgvector operator
+        query_vector = bindparam("query_vector", list(query_embedding), type_=HALFVEC(EMBEDDING_DIM))
+        distance = models.DocumentChunk.embedding.op("<=>", return_type=Float)(query_vector)
+
+        # binary_quantize on halfvec needs pgvector 0.7.0
+        if vector_count >= BINARY_RERANK_MIN_CHUNKS and version >= (0, 7):
+            # First pass: Hamming distance over the binary-quantized index
+            # (ix_document_chunks_embedding_bq_hnsw); second pass: exact rerank
+            hamming = cast(func.binary_quantize(models.DocumentChunk.embedding), BIT(EMBEDDING_DIM)).op(
+                "<~>", return_type=Float
+            )(func.binary_quantize(query_vector))
+            candidates = (
+                select(models.DocumentChunk.id)
+                .where(*filters)
+                .order_by(hamming)
+                .limit(max(BINARY_RERANK_CANDIDATES, limit))
+                .cte("candidates")
+            )
+            filters = [models.DocumentChunk.id.in_(select(candidates.c.id))]
+
+        query = (
+            select(models.DocumentChunk, distance.label("distance"))
+            .where(*filters)
+            .order_by(distance)
+            .limit(limit)
+        )
+        result = await self.db.execute(query)
+        return [(chunk, float(dist)) for chunk, dist in result.all()]
+
+    async def _search_python(self, query_embedding, limit, filters):
+        result = await self.db.execute(select(models.DocumentChunk).where(*filters))
+        scored = [
+            (chunk, _cosine_distance(query_embedding, chunk.embedding))
+            for chunk in result.scalars().all()
+        ]
+        scored.sort(key=lambda item: item[1])
+        return scored[:limit]
+
+
+@event.listens_for(models.DocumentChunk, "after_insert")
+@event.listens_for(models.DocumentChunk, "after_update")
+@event.listens_for(models.DocumentChunk, "after_delete")
+def _invalidate_semantic_cache(mapper, connection, target):
+    # Only covers writes made by this process; other workers rely on the cache TTL
+    semantic_cache.invalidate_tenant(target.tenant_id)
@@ -0,0 +1,50 @@
+# app/services/ai/response_cache.py
+"""
+In-process cache of Gemini chat responses.
+Identical requests (same model, history, context and tool set) are common for
+FAQ-style questions; the stored response is returned instead of another API call.
+"""
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Entries are dropped after this many seconds
+ENTRY_TTL_SECONDS = 3600
+# Bound on memory use
+MAX_ENTRIES = 2048
+
+
+class LLMCache:
+    """Maps a sha256 of the request to (response, stored_at), evicting least recently used."""
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    @staticmethod
+    def make_key(**request: Any) -> str:
+        payload = json.dumps(request, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[1] >= ENTRY_TTL_SECONDS:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, key: str, response: Dict[str, Any]) -> None:
+        self._entries[key] = (response, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > MAX_ENTRIES:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+response_cache = LLMCache()
@@ -0,0 +1,86 @@
+# app/services/ai/semantic_cache.py
+"""
+In-process semantic cache for Copilot retrieval.
+Consecutive questions in a conversation are often near-duplicates; when a new
+query embedding is close enough to a cached one, the cached chunk ids are
+reused instead of running another vector search.
+"""
+import math
+import time
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+# Cosine similarity at or above which two queries are treated as the same
+SIMILARITY_THRESHOLD = 0.95
+# Entries are dropped after this many seconds even without invalidation
+ENTRY_TTL_SECONDS = 300
+# Per-conversation and global bounds on memory use
+MAX_ENTRIES_PER_CONVERSATION = 32
+MAX_CONVERSATIONS = 1024
+
+
+def _normalize(vector: Sequence[float]) -> Tuple[float, ...]:
+    norm = math.sqrt(sum(x * x for x in vector))
+    if not norm:
+        return tuple(vector)
+    return tuple(x / norm for x in vector)
+
+
+class SemanticCache:
+    """
+    Maps (tenant_id, conversation_id, doc_type) to recent (query vector, chunk results).
+    Lookups are a linear scan over a handful of unit vectors per conversation.
+    """
+
+    def __init__(self):
+        # (tenant_id, conversation_id, doc_type) -> list of (unit vector, results, stored_at)
+        self._entries: "OrderedDict[tuple, List[tuple]]" = OrderedDict()
+
+    def get(
+        self,
+        tenant_id: int,
+        conversation_id: int,
+        query_embedding: Sequence[float],
+        doc_type: Optional[str] = None,
+    ) -> Optional[List[Tuple[int, float]]]:
+        """Return cached [(chunk_id, distance), ...] for a similar query, or None."""
+        key = (tenant_id, conversation_id, doc_type)
+        entries = self._entries.get(key)
+        if not entries:
+            return None
+
+        now = time.monotonic()
+        entries[:] = [e for e in entries if now - e[2] < ENTRY_TTL_SECONDS]
+        query = _normalize(query_embedding)
+        for vector, results, _stored_at in reversed(entries):
+            if sum(a * b for a, b in zip(query, vector)) >= SIMILARITY_THRESHOLD:
+                self._entries.move_to_end(key)
+                return results
+        return None
+
+    def put(
+        self,
+        tenant_id: int,
+        conversation_id: int,
+        query_embedding: Sequence[float],
+        results: List[Tuple[int, float]],
+        doc_type: Optional[str] = None,
+    ) -> None:
+        key = (tenant_id, conversation_id, doc_type)
+        entries = self._entries.setdefault(key, [])
+        entries.append((_normalize(query_embedding), results, time.monotonic()))
+        del entries[:-MAX_ENTRIES_PER_CONVERSATION]
+        self._entries.move_to_end(key)
+        while len(self._entries) > MAX_CONVERSATIONS:
+            self._entries.popitem(last=False)
+
+    def invalidate_tenant(self, tenant_id: int) -> None:
+        """Drop every entry for a tenant (its chunks changed)."""
+        for key in [k for k in self._entries if k[0] == tenant_id]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+semantic_cache = SemanticCache()
@@ -0,0 +1,95 @@
+# app/services/ai/tool_cache.py
+"""
+In-process cache of read-only Copilot tool results.
+Follow-up turns often repeat a tool call with the same arguments; the stored
+result is reused until the tenant's data changes or the entry expires.
+"""
+import copy
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import models
+
+# Entries are dropped after this many seconds even without invalidation
+ENTRY_TTL_SECONDS = 60
+# Bound on memory use (results themselves are capped at MAX_TOOL_ROWS rows per list)
+MAX_ENTRIES = 1024
+
+# Tables the tools read; any ORM write to them invalidates the tenant's entries
+_TOOL_DATA_MODELS = (
+    models.Client, models.Deal, models.DealItem, models.Expense,
+    models.Inventory, models.InventoryItem, models.Product, models.Supplier,
+)
+
+
+class ToolResultCache:
+    """
+    Maps (tenant_id, tool name, arguments) to (result, stored_at), evicting least recently used.
+    Results are copied in and out, so callers may mutate what they get back.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+    @staticmethod
+    def _key(tenant_id: int, tool_name: str, arguments: Dict[str, Any]) -> tuple:
+        return (tenant_id, tool_name, json.dumps(arguments, sort_keys=True, default=str))
+
+    def get(self, tenant_id: int, tool_name: str, arguments: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key = self._key(tenant_id, tool_name, arguments)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[1] >= ENTRY_TTL_SECONDS:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return copy.deepcopy(entry[0])
+
+    def put(self, tenant_id: int, tool_name: str, arguments: Dict[str, Any], result: Dict[str, Any]) -> None:
+        key = self._key(tenant_id, tool_name, arguments)
+        self._entries[key] = (copy.deepcopy(result), time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > MAX_ENTRIES:
+            self._entries.popitem(last=False)
+
+    def invalidate_tenant(self, tenant_id: Optional[int]) -> None:
+        """Drop every entry for a tenant (all entries when the tenant is unknown)."""
+        if tenant_id is None:
+            self._entries.clear()
+            return
+        for key in [k for k in self._entries if k[0] == tenant_id]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+tool_result_cache = ToolResultCache()
+
+
+def _invalidate_tool_cache(mapper, connection, target):
+    # Unit-of-work writes made by this process; child rows without tenant_id clear the
+    # whole cache. Raw SQL text and other workers rely on the TTL
+    tool_result_cache.invalidate_tenant(getattr(target, "tenant_id", None))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_tool_cache_on_statement(orm_execute_state):
+    # update()/delete()/insert() statements on the models (the crud write paths) bypass
+    # the mapper events above; they do not say which tenant they touch, so clear everything
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in _TOOL_DATA_MODELS:
+        tool_result_cache.invalidate_tenant(None)
+
+
+for _model in _TOOL_DATA_MODELS:
+    for _event_name in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event_name, _invalidate_tool_cache)
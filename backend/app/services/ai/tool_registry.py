@@ -3,15 +3,22 @@
 Function calling tools for the BIZIO AI Copilot.
 Each tool is a function that can be called by Gemini to get real data.
 """
+import asyncio
+import heapq
 import logging
+from bisect import bisect_right
+from functools import lru_cache
 from datetime import datetime, date, timedelta
 from decimal import Decimal
-from typing import Dict, Any, List, Optional, Literal, Tuple
-from sqlalchemy import select, func, and_, or_, text
+from typing import Dict, Any, List, Optional, Literal, Set, Tuple
+from sqlalchemy import Float, Integer, bindparam, case, cast, select, func, and_, or_, text
+from sqlalchemy import inspect as sa_inspect
 from sqlalchemy.ext.asyncio import AsyncSession
-from fuzzywuzzy import fuzz
+import Levenshtein
+from rapidfuzz import fuzz as rf_fuzz, process
 
 from app import models
+from .tool_cache import tool_result_cache
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +27,9 @@ logger = logging.getLogger(__name__)
 # TOOL DEFINITIONS (for Gemini function calling)
 # =============================================================================
 
-COPILOT_TOOLS = [
+# A tuple: GeminiClient builds the declarations and prompt cache from this once per
+# process (keyed by tool name), so the definitions must not change at runtime
+COPILOT_TOOLS = (
     {
         "name": "query_db",
         "description": "Query the database with filters and aggregations. Use this for listing records, counting items, or getting specific data.",
@@ -236,7 +245,249 @@ COPILOT_TOOLS = [
             "required": ["fix_type", "entities"]
         }
     }
-]
+)
+
+
+# Tools that write through the request session; all others only read
+WRITE_TOOLS = frozenset({"suggest_data_fixes"})
+# Tools whose result must not be reused (writes, or a fresh id per call)
+UNCACHED_TOOLS = WRITE_TOOLS | {"create_task"}
+# Longest list a tool result may hand to the model; the rest is dropped and flagged
+MAX_TOOL_ROWS = 200
+# Materialized views found in the database, probed once per view. Only Alembic
+# migrations create them; a create_all schema has none and reads the base tables
+_MATERIALIZED_VIEWS: Dict[str, bool] = {}
+
+# Per tool: (required parameter names, {parameter: allowed values}), folded once from
+# the declarations so argument checks are tuple/set lookups
+TOOL_ARGUMENT_RULES: Dict[str, Tuple[Tuple[str, ...], Dict[str, frozenset]]] = {
+    tool["name"]: (
+        tuple(tool["parameters"].get("required", ())),
+        {
+            name: frozenset(spec["enum"])
+            for name, spec in tool["parameters"]["properties"].items()
+            if "enum" in spec
+        },
+    )
+    for tool in COPILOT_TOOLS
+}
+
+
+def _invalid_arguments(tool_name: str, arguments: Dict[str, Any]) -> Optional[str]:
+    """Reason the arguments break the tool's declaration, or None when they fit."""
+    required, enums = TOOL_ARGUMENT_RULES[tool_name]
+    for name in required:
+        if name not in arguments:
+            return f"Missing required argument: {name}"
+    for name, allowed in enums.items():
+        value = arguments.get(name)
+        if value is not None and value not in allowed:
+            return f"Invalid value for {name}: {value!r}"
+    return None
+
+# Tables query_db may read
+QUERY_DB_TABLES = {
+    "products": models.Product,
+    "expenses": models.Expense,
+    "deals": models.Deal,
+    "suppliers": models.Supplier,
+    "inventory": models.InventoryItem,
+    "clients": models.Client
+}
+
+_FILTER_SUFFIXES = (("_gte", "gte"), ("_lte", "lte"), ("_like", "like"))
+
+
+def _query_column(model, name: str):
+    """Mapped column for an attribute or column name, or None (relationships etc. are not filterable)."""
+    column = sa_inspect(model).columns.get(name)
+    if column is None:
+        column = model.__table__.c.get(name)
+    return column
+
+
+@lru_cache(maxsize=512)
+def _query_db_plan(table: str, filter_keys: Tuple[str, ...], order_by: Optional[str]):
+    """
+    Resolve a query_db call shape once: [(filter key, column, op)] and the ORDER BY clause.
+    The statement then has the same structure for every call of that shape, so
+    SQLAlchemy's compiled-statement cache is hit as well.
+    """
+    model = QUERY_DB_TABLES[table]
+    plan = []
+    for key in filter_keys:
+        field_name, op = key, "eq"
+        for suffix, suffix_op in _FILTER_SUFFIXES:
+            if key.endswith(suffix):
+                field_name, op = key[:-len(suffix)], suffix_op
+                break
+        column = _query_column(model, field_name)
+        if column is not None:
+            plan.append((key, column, op))
+    
+    order_clause = None
+    if order_by:
+        column = _query_column(model, order_by.lstrip("-"))
+        if column is not None:
+            order_clause = column.desc() if order_by.startswith("-") else column
+    return tuple(plan), order_clause
+
+
+_AGGREGATES = {"sum": func.sum, "avg": func.avg, "min": func.min, "max": func.max, "count": func.count}
+# Date column used for day/week/month/year buckets (created_at elsewhere)
+_BUCKET_DATE_COLUMNS = {"expenses": "date"}
+_BUCKET_FORMATS = {
+    # bucket: (strftime format for SQLite, to_char format for PostgreSQL)
+    "day": ("%Y-%m-%d", "YYYY-MM-DD"),
+    "week": (None, 'IYYY-"W"IW'),  # ISO week; SQLite side built by _sqlite_iso_week
+    "month": ("%Y-%m", "YYYY-MM"),
+    "year": ("%Y", "YYYY"),
+}
+
+
+def _sqlite_iso_week(date_column):
+    """
+    ISO week label (e.g. 2025-W01) matching PostgreSQL's IYYY-"W"IW. SQLite only has
+    %G/%V from 3.46, so it is derived from the Thursday of the date's Monday-Sunday
+    week, which always falls in the ISO week-year.
+    """
+    thursday = func.date(date_column, "-3 days", "weekday 4")
+    week = (cast(func.strftime("%j", thursday), Integer) - 1) / 7 + 1
+    return func.printf("%s-W%02d", func.strftime("%Y", thursday), week)
+
+
+@lru_cache(maxsize=512)
+def _query_db_aggregate_plan(
+    table: str,
+    aggregations: Tuple[str, ...],
+    group_by: Tuple[str, ...],
+    order_by: Optional[str],
+    dialect: str,
+):
+    """
+    Resolve the aggregate form of a query_db call once: (group expressions, labelled
+    select expressions, ORDER BY clause). Grouping and aggregation run in SQL, so only
+    one row per group comes back.
+    """
+    model = QUERY_DB_TABLES[table]
+    groups = []
+    for name in group_by:
+        if name in _BUCKET_FORMATS:
+            date_column = _query_column(model, _BUCKET_DATE_COLUMNS.get(table, "created_at"))
+            if date_column is None:
+                continue
+            sqlite_format, pg_format = _BUCKET_FORMATS[name]
+            if dialect == "sqlite":
+                if sqlite_format is None:
+                    bucket = _sqlite_iso_week(date_column)
+                else:
+                    bucket = func.strftime(sqlite_format, date_column)
+            else:
+                bucket = func.to_char(date_column, pg_format)
+            groups.append(bucket.label(name))
+        else:
+            column = _query_column(model, name)
+            if column is not None:
+                groups.append(column.label(name))
+    
+    selected = list(groups)
+    for spec in aggregations:
+        op, _, field_name = spec.partition(":")
+        aggregate = _AGGREGATES.get(op.lower())
+        if aggregate is None:
+            continue
+        if op.lower() == "count" and field_name in ("", "*", "id"):
+            selected.append(func.count().label("count"))
+            continue
+        column = _query_column(model, field_name)
+        if column is not None:
+            selected.append(aggregate(column).label(f"{op.lower()}_{field_name}"))
+    if len(selected) == len(groups):
+        # Grouping without (valid) aggregations counts the rows of each group
+        selected.append(func.count().label("count"))
+    
+    order_clause = None
+    if order_by:
+        name = order_by.lstrip("-")
+        target = next((expr for expr in selected if expr.name == name), None)
+        if target is None:
+            target = _query_column(model, name)
+            if target is not None and not groups:
+                target = None  # a plain column is not valid in an ungrouped aggregate
+        if target is not None:
+            order_clause = target.desc() if order_by.startswith("-") else target.asc()
+    return tuple(groups), tuple(selected), order_clause
+
+
+@lru_cache(maxsize=4096)
+def _parse_ymd(value: str) -> date:
+    """A YYYY-MM-DD tool argument as a date; the model repeats the same few dates across calls."""
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        # Lenient fallback for unpadded forms such as 2025-1-5
+        return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def _similar_pairs(names: List[str], threshold: int) -> List[Tuple[int, int, int]]:
+    """
+    Pairs (i, j, score) with i < j whose fuzz.ratio score (0-100, case-insensitive)
+    is at least `threshold`, in the same order as a plain nested loop. Like
+    fuzz.ratio, an empty name scores 0 against anything (rapidfuzz would give 100).
+    
+    The ratio is 2 * matches / (len1 + len2), so it can never exceed
+    2 * shorter / (len1 + len2). With names sorted by length, each name is only
+    compared with the block of longer names that can still reach the threshold, and
+    that block is scored in one rapidfuzz call (C loop with score cutoff).
+    """
+    lowered = [name.lower() for name in names]
+    order = sorted(range(len(names)), key=lambda idx: len(lowered[idx]))
+    by_length = [lowered[idx] for idx in order]
+    lengths = [len(name) for name in by_length]
+    # Scores are rounded, so anything from threshold - 0.5 may still round up to it;
+    # the block scan uses a slightly lower cutoff and survivors are scored exactly
+    cutoff = max(threshold - 1, 0) / 100
+    
+    pairs = []
+    for pos, a in enumerate(by_length):
+        if not a:
+            # Empty names sort first; every partner they have is scored 0
+            if threshold <= 0:
+                i = order[pos]
+                pairs.extend((min(i, j), max(i, j), 0) for j in order[pos + 1:])
+            continue
+        if cutoff:
+            # Longest partner with 2 * len(a) / (len(a) + len(b)) >= cutoff
+            end = bisect_right(lengths, len(a) * (2 - cutoff) / cutoff, lo=pos + 1)
+        else:
+            end = len(by_length)
+        block = by_length[pos + 1:end]
+        if not block:
+            continue
+        i = order[pos]
+        for b, _, offset in process.extract(a, block, scorer=rf_fuzz.ratio, score_cutoff=cutoff * 100, limit=None):
+            score = int(round(100 * Levenshtein.ratio(a, b)))
+            if score >= threshold:
+                j = order[pos + 1 + offset]
+                pairs.append((i, j, score) if i < j else (j, i, score))
+    pairs.sort()
+    return pairs
+
+
+def _most_similar(pairs: List[Tuple[int, int, int]]) -> List[Tuple[int, int, int]]:
+    """The MAX_TOOL_ROWS highest-scoring pairs, kept in their original order."""
+    if len(pairs) <= MAX_TOOL_ROWS:
+        return pairs
+    return sorted(heapq.nlargest(MAX_TOOL_ROWS, pairs, key=lambda pair: pair[2]))
+
+
+def _cap_rows(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Trim list values of a tool result to MAX_TOOL_ROWS, marking the result as truncated."""
+    for key, value in list(result.items()):
+        if isinstance(value, list) and len(value) > MAX_TOOL_ROWS:
+            result[key] = value[:MAX_TOOL_ROWS]
+            result["truncated"] = True
+    return result
 
 
 # =============================================================================
@@ -249,20 +500,70 @@ class ToolRegistry:
     def __init__(self, db: AsyncSession, tenant_id: int):
         self.db = db
         self.tenant_id = tenant_id
+        # The request session only runs one statement at a time
+        self._db_lock = asyncio.Lock()
+        # Materialized views read by the running tool call (see _reads_view)
+        self._views_read: Set[str] = set()
+    
+    def start_all(self, tool_calls: List[Dict[str, Any]]) -> List["asyncio.Task[Dict[str, Any]]"]:
+        """
+        Start every tool call concurrently and return the tasks in call order.
+        
+        An AsyncSession cannot be shared between concurrent queries, so when several
+        calls are made each read-only tool runs on its own session against the same
+        engine. Writing tools keep using the request session, one at a time, so their
+        changes are committed together with the conversation.
+        """
+        bind = self.db.bind
+        # SQLite serializes connections anyway (and a shared in-memory connection
+        # would be rolled back by the extra sessions), so it keeps the sequential path
+        isolate = len(tool_calls) > 1 and bind is not None and bind.dialect.name != "sqlite"
+        return [
+            asyncio.create_task(
+                self._execute_isolated(call["name"], call["arguments"])
+                if isolate and call["name"] not in WRITE_TOOLS
+                else self._execute_shared(call["name"], call["arguments"])
+            )
+            for call in tool_calls
+        ]
+    
+    async def _execute_shared(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        async with self._db_lock:
+            return await self.execute(tool_name, arguments)
+    
+    async def _execute_isolated(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        async with AsyncSession(self.db.bind, expire_on_commit=False) as session:
+            return await ToolRegistry(session, self.tenant_id).execute(tool_name, arguments)
     
     async def execute(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a tool and return results."""
+        cacheable = tool_name not in UNCACHED_TOOLS
+        if cacheable:
+            cached = tool_result_cache.get(self.tenant_id, tool_name, arguments)
+            if cached is not None:
+                return cached
+        
+        self._views_read.clear()
         try:
             method = getattr(self, f"_tool_{tool_name}", None)
             if not method:
                 return {"error": f"Unknown tool: {tool_name}"}
             
+            error = _invalid_arguments(tool_name, arguments)
+            if error:
+                return {"success": False, "tool_name": tool_name, "error": error}
+            
             result = await method(**arguments)
-            return {
+            if isinstance(result, dict):
+                result = _cap_rows(result)
+            response = {
                 "success": True,
                 "tool_name": tool_name,
                 "result": result
             }
+            if cacheable and not await self._views_pending_refresh():
+                tool_result_cache.put(self.tenant_id, tool_name, arguments, response)
+            return response
         except Exception as e:
             logger.error(f"Tool {tool_name} failed: {e}")
             return {
@@ -281,77 +582,124 @@ class ToolRegistry:
         limit: int = 50
     ) -> Dict[str, Any]:
         """Query database with filters and aggregations."""
-        
-        # Map table names to models
-        table_map = {
-            "products": models.Product,
-            "expenses": models.Expense,
-            "deals": models.Deal,
-            "suppliers": models.Supplier,
-            "inventory": models.InventoryItem,
-            "clients": models.Client
-        }
-        
-        model = table_map.get(table)
+        model = QUERY_DB_TABLES.get(table)
         if not model:
             return {"error": f"Unknown table: {table}"}
         
-        # Build base query
-        query = select(model).where(model.tenant_id == self.tenant_id)
-        
-        # Apply filters
-        if filters:
-            for key, value in filters.items():
-                if key.endswith("_gte"):
-                    field_name = key[:-4]
-                    if hasattr(model, field_name):
-                        query = query.where(getattr(model, field_name) >= value)
-                elif key.endswith("_lte"):
-                    field_name = key[:-4]
-                    if hasattr(model, field_name):
-                        query = query.where(getattr(model, field_name) <= value)
-                elif key.endswith("_like"):
-                    field_name = key[:-5]
-                    if hasattr(model, field_name):
-                        query = query.where(getattr(model, field_name).ilike(f"%{value}%"))
-                elif hasattr(model, key):
-                    query = query.where(getattr(model, key) == value)
-        
-        # Apply ordering
-        if order_by:
-            desc = order_by.startswith("-")
-            field_name = order_by.lstrip("-")
-            if hasattr(model, field_name):
-                order_col = getattr(model, field_name)
-                query = query.order_by(order_col.desc() if desc else order_col)
+        aggregate = bool(aggregations or group_by)
+        plan, order_clause = _query_db_plan(table, tuple(filters or ()), None if aggregate else order_by)
+        
+        columns = model.__table__.c
+        if aggregate:
+            groups, selected, order_clause = _query_db_aggregate_plan(
+                table, tuple(aggregations or ()), tuple(group_by or ()), order_by,
+                self.db.bind.dialect.name,
+            )
+            query = select(*selected).where(columns.tenant_id == self.tenant_id).group_by(*groups)
+        else:
+            # Plain columns: rows come back as mappings without ORM identity-map work
+            query = select(*columns).where(columns.tenant_id == self.tenant_id)
+        for key, column, op in plan:
+            value = filters[key]
+            if op == "gte":
+                query = query.where(column >= value)
+            elif op == "lte":
+                query = query.where(column <= value)
+            elif op == "like":
+                # Served by the pg_trgm indexes on product, supplier and client names
+                query = query.where(column.ilike(f"%{value}%"))
+            else:
+                query = query.where(column == value)
+        
+        if order_clause is not None:
+            query = query.order_by(order_clause)
         
         # Apply limit
         query = query.limit(min(limit, 100))
         
         # Execute query
         result = await self.db.execute(query)
-        rows = result.scalars().all()
         
         # Convert to dicts
         data = []
-        for row in rows:
+        for row in result.mappings():
             row_dict = {}
-            for col in row.__table__.columns:
-                val = getattr(row, col.name)
+            for name, val in row.items():
                 if isinstance(val, (datetime, date)):
                     val = val.isoformat()
                 elif isinstance(val, Decimal):
                     val = float(val)
-                row_dict[col.name] = val
+                row_dict[name] = val
             data.append(row_dict)
         
         return {
             "rows": data,
             "total": len(data),
             "table": table,
-            "sources": [f"{table}#{row['id']}" for row in data]
+            # Aggregated rows summarize the table rather than single records
+            "sources": [table] if aggregate else [f"{table}#{row['id']}" for row in data]
         }
 
+    async def _has_materialized_view(self, view_name: str) -> bool:
+        if self.db.bind.dialect.name != "postgresql":
+            return False
+        if view_name not in _MATERIALIZED_VIEWS:
+            exists = await self.db.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": view_name})
+            _MATERIALIZED_VIEWS[view_name] = bool(exists)
+        return _MATERIALIZED_VIEWS[view_name]
+
+    async def _reads_view(self, view_name: str) -> bool:
+        """Whether to read a pre-aggregated view; records it for _views_pending_refresh."""
+        if not await self._has_materialized_view(view_name):
+            return False
+        self._views_read.add(view_name)
+        return True
+
+    async def _views_pending_refresh(self) -> bool:
+        """
+        True when a view read by this call has writes its last refresh missed. Such a
+        result is stale until the next beat refresh, so it must not be cached past it.
+        """
+        if not self._views_read:
+            return False
+        query = text(
+            "SELECT count(*) FROM mv_refresh_state WHERE dirty AND view_name IN :names"
+        ).bindparams(bindparam("names", expanding=True))
+        return bool(await self.db.scalar(query, {"names": sorted(self._views_read)}))
+
+    async def _use_daily_rollup(self) -> bool:
+        # Day totals pre-aggregated by mv_daily_rollup (refreshed every minute)
+        return await self._reads_view("mv_daily_rollup")
+
+    @staticmethod
+    def _rollup_deal_days(start_date: date, end_date: date) -> tuple:
+        # Same range as created_at >= start_date AND created_at <= end_date, where end_date
+        # compares as its midnight, so the end day itself is not included
+        return models.DailyRollup.day >= start_date, models.DailyRollup.day < end_date
+
+    async def _deal_totals(self, start_date: Optional[date], end_date: Optional[date]) -> Tuple[float, float]:
+        """(revenue, cogs) of the tenant's non-cancelled deals in one query."""
+        if await self._use_daily_rollup():
+            rollup = models.DailyRollup
+            query = select(
+                func.coalesce(func.sum(rollup.revenue), 0),
+                func.coalesce(func.sum(rollup.cogs), 0),
+            ).where(rollup.tenant_id == self.tenant_id)
+            if start_date and end_date:
+                query = query.where(*self._rollup_deal_days(start_date, end_date))
+        else:
+            query = select(
+                func.coalesce(func.sum(models.Deal.total_price), 0),
+                func.coalesce(func.sum(models.Deal.total_cost), 0),
+            ).where(
+                models.Deal.tenant_id == self.tenant_id,
+                models.Deal.status != 'cancelled'
+            )
+            if start_date and end_date:
+                query = query.where(models.Deal.created_at >= start_date, models.Deal.created_at <= end_date)
+        revenue, cogs = (await self.db.execute(query)).one()
+        return float(revenue), float(cogs)
+
     async def _tool_calculate_metrics(
         self,
         metric_type: str,
@@ -363,80 +711,70 @@ class ToolRegistry:
         start_date = None
         end_date = None
         if date_range and len(date_range) == 2:
-            start_date = datetime.strptime(date_range[0], "%Y-%m-%d").date()
-            end_date = datetime.strptime(date_range[1], "%Y-%m-%d").date()
+            start_date = _parse_ymd(date_range[0])
+            end_date = _parse_ymd(date_range[1])
         
-        if metric_type == "revenue":
-            query = select(func.sum(models.Deal.total_price)).where(
-                models.Deal.tenant_id == self.tenant_id,
-                models.Deal.status != 'cancelled'
-            )
-            if start_date and end_date:
-                query = query.where(models.Deal.created_at >= start_date, models.Deal.created_at <= end_date)
-            result = await self.db.execute(query)
-            value = result.scalar() or Decimal(0)
-            return {
-                "value": float(value),
-                "metric": "revenue",
-                "formula": "SUM(deals.total_price) WHERE status != 'cancelled'",
-                "date_range": date_range,
-                "sources": ["deals"]
-            }
-        
-        elif metric_type == "cogs":
-            query = select(func.sum(models.Deal.total_cost)).where(
-                models.Deal.tenant_id == self.tenant_id,
-                models.Deal.status != 'cancelled'
-            )
-            if start_date and end_date:
-                query = query.where(models.Deal.created_at >= start_date, models.Deal.created_at <= end_date)
-            result = await self.db.execute(query)
-            value = result.scalar() or Decimal(0)
-            return {
-                "value": float(value),
-                "metric": "cogs",
-                "formula": "SUM(deals.total_cost)",
-                "date_range": date_range,
-                "sources": ["deals"]
-            }
-        
-        elif metric_type == "gross_profit":
-            revenue = await self._tool_calculate_metrics("revenue", date_range, filters)
-            cogs = await self._tool_calculate_metrics("cogs", date_range, filters)
-            value = revenue["value"] - cogs["value"]
-            return {
-                "value": value,
-                "metric": "gross_profit",
-                "formula": "revenue - COGS",
-                "inputs": {"revenue": revenue["value"], "cogs": cogs["value"]},
-                "date_range": date_range,
-                "sources": ["deals"]
-            }
-        
-        elif metric_type == "gross_margin":
-            revenue = await self._tool_calculate_metrics("revenue", date_range, filters)
-            gross_profit = await self._tool_calculate_metrics("gross_profit", date_range, filters)
-            if revenue["value"] > 0:
-                value = (gross_profit["value"] / revenue["value"]) * 100
+        if metric_type in ("revenue", "cogs", "gross_profit", "gross_margin"):
+            # One aggregate over deals serves all four metrics
+            revenue, cogs = await self._deal_totals(start_date, end_date)
+            
+            if metric_type == "revenue":
+                return {
+                    "value": revenue,
+                    "metric": "revenue",
+                    "formula": "SUM(deals.total_price) WHERE status != 'cancelled'",
+                    "date_range": date_range,
+                    "sources": ["deals"]
+                }
+            
+            if metric_type == "cogs":
+                return {
+                    "value": cogs,
+                    "metric": "cogs",
+                    "formula": "SUM(deals.total_cost)",
+                    "date_range": date_range,
+                    "sources": ["deals"]
+                }
+            
+            gross_profit = revenue - cogs
+            if metric_type == "gross_profit":
+                return {
+                    "value": gross_profit,
+                    "metric": "gross_profit",
+                    "formula": "revenue - COGS",
+                    "inputs": {"revenue": revenue, "cogs": cogs},
+                    "date_range": date_range,
+                    "sources": ["deals"]
+                }
+            
+            if revenue > 0:
+                value = (gross_profit / revenue) * 100
             else:
                 value = 0
             return {
                 "value": round(value, 2),
                 "metric": "gross_margin_percent",
                 "formula": "(gross_profit / revenue) * 100",
-                "inputs": {"gross_profit": gross_profit["value"], "revenue": revenue["value"]},
+                "inputs": {"gross_profit": gross_profit, "revenue": revenue},
                 "date_range": date_range,
                 "sources": ["deals"]
             }
         
         elif metric_type == "total_expenses":
-            query = select(func.sum(models.Expense.amount)).where(
-                models.Expense.tenant_id == self.tenant_id
-            )
-            if start_date and end_date:
-                query = query.where(models.Expense.date >= start_date, models.Expense.date <= end_date)
-            if filters and filters.get("category"):
-                query = query.where(models.Expense.category == filters["category"])
+            category = filters.get("category") if filters else None
+            if not category and await self._use_daily_rollup():
+                rollup = models.DailyRollup
+                query = select(func.sum(rollup.expenses)).where(rollup.tenant_id == self.tenant_id)
+                if start_date and end_date:
+                    query = query.where(rollup.day >= start_date, rollup.day <= end_date)
+            else:
+                query = select(func.sum(models.Expense.amount)).where(
+                    models.Expense.tenant_id == self.tenant_id
+                )
+                if start_date and end_date:
+                    query = query.where(models.Expense.date >= start_date, models.Expense.date <= end_date)
+                if category:
+                    query = query.where(models.Expense.category == category)
             result = await self.db.execute(query)
             value = result.scalar() or Decimal(0)
             return {
@@ -448,9 +786,15 @@ class ToolRegistry:
             }
         
         elif metric_type == "inventory_value":
-            query = select(
-                func.sum(models.InventoryItem.remaining_quantity * models.InventoryItem.unit_cost)
-            ).where(models.InventoryItem.tenant_id == self.tenant_id)
+            if await self._reads_view("mv_product_stock"):
+                # Pre-aggregated per product by mv_product_stock
+                query = select(func.sum(models.ProductStock.stock_value)).where(
+                    models.ProductStock.tenant_id == self.tenant_id
+                )
+            else:
+                query = select(
+                    func.sum(models.InventoryItem.remaining_quantity * models.InventoryItem.unit_cost)
+                ).where(models.InventoryItem.tenant_id == self.tenant_id)
             result = await self.db.execute(query)
             value = result.scalar() or Decimal(0)
             return {
@@ -461,12 +805,20 @@ class ToolRegistry:
             }
         
         elif metric_type == "average_order_value":
-            query = select(func.avg(models.Deal.total_price)).where(
-                models.Deal.tenant_id == self.tenant_id,
-                models.Deal.status != 'cancelled'
-            )
-            if start_date and end_date:
-                query = query.where(models.Deal.created_at >= start_date, models.Deal.created_at <= end_date)
+            if await self._use_daily_rollup():
+                rollup = models.DailyRollup
+                query = select(
+                    func.sum(rollup.revenue) / func.nullif(func.sum(rollup.orders), 0)
+                ).where(rollup.tenant_id == self.tenant_id)
+                if start_date and end_date:
+                    query = query.where(*self._rollup_deal_days(start_date, end_date))
+            else:
+                query = select(func.avg(models.Deal.total_price)).where(
+                    models.Deal.tenant_id == self.tenant_id,
+                    models.Deal.status != 'cancelled'
+                )
+                if start_date and end_date:
+                    query = query.where(models.Deal.created_at >= start_date, models.Deal.created_at <= end_date)
             result = await self.db.execute(query)
             value = result.scalar() or Decimal(0)
             return {
@@ -488,9 +840,33 @@ class ToolRegistry:
     ) -> Dict[str, Any]:
         """Get inventory status with dead stock detection."""
         
-        # Get products with inventory
+        # Stock and last sale per product come from grouped subqueries joined onto
+        # products, so the whole status is one round-trip regardless of product count
+        stock = (
+            select(
+                models.Inventory.product_id,
+                func.sum(models.Inventory.quantity).label("qty"),
+            )
+            # inventory has no tenant_id; scope it through its product
+            .join(models.Product, models.Product.id == models.Inventory.product_id)
+            .where(models.Product.tenant_id == self.tenant_id)
+            .group_by(models.Inventory.product_id)
+            .subquery()
+        )
+        last_sales = (
+            select(
+                models.DealItem.product_id,
+                func.max(models.Deal.created_at).label("last_sale"),
+            )
+            .join(models.Deal, models.Deal.id == models.DealItem.deal_id)
+            .where(models.Deal.tenant_id == self.tenant_id)
+            .group_by(models.DealItem.product_id)
+            .subquery()
+        )
         query = (
-            select(models.Product)
+            select(models.Product, stock.c.qty, last_sales.c.last_sale)
+            .outerjoin(stock, stock.c.product_id == models.Product.id)
+            .outerjoin(last_sales, last_sales.c.product_id == models.Product.id)
             .where(models.Product.tenant_id == self.tenant_id)
         )
         
@@ -500,26 +876,14 @@ class ToolRegistry:
             query = query.where(models.Product.category == category)
         
         result = await self.db.execute(query)
-        products = result.scalars().all()
         
         items = []
         total_value = Decimal(0)
         dead_stock_value = Decimal(0)
         
-        for product in products:
-            # Get inventory quantity
-            inv_query = select(func.sum(models.Inventory.quantity)).where(
-                models.Inventory.product_id == product.id
-            )
-            inv_result = await self.db.execute(inv_query)
-            qty = inv_result.scalar() or Decimal(0)
-            
-            # Get last sale date
-            last_sale_query = select(func.max(models.Deal.created_at)).join(
-                models.DealItem
-            ).where(models.DealItem.product_id == product.id)
-            last_sale_result = await self.db.execute(last_sale_query)
-            last_sale = last_sale_result.scalar()
+        # Totals cover every matching product, so the stock/sale filters stay below
+        for product, qty, last_sale in result.all():
+            qty = qty or Decimal(0)
             
             days_since_sale = None
             if last_sale:
@@ -571,25 +935,39 @@ class ToolRegistry:
     ) -> Dict[str, Any]:
         """Analyze expenses with trends."""
         
-        start_date = datetime.strptime(date_range[0], "%Y-%m-%d").date()
-        end_date = datetime.strptime(date_range[1], "%Y-%m-%d").date()
+        start_date = _parse_ymd(date_range[0])
+        end_date = _parse_ymd(date_range[1])
         
-        # Current period expenses
-        query = select(models.Expense).where(
-            models.Expense.tenant_id == self.tenant_id,
-            models.Expense.date >= start_date,
-            models.Expense.date <= end_date
-        )
-        result = await self.db.execute(query)
-        expenses = result.scalars().all()
+        expense = models.Expense
+        category = func.coalesce(func.nullif(expense.category, ''), 'Uncategorized')
+        is_current = expense.date >= start_date
         
-        total = sum(e.amount for e in expenses)
+        # Previous period: same length, ending the day before start_date
+        period_days = (end_date - start_date).days
+        prev_end = start_date - timedelta(days=1)
+        prev_start = prev_end - timedelta(days=period_days)
+        
+        # Per-category totals for the current (and previous) period in one pass, as
+        # filtered aggregates (FILTER (WHERE ...); SQLite supports it since 3.30)
+        totals_query = (
+            select(
+                category.label("category"),
+                func.sum(expense.amount).filter(is_current).label("current"),
+                func.sum(expense.amount).filter(~is_current).label("previous"),
+                func.count().filter(is_current).label("current_count"),
+            )
+            .where(
+                expense.tenant_id == self.tenant_id,
+                expense.date >= (prev_start if compare_with_previous else start_date),
+                expense.date <= end_date
+            )
+            .group_by(category)
+        )
+        rows = [row for row in (await self.db.execute(totals_query)).all() if row.current_count]
         
-        # Group by category
-        breakdown = {}
-        for expense in expenses:
-            cat = expense.category or "Uncategorized"
-            breakdown[cat] = breakdown.get(cat, Decimal(0)) + expense.amount
+        breakdown = {row.category: row.current for row in rows}
+        total = sum(breakdown.values(), Decimal(0))
+        expense_count = sum(row.current_count for row in rows)
         
         # Convert to list with percentages
         breakdown_list = []
@@ -605,27 +983,10 @@ class ToolRegistry:
         
         trends = []
         if compare_with_previous:
-            # Calculate previous period
-            period_days = (end_date - start_date).days
-            prev_end = start_date - timedelta(days=1)
-            prev_start = prev_end - timedelta(days=period_days)
-            
-            prev_query = select(models.Expense).where(
-                models.Expense.tenant_id == self.tenant_id,
-                models.Expense.date >= prev_start,
-                models.Expense.date <= prev_end
-            )
-            prev_result = await self.db.execute(prev_query)
-            prev_expenses = prev_result.scalars().all()
-            
-            prev_breakdown = {}
-            for expense in prev_expenses:
-                cat = expense.category or "Uncategorized"
-                prev_breakdown[cat] = prev_breakdown.get(cat, Decimal(0)) + expense.amount
-            
             # Calculate trends
-            for cat, amount in breakdown.items():
-                prev_amount = prev_breakdown.get(cat, Decimal(0))
+            for row in rows:
+                amount = row.current
+                prev_amount = row.previous or Decimal(0)
                 if prev_amount > 0:
                     change_pct = ((amount - prev_amount) / prev_amount * 100)
                 else:
@@ -633,37 +994,58 @@ class ToolRegistry:
                 
                 if abs(change_pct) > 10:  # Only significant changes
                     trends.append({
-                        "category": cat,
+                        "category": row.category,
                         "current": float(amount),
                         "previous": float(prev_amount),
                         "change_pct": round(float(change_pct), 1),
                         "direction": "up" if change_pct > 0 else "down"
                     })
         
-        # Detect anomalies (expenses > 2x average for category)
-        anomalies = []
-        for cat, amount in breakdown.items():
-            cat_expenses = [e for e in expenses if (e.category or "Uncategorized") == cat]
-            if len(cat_expenses) > 1:
-                avg = amount / len(cat_expenses)
-                for e in cat_expenses:
-                    if e.amount > avg * 2:
-                        anomalies.append({
-                            "expense_id": e.id,
-                            "date": e.date.isoformat(),
-                            "amount": float(e.amount),
-                            "category": cat,
-                            "reason": f"Amount is {float(e.amount/avg):.1f}x the category average"
-                        })
+        # Detect anomalies (expenses > 2x average for category), largest first
+        current_filter = (
+            expense.tenant_id == self.tenant_id,
+            expense.date >= start_date,
+            expense.date <= end_date
+        )
+        per_row = (
+            select(
+                expense.id,
+                expense.date,
+                expense.amount,
+                category.label("category"),
+                func.avg(expense.amount).over(partition_by=category).label("category_avg"),
+                func.count().over(partition_by=category).label("category_count"),
+            )
+            .where(*current_filter)
+            .subquery()
+        )
+        anomalies_query = (
+            select(per_row)
+            .where(per_row.c.category_count > 1, per_row.c.amount > per_row.c.category_avg * 2)
+            .order_by((per_row.c.amount / per_row.c.category_avg).desc())
+            .limit(5)
+        )
+        anomalies = [
+            {
+                "expense_id": row.id,
+                "date": row.date.isoformat(),
+                "amount": float(row.amount),
+                "category": row.category,
+                "reason": f"Amount is {float(row.amount) / float(row.category_avg):.1f}x the category average"
+            }
+            for row in (await self.db.execute(anomalies_query)).all()
+        ]
+        
+        expense_ids = (await self.db.execute(select(expense.id).where(*current_filter))).scalars().all()
         
         return {
             "total": float(total),
             "breakdown": breakdown_list,
             "trends": trends,
-            "anomalies": anomalies[:5],  # Limit to top 5
-            "expense_count": len(expenses),
+            "anomalies": anomalies,
+            "expense_count": expense_count,
             "date_range": date_range,
-            "sources": [f"expense#{e.id}" for e in expenses]
+            "sources": [f"expense#{expense_id}" for expense_id in expense_ids]
         }
 
     async def _tool_find_duplicates(
@@ -681,29 +1063,22 @@ class ToolRegistry:
             items = result.scalars().all()
             
             duplicates = []
-            checked = set()
-            
-            for i, item1 in enumerate(items):
-                for item2 in items[i+1:]:
-                    if (item1.id, item2.id) in checked:
-                        continue
-                    
-                    # Compare titles
-                    score = fuzz.ratio(item1.title.lower(), item2.title.lower())
-                    if score >= threshold:
-                        duplicates.append({
-                            "ids": [item1.id, item2.id],
-                            "names": [item1.title, item2.title],
-                            "skus": [item1.sku, item2.sku],
-                            "similarity_score": score / 100,
-                            "suggested_action": "merge" if score >= 95 else "review"
-                        })
-                        checked.add((item1.id, item2.id))
+            pairs = _similar_pairs([item.title for item in items], threshold)
+            for i, j, score in _most_similar(pairs):
+                item1, item2 = items[i], items[j]
+                duplicates.append({
+                    "ids": [item1.id, item2.id],
+                    "names": [item1.title, item2.title],
+                    "skus": [item1.sku, item2.sku],
+                    "similarity_score": score / 100,
+                    "suggested_action": "merge" if score >= 95 else "review"
+                })
             
             return {
                 "entity_type": entity_type,
                 "duplicate_groups": duplicates,
-                "count": len(duplicates),
+                "count": len(pairs),
+                "truncated": len(pairs) > len(duplicates),
                 "sources": [f"product#{d['ids'][0]}" for d in duplicates]
             }
         
@@ -713,21 +1088,21 @@ class ToolRegistry:
             items = result.scalars().all()
             
             duplicates = []
-            for i, item1 in enumerate(items):
-                for item2 in items[i+1:]:
-                    score = fuzz.ratio(item1.name.lower(), item2.name.lower())
-                    if score >= threshold:
-                        duplicates.append({
-                            "ids": [item1.id, item2.id],
-                            "names": [item1.name, item2.name],
-                            "similarity_score": score / 100,
-                            "suggested_action": "merge" if score >= 95 else "review"
-                        })
+            pairs = _similar_pairs([item.name for item in items], threshold)
+            for i, j, score in _most_similar(pairs):
+                item1, item2 = items[i], items[j]
+                duplicates.append({
+                    "ids": [item1.id, item2.id],
+                    "names": [item1.name, item2.name],
+                    "similarity_score": score / 100,
+                    "suggested_action": "merge" if score >= 95 else "review"
+                })
             
             return {
                 "entity_type": entity_type,
                 "duplicate_groups": duplicates,
-                "count": len(duplicates),
+                "count": len(pairs),
+                "truncated": len(pairs) > len(duplicates),
                 "sources": [f"supplier#{d['ids'][0]}" for d in duplicates]
             }
         
@@ -737,22 +1112,22 @@ class ToolRegistry:
             items = result.scalars().all()
             
             duplicates = []
-            for i, item1 in enumerate(items):
-                for item2 in items[i+1:]:
-                    score = fuzz.ratio(item1.name.lower(), item2.name.lower())
-                    if score >= threshold:
-                        duplicates.append({
-                            "ids": [item1.id, item2.id],
-                            "names": [item1.name, item2.name],
-                            "emails": [item1.email, item2.email],
-                            "similarity_score": score / 100,
-                            "suggested_action": "merge" if score >= 95 else "review"
-                        })
+            pairs = _similar_pairs([item.name for item in items], threshold)
+            for i, j, score in _most_similar(pairs):
+                item1, item2 = items[i], items[j]
+                duplicates.append({
+                    "ids": [item1.id, item2.id],
+                    "names": [item1.name, item2.name],
+                    "emails": [item1.email, item2.email],
+                    "similarity_score": score / 100,
+                    "suggested_action": "merge" if score >= 95 else "review"
+                })
             
             return {
                 "entity_type": entity_type,
                 "duplicate_groups": duplicates,
-                "count": len(duplicates),
+                "count": len(pairs),
+                "truncated": len(pairs) > len(duplicates),
                 "sources": [f"client#{d['ids'][0]}" for d in duplicates]
             }
         
@@ -766,48 +1141,48 @@ class ToolRegistry:
     ) -> Dict[str, Any]:
         """Calculate suggested prices for target margin."""
         
-        query = select(models.Product).where(models.Product.tenant_id == self.tenant_id)
+        target_margin = target_margin_percent / 100
+        product = models.Product
+        cost = product.default_cost
+        price = product.default_price
+        # Margin as a float: SQLite would otherwise divide integer-valued numerics as integers
+        current_margin = case(
+            (price > 0, cast(price - cost, Float) / cast(price, Float)),
+            else_=0.0,
+        )
+        
+        query = (
+            select(
+                product.id, product.sku, product.title, product.category,
+                cost, price, current_margin.label("current_margin"),
+            )
+            .where(product.tenant_id == self.tenant_id, cost > 0)
+            # Biggest gap to the target first
+            .order_by(current_margin.asc(), product.id)
+        )
         if category:
-            query = query.where(models.Product.category == category)
+            query = query.where(product.category == category)
+        if only_below_target:
+            query = query.where(current_margin < target_margin)
         
         result = await self.db.execute(query)
-        products = result.scalars().all()
         
         suggestions = []
-        target_margin = target_margin_percent / 100
-        
-        for product in products:
-            if not product.default_cost or product.default_cost <= 0:
-                continue
+        for row in result.all():
+            cost_value = float(row.default_cost)
+            current_price = float(row.default_price) if row.default_price else 0
             
-            cost = float(product.default_cost)
-            current_price = float(product.default_price) if product.default_price else 0
-            
-            # Calculate current margin
-            if current_price > 0:
-                current_margin = (current_price - cost) / current_price
-            else:
-                current_margin = 0
-            
-            # Calculate suggested price for target margin
-            # margin = (price - cost) / price
-            # price * margin = price - cost
-            # price - price * margin = cost
-            # price * (1 - margin) = cost
-            # price = cost / (1 - margin)
-            suggested_price = cost / (1 - target_margin)
-            
-            if only_below_target and current_margin >= target_margin:
-                continue
+            # margin = (price - cost) / price  =>  price = cost / (1 - margin)
+            suggested_price = cost_value / (1 - target_margin)
             
             suggestions.append({
-                "product_id": product.id,
-                "sku": product.sku,
-                "title": product.title,
-                "category": product.category,
-                "cost": cost,
+                "product_id": row.id,
+                "sku": row.sku,
+                "title": row.title,
+                "category": row.category,
+                "cost": cost_value,
                 "current_price": current_price,
-                "current_margin_pct": round(current_margin * 100, 1),
+                "current_margin_pct": round(float(row.current_margin) * 100, 1),
                 "suggested_price": round(suggested_price, 2),
                 "price_increase": round(suggested_price - current_price, 2) if current_price else suggested_price
             })
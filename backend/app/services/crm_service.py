@@ -178,7 +178,6 @@ async def create_deal_with_items(
         extra_data=deal_data.extra_data,
         total_price=initial_total_price,
         total_cost=initial_total_cost,
-        margin=initial_total_price - initial_total_cost,
         # Additional fields
         start_date=deal_data.start_date,
         completion_date=deal_data.completion_date,
@@ -193,6 +192,7 @@ async def create_deal_with_items(
 
     db.add(deal)
     await db.flush()
+    await crud.adjust_client_deals_count(db, deal.client_id, 1)
     
     # Handle observers (many-to-many relationship)
     if deal_data.observer_ids:
@@ -204,6 +204,8 @@ async def create_deal_with_items(
     # Calculate totals from items (add to initial values if provided)
     items_total_price = Decimal("0")
     items_total_cost = Decimal("0")
+    # Added after the loop so the FIFO queries' autoflush doesn't insert items one by one
+    deal_items = []
 
     for item_data in deal_data.items or []:
 
@@ -239,13 +241,15 @@ async def create_deal_with_items(
             total_cost=quantity * unit_cost
         )
 
-        db.add(deal_item)
+        deal_items.append(deal_item)
 
         await deduct_inventory_fifo(db, item_data.product_id, quantity)
 
         items_total_price += deal_item.total_price
         items_total_cost += deal_item.total_cost
 
+    db.add_all(deal_items)
+
     # If items were provided, use items totals (they override initial values)
     # Otherwise keep initial values (from payload.total_price/total_cost)
     if deal_data.items and len(deal_data.items) > 0:
@@ -253,8 +257,6 @@ async def create_deal_with_items(
         deal.total_price = items_total_price
         deal.total_cost = items_total_cost
     # else: keep initial values (already set from payload)
-    
-    deal.margin = deal.total_price - deal.total_cost
 
     await db.commit()
 
@@ -262,7 +264,7 @@ async def create_deal_with_items(
         select(models.Deal)
         .options(
             selectinload(models.Deal.client),
-            selectinload(models.Deal.items).selectinload(models.DealItem.product).selectinload(models.Product.inventory_records),
+            selectinload(models.Deal.items).selectinload(models.DealItem.product),
             selectinload(models.Deal.responsible),
             selectinload(models.Deal.observers)
         )
@@ -338,7 +340,6 @@ async def recalculate_deal_totals(
     # Update deal totals
     deal.total_price = total_price
     deal.total_cost = total_cost
-    deal.margin = total_price - total_cost
     
     await db.commit()
     await db.refresh(deal)
@@ -378,11 +379,10 @@ async def recalculate_all_deals_totals(
         if deal.total_price != total_price or deal.total_cost != total_cost:
             deal.total_price = total_price
             deal.total_cost = total_cost
-            deal.margin = total_price - total_cost
             updated_count += 1
             logger.info(
                 f"Updated deal {deal.id}: total_price={total_price}, "
-                f"total_cost={total_cost}, margin={deal.margin}"
+                f"total_cost={total_cost}, margin={total_price - total_cost}"
             )
     
     await db.commit()
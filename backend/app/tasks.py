@@ -22,24 +22,16 @@ SyncSession = sessionmaker(bind=sync_engine)
 @celery_app.task(name="recalc_deal_margin")
 def recalc_deal_margin(deal_id: int):
     """
-    Task: recalc margin for deal (example heavy task).
-    This is synchronous code — Celery worker runs it.
+    Task: report the margin for a deal.
+    deals.margin is a generated column (total_price - total_cost), so the
+    database keeps it current; this only reads it back for callers.
     """
     session = SyncSession()
     try:
-        # simple raw SQL for demo (or use ORM mapped classes)
-        r = session.execute(text("SELECT id, total_price, total_cost FROM deals WHERE id = :id"), {"id": deal_id}).fetchone()
+        r = session.execute(text("SELECT margin FROM deals WHERE id = :id"), {"id": deal_id}).fetchone()
         if not r:
             return {"status": "not_found", "deal_id": deal_id}
-        total_price = float(r[1] or 0)
-        total_cost = float(r[2] or 0)
-        margin = total_price - total_cost
-        session.execute(text("UPDATE deals SET margin = :m WHERE id = :id"), {"m": margin, "id": deal_id})
-        session.commit()
-        return {"status": "ok", "deal_id": deal_id, "margin": margin}
-    except Exception as e:
-        session.rollback()
-        raise
+        return {"status": "ok", "deal_id": deal_id, "margin": float(r[0] or 0)}
     finally:
         session.close()
 
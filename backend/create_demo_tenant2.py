@@ -93,12 +93,13 @@ async def create_demo_deal_for_tenant_2():
                 status=deal_data["status"],
                 total_price=deal_data["total_price"],
                 total_cost=deal_data["total_cost"],
-                margin=deal_data["total_price"] - deal_data["total_cost"],
                 currency="KZT",
                 created_at=datetime.utcnow()
             )
             session.add(deal)
             print(f"  ✅ {deal.title} (статус: {deal.status}, выручка: {deal.total_price})")
+        # Same bookkeeping as crud.adjust_client_deals_count
+        client.deals_count = (client.deals_count or 0) + len(deals_to_create)
         
         await session.commit()
         
@@ -59,12 +59,11 @@ async def fix_deal_totals():
                 # Update the deal
                 await db.execute(text("""
                     UPDATE deals 
-                    SET total_price = :price, total_cost = :cost, margin = :margin
+                    SET total_price = :price, total_cost = :cost
                     WHERE id = :deal_id
                 """), {
                     "price": float(items_price),
                     "cost": float(items_cost),
-                    "margin": float(new_margin),
                     "deal_id": deal_id
                 })
                 
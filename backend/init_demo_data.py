@@ -92,14 +92,13 @@ async def init_demo_data():
             
             for title, price, cost, status, days_ago in deals_data:
                 created = now - timedelta(days=days_ago)
-                margin = price - cost
                 await db.execute(text("""
                     INSERT INTO deals (
-                        tenant_id, client_id, title, total_price, total_cost, margin, 
+                        tenant_id, client_id, title, total_price, total_cost, 
                         currency, status, created_at, updated_at, is_available_to_all
                     )
                     VALUES (
-                        :tid, :cid, :title, :price, :cost, :margin, 
+                        :tid, :cid, :title, :price, :cost, 
                         'KZT', :status, :created, :created, 1
                     )
                 """), {
@@ -108,11 +107,16 @@ async def init_demo_data():
                     "title": title,
                     "price": price,
                     "cost": cost,
-                    "margin": margin,
                     "status": status,
                     "created": created
                 })
             
+            # Raw inserts bypass crud.adjust_client_deals_count; recount the denormalized counter
+            await db.execute(text("""
+                UPDATE clients
+                SET deals_count = (SELECT count(*) FROM deals WHERE deals.client_id = clients.id)
+                WHERE tenant_id = :tid
+            """), {"tid": tenant_id})
             await db.commit()
             print(f"   ✅ Создано {len(deals_data)} сделок")
         else:
@@ -300,7 +300,6 @@ async def seed_test_user_data():
                     # Calculate totals
                     total_price = sum(p[2] * p[3] for p in deal_products)
                     total_cost = sum(p[1] * p[3] for p in deal_products)
-                    margin = total_price - total_cost
                     
                     # Days ago for created_at
                     days_ago = 90 - (status_idx * 15) - (i * 3)
@@ -312,15 +311,14 @@ async def seed_test_user_data():
                         closed_at = created_at + timedelta(days=10)
                     
                     await db.execute(text("""
-                        INSERT INTO deals (tenant_id, client_id, title, total_price, total_cost, margin, currency, status, is_available_to_all, created_at, updated_at, closed_at)
-                        VALUES (:tid, :cid, :title, :price, :cost, :margin, 'KZT', :status, 1, :created, :created, :closed)
+                        INSERT INTO deals (tenant_id, client_id, title, total_price, total_cost, currency, status, is_available_to_all, created_at, updated_at, closed_at)
+                        VALUES (:tid, :cid, :title, :price, :cost, 'KZT', :status, 1, :created, :created, :closed)
                     """), {
                         "tid": tenant_id,
                         "cid": client_id,
                         "title": title,
                         "price": total_price,
                         "cost": total_cost,
-                        "margin": margin,
                         "status": status,
                         "created": created_at,
                         "closed": closed_at
@@ -351,6 +349,13 @@ async def seed_test_user_data():
                     await db.commit()
                     deal_count += 1
             
+            # Raw inserts bypass crud.adjust_client_deals_count; recount the denormalized counter
+            await db.execute(text("""
+                UPDATE clients
+                SET deals_count = (SELECT count(*) FROM deals WHERE deals.client_id = clients.id)
+                WHERE tenant_id = :tid
+            """), {"tid": tenant_id})
+            await db.commit()
             print(f"   ✅ Создано {deal_count} сделок с товарами")
             
             # Create expenses
@@ -0,0 +1,57 @@
+# tests/test_copilot.py
+"""
+Unit tests for the AI Copilot service
+"""
+import pytest
+from datetime import datetime, timedelta
+
+from app import models
+from app.services.ai.copilot_service import (
+    CopilotService, HISTORY_ANCHOR_MESSAGES, HISTORY_RESET_MESSAGES, HISTORY_TAIL_MESSAGES,
+)
+
+
+@pytest.mark.asyncio
+async def test_history_window_moves_in_steps(db_session, demo_tenant, demo_user, monkeypatch):
+    """The history keeps its opening messages and only trims the tail a whole step at a time"""
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    service = CopilotService(db_session, demo_tenant.id, demo_user.id)
+    conversation = models.CopilotConversation(tenant_id=demo_tenant.id, user_id=demo_user.id)
+    db_session.add(conversation)
+    await db_session.commit()
+
+    step = HISTORY_RESET_MESSAGES - HISTORY_TAIL_MESSAGES
+    started = datetime(2025, 1, 1, 12, 0)
+    ids = []
+    previous = []
+    trims = 0
+    for n in range(1, 110):
+        message = models.CopilotMessage(
+            conversation_id=conversation.id,
+            role=models.MessageRole.user if n % 2 else models.MessageRole.assistant,
+            content=f"message {n}",
+            created_at=started + timedelta(seconds=n),
+        )
+        db_session.add(message)
+        await db_session.commit()
+        ids.append(message.id)
+
+        window = [m.id for m in await service.get_history_messages(conversation.id)]
+        dropped = n - len(window)
+
+        assert window[:HISTORY_ANCHOR_MESSAGES] == ids[:HISTORY_ANCHOR_MESSAGES]
+        assert window[HISTORY_ANCHOR_MESSAGES:] == ids[HISTORY_ANCHOR_MESSAGES + dropped:]
+        assert len(window) <= HISTORY_ANCHOR_MESSAGES + HISTORY_RESET_MESSAGES
+        assert dropped % step == 0
+        if n <= HISTORY_ANCHOR_MESSAGES + HISTORY_RESET_MESSAGES:
+            assert dropped == 0
+        else:
+            assert len(window) >= HISTORY_ANCHOR_MESSAGES + HISTORY_TAIL_MESSAGES
+        # Between step boundaries the previous turn's history is a prefix of this one
+        if window[:len(previous)] != previous:
+            trims += 1
+            assert len(window) <= HISTORY_ANCHOR_MESSAGES + HISTORY_TAIL_MESSAGES + 1
+        previous = window
+
+    # With 109 messages the tail is cut at messages 43, 62, 82 and 102
+    assert trims == 4
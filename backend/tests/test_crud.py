@@ -0,0 +1,43 @@
+# tests/test_crud.py
+"""
+Unit tests for CRUD helpers
+"""
+import pytest
+from decimal import Decimal
+from sqlalchemy import select
+
+from app import crud, models, schemas
+
+
+async def _deals_count(db_session, client_id: int) -> int:
+    # adjust_client_deals_count updates in SQL, so read the column rather than a loaded Client
+    return await db_session.scalar(select(models.Client.deals_count).where(models.Client.id == client_id))
+
+
+@pytest.mark.asyncio
+async def test_client_deals_count_follows_deals(db_session, demo_tenant):
+    """clients.deals_count tracks deals created, moved between clients and deleted"""
+    first = await crud.create_client(db_session, demo_tenant.id, schemas.ClientCreate(name="First"))
+    second = await crud.create_client(db_session, demo_tenant.id, schemas.ClientCreate(name="Second"))
+    assert await _deals_count(db_session, first.id) == 0
+
+    deals = []
+    for title in ("Deal 1", "Deal 2"):
+        deal = await crud.create_deal(db_session, demo_tenant.id, schemas.DealCreate(
+            client_id=first.id, title=title, total_price=Decimal("100.00"), total_cost=Decimal("40.00"),
+        ))
+        deals.append(deal)
+    assert await _deals_count(db_session, first.id) == 2
+    assert await _deals_count(db_session, second.id) == 0
+
+    await crud.update_deal(db_session, deals[0].id, schemas.DealUpdate(client_id=second.id))
+    assert await _deals_count(db_session, first.id) == 1
+    assert await _deals_count(db_session, second.id) == 1
+
+    # Updates that keep the client leave the counters alone
+    await crud.update_deal(db_session, deals[1].id, schemas.DealUpdate(client_id=first.id, title="Renamed"))
+    assert await _deals_count(db_session, first.id) == 1
+
+    await crud.delete_deal(db_session, deals[0].id)
+    assert await _deals_count(db_session, second.id) == 0
+    assert await _deals_count(db_session, first.id) == 1
@@ -0,0 +1,60 @@
+# tests/test_schemas.py
+"""
+Unit tests for response schemas
+"""
+import pytest
+from decimal import Decimal
+from app import schemas
+from app.finance import calculate_financials
+
+
+def test_deal_read_money_round_trip():
+    """Money fields hold int cents and serialize back to 2-place decimals"""
+    deal = schemas.DealRead.model_validate({
+        "id": 1,
+        "tenant_id": 1,
+        "client_id": 1,
+        "title": "Test Deal",
+        "total_price": Decimal("1234.56"),
+        "total_cost": 0,
+        "items": [{
+            "id": 1,
+            "deal_id": 1,
+            "product_id": 1,
+            "quantity": Decimal("3"),
+            "unit_price": "19.99",
+            "unit_cost": 0.1,
+        }],
+    })
+
+    assert deal.total_price == 123456
+    assert deal.total_cost == 0
+    assert deal.items[0].unit_cost == 10
+
+    data = deal.model_dump(mode="json")
+    assert data["total_price"] == "1234.56"
+    assert data["total_cost"] == "0.00"
+    assert data["margin"] == "1234.56"
+    assert data["items"][0]["unit_price"] == "19.99"
+    assert data["items"][0]["unit_cost"] == "0.10"
+    assert data["items"][0]["total_price"] == "59.97"
+    assert data["items"][0]["total_cost"] == "0.30"
+
+
+@pytest.mark.asyncio
+async def test_finance_dashboard_matches_calculate_financials(db_session):
+    """Figures derived in FinanceDashboard equal the ones calculate_financials returns"""
+    result = await calculate_financials(
+        db_session,
+        tenant_id=999,
+        revenue_override=Decimal("1234.57"),
+        cogs_override=Decimal("617.29"),
+        opex=Decimal("100.01"),
+        fixed_costs=Decimal("55.55"),
+        variable_costs=Decimal("700.03"),
+        taxes_percent=Decimal("12.50")
+    )
+
+    data = schemas.FinanceDashboard.model_validate(result).model_dump(mode="json")
+    for key, value in result.items():
+        assert data[key] == (None if value is None else str(value)), key
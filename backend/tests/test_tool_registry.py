@@ -0,0 +1,293 @@
+# tests/test_tool_registry.py
+"""
+Unit tests for the AI Copilot tool registry
+"""
+import pytest
+import random
+from datetime import date, datetime
+from decimal import Decimal
+import Levenshtein
+from sqlalchemy import select, text
+
+from app import crud, models, schemas
+from app.services.ai.tool_cache import tool_result_cache
+from app.services.ai.tool_registry import ToolRegistry, _similar_pairs
+
+# SQLite stand-in for the PostgreSQL mv_daily_rollup view (migration e51b7c03a9d4)
+DAILY_ROLLUP_SQL = """
+    CREATE TABLE mv_daily_rollup AS
+    SELECT tenant_id,
+           day,
+           sum(revenue) AS revenue,
+           sum(cogs) AS cogs,
+           sum(orders) AS orders,
+           sum(expenses) AS expenses
+    FROM (
+        SELECT tenant_id, date(created_at) AS day, total_price AS revenue,
+               total_cost AS cogs, 1 AS orders, 0 AS expenses
+        FROM deals
+        UNION ALL
+        SELECT tenant_id, date, 0, 0, 0, amount
+        FROM expenses
+    ) AS daily
+    GROUP BY tenant_id, day
+"""
+
+# SQLite stand-in for mv_refresh_state (migration cad012813801)
+REFRESH_STATE_SQL = """
+    CREATE TABLE mv_refresh_state (view_name TEXT PRIMARY KEY, dirty BOOLEAN NOT NULL)
+"""
+
+METRICS = ("revenue", "cogs", "gross_profit", "gross_margin", "total_expenses", "average_order_value")
+DATE_RANGES = (None, ["2025-01-05", "2025-01-20"], ["2025-01-10", "2025-02-28"])
+
+
+@pytest.fixture(autouse=True)
+def clear_tool_cache():
+    """The result cache is process-wide; keep tests independent"""
+    tool_result_cache.clear()
+    yield
+    tool_result_cache.clear()
+
+
+@pytest.fixture
+async def demo_client(db_session, demo_tenant):
+    client = models.Client(tenant_id=demo_tenant.id, name="Test Client")
+    db_session.add(client)
+    await db_session.commit()
+    return client
+
+
+@pytest.fixture
+async def finance_data(db_session, demo_tenant, demo_client):
+    """Deals and expenses spread over several days, including both ends of DATE_RANGES"""
+    deals = [
+        ("Deal 1", "1000.50", "600.25", datetime(2025, 1, 5, 9, 30)),
+        ("Deal 2", "2500.00", "1800.00", datetime(2025, 1, 5, 18, 0)),
+        ("Deal 3", "700.00", "300.00", datetime(2025, 1, 12, 12, 0)),
+        ("Deal 4", "4200.00", "3900.10", datetime(2025, 1, 20, 8, 0)),
+        ("Deal 5", "150.00", "50.00", datetime(2025, 2, 3, 23, 59)),
+    ]
+    for title, price, cost, created_at in deals:
+        db_session.add(models.Deal(
+            tenant_id=demo_tenant.id,
+            client_id=demo_client.id,
+            title=title,
+            total_price=Decimal(price),
+            total_cost=Decimal(cost),
+            status=models.DealStatus.final_account,
+            created_at=created_at,
+        ))
+    expenses = [
+        ("300.00", "rent", date(2025, 1, 5)),
+        ("120.40", "ads", date(2025, 1, 20)),
+        ("80.00", "ads", date(2025, 2, 1)),
+    ]
+    for amount, category, day in expenses:
+        db_session.add(models.Expense(
+            tenant_id=demo_tenant.id, amount=Decimal(amount), category=category, date=day,
+        ))
+    await db_session.commit()
+
+
+async def _has_daily_rollup(self, view_name):
+    return view_name == "mv_daily_rollup"
+
+
+@pytest.fixture
+async def daily_rollup(db_session, finance_data):
+    """mv_daily_rollup built from finance_data, marked clean in mv_refresh_state"""
+    await db_session.execute(text(DAILY_ROLLUP_SQL))
+    await db_session.execute(text(REFRESH_STATE_SQL))
+    await db_session.execute(text("INSERT INTO mv_refresh_state VALUES ('mv_daily_rollup', 0)"))
+    await db_session.commit()
+    yield
+    await db_session.execute(text("DROP TABLE mv_daily_rollup"))
+    await db_session.execute(text("DROP TABLE mv_refresh_state"))
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_daily_rollup_matches_base_tables(db_session, demo_tenant, daily_rollup, monkeypatch):
+    """Metrics read from mv_daily_rollup equal the same metrics aggregated from deals/expenses"""
+    registry = ToolRegistry(db_session, demo_tenant.id)
+    expected = {}
+    for metric in METRICS:
+        for date_range in DATE_RANGES:
+            result = await registry._tool_calculate_metrics(metric, date_range=date_range)
+            expected[(metric, str(date_range))] = result["value"]
+
+    # Without the view (as on SQLite) the metrics above came from the base tables
+    monkeypatch.setattr(ToolRegistry, "_has_materialized_view", _has_daily_rollup)
+    for metric in METRICS:
+        for date_range in DATE_RANGES:
+            result = await registry._tool_calculate_metrics(metric, date_range=date_range)
+            # Rollup sums are typed Numeric(18, 2), which SQLite rounds to cents
+            assert result["value"] == pytest.approx(expected[(metric, str(date_range))], abs=0.01), (metric, date_range)
+
+    # Sanity check that the ranges actually cut the data
+    assert expected[("revenue", "None")] == pytest.approx(8550.50)
+    assert expected[("revenue", str(DATE_RANGES[1]))] == pytest.approx(4200.50)
+    assert expected[("total_expenses", str(DATE_RANGES[1]))] == pytest.approx(420.40)
+
+
+@pytest.mark.asyncio
+async def test_daily_rollup_results_not_cached_while_dirty(db_session, demo_tenant, daily_rollup, monkeypatch):
+    """A result read from the rollup is only cached once the view has caught up with writes"""
+    monkeypatch.setattr(ToolRegistry, "_has_materialized_view", _has_daily_rollup)
+    registry = ToolRegistry(db_session, demo_tenant.id)
+
+    await db_session.execute(text("UPDATE mv_refresh_state SET dirty = 1"))
+    await db_session.commit()
+    result = await registry.execute("calculate_metrics", {"metric_type": "revenue"})
+    assert result["result"]["value"] == pytest.approx(8550.50)
+    assert tool_result_cache.get(demo_tenant.id, "calculate_metrics", {"metric_type": "revenue"}) is None
+
+    # Category totals read the expenses table, so the dirty view does not matter
+    arguments = {"metric_type": "total_expenses", "filters": {"category": "ads"}}
+    await registry.execute("calculate_metrics", arguments)
+    assert tool_result_cache.get(demo_tenant.id, "calculate_metrics", arguments) is not None
+
+    await db_session.execute(text("UPDATE mv_refresh_state SET dirty = 0"))
+    await db_session.commit()
+    result = await registry.execute("calculate_metrics", {"metric_type": "revenue"})
+    assert tool_result_cache.get(demo_tenant.id, "calculate_metrics", {"metric_type": "revenue"}) == result
+
+
+@pytest.mark.asyncio
+async def test_tool_cache_invalidated_on_write(db_session, demo_tenant, demo_client, finance_data):
+    """A cached result is reused until a unit-of-work write to a tool table drops it"""
+    registry = ToolRegistry(db_session, demo_tenant.id)
+    arguments = {"metric_type": "revenue"}
+
+    first = await registry.execute("calculate_metrics", arguments)
+    assert first["result"]["value"] == pytest.approx(8550.50)
+    assert tool_result_cache.get(demo_tenant.id, "calculate_metrics", arguments) == first
+
+    db_session.add(models.Deal(
+        tenant_id=demo_tenant.id,
+        client_id=demo_client.id,
+        title="Deal 6",
+        total_price=Decimal("49.50"),
+        total_cost=Decimal("10.00"),
+    ))
+    await db_session.commit()
+    assert tool_result_cache.get(demo_tenant.id, "calculate_metrics", arguments) is None
+
+    second = await registry.execute("calculate_metrics", arguments)
+    assert second["result"]["value"] == pytest.approx(8600.00)
+
+
+@pytest.mark.asyncio
+async def test_tool_cache_returns_copies(db_session, demo_tenant, finance_data):
+    """Mutating a returned result does not change what later calls get"""
+    registry = ToolRegistry(db_session, demo_tenant.id)
+    arguments = {"metric_type": "cogs"}
+
+    first = await registry.execute("calculate_metrics", arguments)
+    first["result"]["value"] = -1
+
+    second = await registry.execute("calculate_metrics", arguments)
+    assert second["result"]["value"] == pytest.approx(6650.35)
+
+
+@pytest.mark.asyncio
+async def test_tool_cache_invalidated_by_crud_statements(db_session, demo_tenant, finance_data):
+    """UPDATE/DELETE statements issued by the crud helpers also drop cached results"""
+    registry = ToolRegistry(db_session, demo_tenant.id)
+    arguments = {"metric_type": "revenue"}
+    deal_id = await db_session.scalar(select(models.Deal.id).where(models.Deal.title == "Deal 5"))
+
+    first = await registry.execute("calculate_metrics", arguments)
+    assert first["result"]["value"] == pytest.approx(8550.50)
+
+    await crud.update_deal(db_session, deal_id, schemas.DealUpdate(total_price=Decimal("250.00")))
+    assert tool_result_cache.get(demo_tenant.id, "calculate_metrics", arguments) is None
+    second = await registry.execute("calculate_metrics", arguments)
+    assert second["result"]["value"] == pytest.approx(8650.50)
+
+    await crud.delete_deal(db_session, deal_id)
+    assert tool_result_cache.get(demo_tenant.id, "calculate_metrics", arguments) is None
+    third = await registry.execute("calculate_metrics", arguments)
+    assert third["result"]["value"] == pytest.approx(8400.50)
+
+
+@pytest.mark.asyncio
+async def test_query_db_group_by(db_session, demo_tenant, demo_client, finance_data):
+    """query_db aggregates in SQL, one row per group"""
+    db_session.add(models.Deal(
+        tenant_id=demo_tenant.id,
+        client_id=demo_client.id,
+        title="Deal 6",
+        total_price=Decimal("99.00"),
+        total_cost=Decimal("10.00"),
+        status=models.DealStatus.new,
+    ))
+    await db_session.commit()
+    registry = ToolRegistry(db_session, demo_tenant.id)
+
+    result = await registry._tool_query_db(
+        "deals", aggregations=["sum:total_price", "count"], group_by=["status"], order_by="-count",
+    )
+    assert result["sources"] == ["deals"]
+    assert result["rows"] == [
+        {"status": models.DealStatus.final_account, "sum_total_price": pytest.approx(8550.50), "count": 5},
+        {"status": models.DealStatus.new, "sum_total_price": pytest.approx(99.00), "count": 1},
+    ]
+
+    result = await registry._tool_query_db(
+        "expenses", aggregations=["sum:amount"], group_by=["month"], order_by="month",
+    )
+    assert result["rows"] == [
+        {"month": "2025-01", "sum_amount": pytest.approx(420.40)},
+        {"month": "2025-02", "sum_amount": pytest.approx(80.00)},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_query_db_iso_week_buckets(db_session, demo_tenant):
+    """Week buckets follow ISO weeks, so year boundaries match PostgreSQL's IYYY-IW"""
+    for day in (date(2024, 12, 29), date(2024, 12, 30), date(2025, 1, 5), date(2025, 1, 6)):
+        db_session.add(models.Expense(
+            tenant_id=demo_tenant.id, amount=Decimal("10.00"), category="ads", date=day,
+        ))
+    await db_session.commit()
+    registry = ToolRegistry(db_session, demo_tenant.id)
+
+    result = await registry._tool_query_db("expenses", group_by=["week"], order_by="week")
+    assert result["rows"] == [
+        {"week": "2024-W52", "count": 1},
+        {"week": "2025-W01", "count": 2},
+        {"week": "2025-W02", "count": 1},
+    ]
+
+
+def _nested_loop_pairs(names, threshold):
+    # The loop find_duplicates used to run, with fuzzywuzzy's fuzz.ratio (0 for empty strings)
+    pairs = []
+    for i in range(len(names)):
+        for j in range(i + 1, len(names)):
+            a, b = names[i].lower(), names[j].lower()
+            score = int(round(100 * Levenshtein.ratio(a, b))) if a and b else 0
+            if score >= threshold:
+                pairs.append((i, j, score))
+    return pairs
+
+
+def test_similar_pairs_matches_nested_loop():
+    """Length pruning and block scoring find exactly the pairs of the plain nested loop"""
+    rng = random.Random(42)
+    names = ["", "", "Acme", "ACME", "acme ltd", "Acme Ltd.", "Beta", "a", "ab"]
+    for _ in range(150):
+        names.append("".join(rng.choice("abcde ") for _ in range(rng.randint(1, 12))))
+
+    for threshold in (0, 1, 50, 70, 85, 95, 100):
+        assert _similar_pairs(names, threshold) == _nested_loop_pairs(names, threshold), threshold
+
+
+def test_similar_pairs_keeps_scores_that_round_up():
+    """A pair scoring just under the threshold before rounding still matches, as fuzz.ratio did"""
+    # Levenshtein ratio 22/26 = 0.846, which fuzz.ratio rounded to 85
+    names = ["abcdefghijklm", "ABCDEFGHIJKXY"]
+    assert _similar_pairs(names, 85) == [(0, 1, 85)]
+    assert _similar_pairs(names, 86) == []
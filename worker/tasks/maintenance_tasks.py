@@ -0,0 +1,122 @@
+# worker/tasks/maintenance_tasks.py
+"""
+Periodic database maintenance, scheduled by celery beat (see worker.worker)
+"""
+from sqlalchemy import text
+from worker.worker import celery_app
+from app.db import get_sync_session, sync_engine
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _refresh_materialized_view(view_name: str) -> dict:
+    """
+    Refresh a materialized view if its mv_refresh_state flag is set. Statement
+    triggers on the source tables set the flag, so bursts of writes cost one
+    refresh per beat interval.
+    """
+    session = get_sync_session()
+    try:
+        if session.execute(text("SELECT to_regclass(:view_name)"), {"view_name": view_name}).scalar() is None:
+            # Schemas built by create_all instead of Alembic have no materialized views
+            return {"status": "skipped", "refreshed": False}
+
+        # Clear the flag in its own transaction so writers are not blocked during the refresh
+        dirty = session.execute(text(
+            "UPDATE mv_refresh_state SET dirty = false "
+            "WHERE view_name = :view_name AND dirty RETURNING view_name"
+        ), {"view_name": view_name}).fetchone()
+        session.commit()
+        if not dirty:
+            return {"status": "ok", "refreshed": False}
+
+        try:
+            # CONCURRENTLY keeps the view readable during the refresh (needs its unique index)
+            session.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view_name}"))
+            session.commit()
+        except Exception:
+            session.rollback()
+            session.execute(
+                text("UPDATE mv_refresh_state SET dirty = true WHERE view_name = :view_name"),
+                {"view_name": view_name},
+            )
+            session.commit()
+            raise
+    finally:
+        session.close()
+    return {"status": "ok", "refreshed": True}
+
+
+@celery_app.task(name="maintenance_tasks.refresh_product_stock", ignore_result=True)
+def refresh_product_stock():
+    """Refresh mv_product_stock if inventory_items changed since the last run."""
+    return _refresh_materialized_view("mv_product_stock")
+
+
+@celery_app.task(name="maintenance_tasks.refresh_daily_rollup", ignore_result=True)
+def refresh_daily_rollup():
+    """Refresh mv_daily_rollup if deals or expenses changed since the last run."""
+    return _refresh_materialized_view("mv_daily_rollup")
+
+
+def _sync_hnsw_index(conn, index_name: str, params: dict, tenant_id: int = None) -> str:
+    """Create a per-tenant HNSW index, or rebuild an existing one whose options are stale."""
+    reloptions = conn.execute(
+        text("SELECT reloptions FROM pg_class WHERE relname = :name"), {"name": index_name}
+    ).scalar()
+    options = f"m = {params['m']}, ef_construction = {params['ef_construction']}"
+
+    if reloptions is None:
+        if tenant_id is None:
+            # The global index is owned by migrations
+            return "missing"
+        conn.execute(text(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON document_chunks "
+            f"USING hnsw (embedding halfvec_cosine_ops) WITH ({options}) "
+            f"WHERE tenant_id = {int(tenant_id)}"
+        ))
+        return "created"
+
+    wanted = ["m=%d" % params["m"], "ef_construction=%d" % params["ef_construction"]]
+    if sorted(reloptions) == sorted(wanted):
+        return "unchanged"
+
+    conn.execute(text(f"ALTER INDEX {index_name} SET ({options})"))
+    conn.execute(text(f"REINDEX INDEX CONCURRENTLY {index_name}"))
+    return "rebuilt"
+
+
+@celery_app.task(name="maintenance_tasks.retune_hnsw_index")
+def retune_hnsw_index():
+    """
+    Keep document_chunks HNSW indexes sized to their data.
+    Tenants with many chunks get their own partial index so their searches
+    walk a small graph; everyone else shares the global index.
+    CONCURRENTLY operations need an autocommit connection.
+    """
+    from app.services.ai.hnsw_tuning import (
+        HNSW_INDEX_NAME, TENANT_INDEX_MIN_CHUNKS, configure_hnsw_params, tenant_hnsw_index_name,
+    )
+
+    results = {}
+    with sync_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        per_tenant = conn.execute(
+            text("SELECT tenant_id, count(*) FROM document_chunks GROUP BY tenant_id")
+        ).fetchall()
+
+        for tenant_id, count in per_tenant:
+            params = configure_hnsw_params(count)
+            logger.info("HNSW tier for tenant %s: %s (%s chunks)", tenant_id, params["tier"], count)
+            if count >= TENANT_INDEX_MIN_CHUNKS:
+                index_name = tenant_hnsw_index_name(tenant_id)
+                results[index_name] = _sync_hnsw_index(conn, index_name, params, tenant_id)
+
+        # The global index spans all tenants, so its tier follows the total row count
+        vector_count = sum(count for _, count in per_tenant)
+        results[HNSW_INDEX_NAME] = _sync_hnsw_index(conn, HNSW_INDEX_NAME, configure_hnsw_params(vector_count))
+
+    for index_name, status in results.items():
+        if status in ("created", "rebuilt"):
+            logger.info("HNSW index %s %s", index_name, status)
+    return {"status": "ok", "vectors": vector_count, "indexes": results}
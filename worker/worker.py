@@ -11,6 +11,7 @@ backend_path = Path(__file__).parent.parent / "backend"
 sys.path.insert(0, str(backend_path))
 
 from celery import Celery
+from celery.schedules import crontab
 from app.core.config import settings
 
 # Create Celery app
@@ -21,6 +22,7 @@ celery_app = Celery(
     include=[
         "worker.tasks.finance_tasks",
         "worker.tasks.import_tasks",
+        "worker.tasks.maintenance_tasks",
     ]
 )
 
@@ -36,5 +38,21 @@ celery_app.conf.update(
     task_soft_time_limit=25 * 60,  # 25 minutes
 )
 
+# Periodic tasks; run `celery -A worker.worker beat` alongside the worker
+celery_app.conf.beat_schedule = {
+    "retune-hnsw-index-weekly": {
+        "task": "maintenance_tasks.retune_hnsw_index",
+        "schedule": crontab(minute=0, hour=3, day_of_week="sun"),
+    },
+    "refresh-product-stock": {
+        "task": "maintenance_tasks.refresh_product_stock",
+        "schedule": 60.0,
+    },
+    "refresh-daily-rollup": {
+        "task": "maintenance_tasks.refresh_daily_rollup",
+        "schedule": 60.0,
+    },
+}
+
 if __name__ == "__main__":
     celery_app.start()